@@ -0,0 +1,42 @@
+import os
+import time
+import numpy as np
+from benchmark.exp_runner import setup_experiment, run_with_timing
+from benchmark.input_handler import InputHandler
+from data_structures.compressed_vector_tools import convert_vectors_to_sdsl4py
+
+exp_name = "convert_vectors_scaling"
+exp = setup_experiment(exp_name)
+
+# Override default config
+@exp.config
+def default_config():
+    # The columns of a multi-channel figure, every one a shuffled copy of y
+    n_columns = 16
+    cases = [
+        {
+            "option": f"workers_{n_workers}",
+            "input_type": "default",
+        }
+        for n_workers in (1, 2, 4, 8, 16)
+        if n_workers <= (os.cpu_count() or 1)
+    ]
+
+@exp.automain
+def run(cases, iterations, n_range, file_input_list, decimal_places, width, decompressed, n_columns):
+    input_handler_instance = InputHandler()
+    rng = np.random.default_rng(0)
+
+    def experiment_fn(x, y, option):
+        n_workers = int(option.split("_")[1])
+        columns = [rng.permutation(np.asarray(y)) for _ in range(n_columns)]
+        start = time.perf_counter()
+        convert_vectors_to_sdsl4py(
+            *columns, decimal_places=decimal_places, int_width=width, n_workers=n_workers
+        )
+        end = time.perf_counter()
+        return end - start
+
+    results = run_with_timing(input_handler_instance, experiment_fn, cases, n_range, file_input_list, decimal_places, iterations, width, decompressed)
+    # exp.log_scalar("num_cases", len(results))
+    return results
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from benchmark.exp_runner import setup_experiment, run_with_timing
+from benchmark.input_handler import InputHandler
+from data_structures.compressed_vector import CompressedVector
+
+exp_name = "fill_from_vector_comparison"
+exp = setup_experiment(exp_name)
+
+# Override default config
+@exp.config
+def default_config():
+    cases = [
+        {
+            "option": "numpy",
+            "input_type": "default",
+        },
+        {
+            "option": "sdsl4py",
+            "input_type": "default",
+        }
+    ]
+
+@exp.automain
+def run(cases, iterations, n_range, file_input_list, decimal_places, width, decompressed):
+    input_handler_instance = InputHandler()
+
+    def experiment_fn(x, y, option):
+        if option == "numpy":
+            start = time.perf_counter()
+            np.asarray(y)
+            end = time.perf_counter()
+            return end - start
+
+        start = time.perf_counter()
+        c_vector = CompressedVector(decimal_places, width)
+        c_vector.create_vector(len(y))
+        c_vector.fill_from_vector(y)
+        end = time.perf_counter()
+        c_vector.destroy()
+        return end - start
+
+    results = run_with_timing(input_handler_instance, experiment_fn, cases, n_range, file_input_list, decimal_places, iterations, width, decompressed)
+    # exp.log_scalar("num_cases", len(results))
+    return results
@@ -2,32 +2,47 @@ import sdsl4py
 import numpy as np
 import data_structures.compressed_vector as compressed_vector
 import csv
+import os
 
 class InputHandler:
     def __init__(self):
         self.valid_input_types = ["default", "sdsl4py"]
         self.width_y = 64
         self.width_x = 64
+        self.encoding = "split"
 
     def set_width(self, width, axis="x"):
         """
             Set the width of the integer part in bits.
             Args:
-                width (int): The width of the integer part in bits. Only 8, 16, 32, or 64 are valid.
+                width (int | str): The width of the integer part in bits. Only 8, 16, 32, 64
+                    or "auto" (minimal width for the data) are valid.
                 axis (str): The axis to set the width for. Can be "x" or "y".
         """
         if axis == "x":
-            if width in [8, 16, 32, 64]:
+            if width in [8, 16, 32, 64, "auto"]:
                 self.width_x = width
             else:
-                raise ValueError(f"Invalid width for x: {width}. Valid widths are: 8, 16, 32, 64")
+                raise ValueError(f"Invalid width for x: {width}. Valid widths are: 8, 16, 32, 64, auto")
         elif axis == "y":
-            if width in [8, 16, 32, 64]:
+            if width in [8, 16, 32, 64, "auto"]:
                 self.width_y = width
             else:
-                raise ValueError(f"Invalid width for y: {width}. Valid widths are: 8, 16, 32, 64")
+                raise ValueError(f"Invalid width for y: {width}. Valid widths are: 8, 16, 32, 64, auto")
         else:
             raise ValueError(f"Invalid axis: {axis}. Valid axes are: x, y")
+
+    def set_encoding(self, encoding):
+        """
+            Set the encoding of the compressed vectors.
+            Args:
+                encoding (str): The encoding of the values. Can be "split", "fixed_point"
+                    or the name of a codec, e.g. "xor".
+        """
+        valid_encodings = compressed_vector.ENCODINGS + tuple(compressed_vector.CODECS)
+        if encoding not in valid_encodings:
+            raise ValueError(f"Invalid encoding: {encoding}. Valid encodings are: {valid_encodings}")
+        self.encoding = encoding
         
     def get_from_file(
             self, 
@@ -37,7 +52,8 @@ class InputHandler:
             delimiter=";", 
             column=1, 
             truncate=None,
-            decompress=True
+            decompress=True,
+            cache_dir=None
         ):
         """
             Get the inputs for the benchmark based on the input type and save them in input_cases.
@@ -48,7 +64,24 @@ class InputHandler:
                 delimiter (str): The delimiter used in the csv file.
                 column (int): The column index (0-based) to extract the vector from.
                 truncate (int): The maximum number of rows to process. If None, process all rows.
+                cache_dir (str): Only for "sdsl4py". If set, the compressed vectors are saved
+                    in this directory, and memory mapped from there on the next call, as long
+                    as the file did not change.
         """
+        if option == "sdsl4py" and cache_dir is not None:
+            cached_paths = [
+                self._cached_vector_path(cache_dir, file_path, axis, decimal_places, column, truncate)
+                for axis in ("x", "y")
+            ]
+            if all(
+                os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(file_path)
+                for path in cached_paths
+            ):
+                return tuple(
+                    compressed_vector.CompressedVector.open(path, get_decompressed=decompress)
+                    for path in cached_paths
+                )
+
         # get x, from row 0 and y from column 'column'
         x = []
         y = []
@@ -67,15 +100,31 @@ class InputHandler:
         
         elif option == "sdsl4py":
             # create the compressed vector
-            compressed_vector_instance_x = compressed_vector.CompressedVector(decimal_places, self.width_x)
+            compressed_vector_instance_x = compressed_vector.CompressedVector(decimal_places, self.width_x, encoding=self.encoding)
             compressed_vector_instance_x.create_vector(len(x))
             compressed_vector_instance_x.fill_from_vector(x)
             compressed_vector_instance_x.set_decompressed_config(decompress)
-            compressed_vector_instance_y = compressed_vector.CompressedVector(decimal_places, self.width_y)
+            compressed_vector_instance_y = compressed_vector.CompressedVector(decimal_places, self.width_y, encoding=self.encoding)
             compressed_vector_instance_y.create_vector(len(y))
             compressed_vector_instance_y.fill_from_vector(y)
             compressed_vector_instance_y.set_decompressed_config(decompress)
+            if cache_dir is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                compressed_vector_instance_x.save(cached_paths[0])
+                compressed_vector_instance_y.save(cached_paths[1])
             # return the compressed vector
             return compressed_vector_instance_x, compressed_vector_instance_y
         else:
-            raise ValueError(f"Invalid option: {option}. Valid options are: {self.valid_input_types}")
\ No newline at end of file
+            raise ValueError(f"Invalid option: {option}. Valid options are: {self.valid_input_types}")
+
+    def _cached_vector_path(self, cache_dir, file_path, axis, decimal_places, column, truncate):
+        """
+            Return the path of the saved compressed vector of an axis, which depends on
+            every setting that changes its values or its encoding.
+        """
+        width = self.width_x if axis == "x" else self.width_y
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        return os.path.join(
+            cache_dir,
+            f"{name}.{axis}.c{column}.t{truncate}.d{decimal_places}.w{width}.{self.encoding}.cvec"
+        )
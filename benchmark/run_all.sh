@@ -5,6 +5,8 @@ EXP_NAMES=(
     "downsampling_comparison"
     "add_trace_no_widget"
     "add_trace_memory_no_widget_consumption"
+    "fill_from_vector_comparison"
+    "convert_vectors_scaling"
     # "plotly_resampler_options_comparison"
     # "plotly_resampler_options_sdsl4py_comparison"
     # "add_trace_comparison"
@@ -0,0 +1,262 @@
+import sdsl4py
+import numpy as np
+from data_structures.packed_vector import words_size_in_bytes
+
+# Number of 64-bit words per rank sample (a sample every 512 bits, as the
+# sdsl rank_support_v5)
+_SUPERBLOCK_WORDS = 8
+
+# Number of set bits of every byte, for NumPy versions without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+
+def _popcount(words):
+    """
+    Return the number of set bits of every uint64 word.
+    """
+    words = np.asarray(words, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).astype(np.int64)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
+def _unpack_bits(words):
+    """
+    Return the bits of the uint64 words as a bool array, least significant first.
+    """
+    words = np.ascontiguousarray(words, dtype="<u8")
+    return np.unpackbits(words.view(np.uint8), bitorder="little").astype(bool)
+
+
+def _pack_bits(bits):
+    """
+    Pack a bool array (of a multiple of 64 bits) into uint64 words.
+    """
+    return np.packbits(bits, bitorder="little").view("<u8").astype(np.uint64)
+
+
+class BitVector:
+    """
+    A bit vector with rank and select support.
+
+    The bits are stored in the words of a sdsl4py.int_vector_64 (least significant
+    bit first, as a sdsl bit_vector). The number of set bits before every 512-bit
+    superblock is sampled, so that `rank` is O(1) and `select` is a binary search
+    over the samples. The samples are rebuilt lazily after a bit was changed.
+    """
+
+    def __init__(self, size):
+        """
+        Initialize the bit vector with zeros.
+        Args:
+            size (int): The number of bits.
+        """
+        self.size = size
+        self.words = sdsl4py.int_vector_64(size=(size + 63) // 64, default_value=0)
+        self._ranks = None
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Create a bit vector holding a boolean mask.
+        Args:
+            mask (np.ndarray): The bits.
+        Returns:
+            BitVector: The bit vector.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        vector = cls(len(mask))
+        vector.write(0, mask)
+        return vector
+
+    @classmethod
+    def from_words(cls, words, size):
+        """
+        Create a bit vector over existing words, e.g. a memory mapped array.
+        Args:
+            words: The words, a sdsl4py.int_vector_64 or a uint64 array.
+            size (int): The number of bits.
+        Returns:
+            BitVector: The bit vector, which shares the words.
+        """
+        vector = cls.__new__(cls)
+        vector.size = size
+        vector.words = words
+        vector._ranks = None
+        return vector
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if index < 0 or index >= self.size:
+            raise IndexError("Index out of bounds")
+        return bool((int(self.words[index >> 6]) >> (index & 63)) & 1)
+
+    def __setitem__(self, index, bit):
+        if index < 0 or index >= self.size:
+            raise IndexError("Index out of range")
+        word = int(self.words[index >> 6])
+        if bit:
+            word |= 1 << (index & 63)
+        else:
+            word &= ~(1 << (index & 63))
+        self.words[index >> 6] = word
+        self._ranks = None
+
+    def get(self, index):
+        """
+        Return the bits at a slice or an array of indices.
+        Args:
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The bits as a bool array.
+        """
+        words = np.asarray(self.words)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            if start >= stop:
+                return np.zeros(0, dtype=bool)
+            # Only unpack the words of the window
+            first_word, last_word = start >> 6, (stop - 1) >> 6
+            bits = _unpack_bits(words[first_word:last_word + 1])
+            offset = first_word << 6
+            return bits[start - offset:stop - offset:step]
+
+        index = np.asarray(index, dtype=np.int64)
+        shift = (index & 63).astype(np.uint64)
+        return ((words[index >> 6] >> shift) & np.uint64(1)).astype(bool)
+
+    def write(self, offset, bits):
+        """
+        Write the bits to the positions offset, offset + 1, ...
+        Args:
+            offset (int): The position of the first bit.
+            bits (np.ndarray): The bits as a bool array.
+        """
+        bits = np.asarray(bits, dtype=bool)
+        if not len(bits):
+            return
+        words = np.asarray(self.words)
+        first_word, last_word = offset >> 6, (offset + len(bits) - 1) >> 6
+        # Unpack the (partially) covered words, so that the other bits are kept
+        window = _unpack_bits(words[first_word:last_word + 1])
+        start = offset - (first_word << 6)
+        window[start:start + len(bits)] = bits
+        words[first_word:last_word + 1] = _pack_bits(window)
+        self._ranks = None
+
+    def _rank_samples(self):
+        """
+        Return the number of set bits before every superblock.
+        """
+        if self._ranks is None:
+            counts = _popcount(np.asarray(self.words))
+            n_superblocks = -(-len(counts) // _SUPERBLOCK_WORDS)
+            padded = np.zeros(n_superblocks * _SUPERBLOCK_WORDS, dtype=np.int64)
+            padded[:len(counts)] = counts
+            per_superblock = padded.reshape(-1, _SUPERBLOCK_WORDS).sum(axis=1)
+            self._ranks = np.concatenate(([0], np.cumsum(per_superblock)))
+        return self._ranks
+
+    def rank(self, index):
+        """
+        Return the number of set bits before the index, i.e. in [0, index).
+        Args:
+            index (int | np.ndarray): The position(s), between 0 and size.
+        Returns:
+            int | np.ndarray: The number of set bits.
+        """
+        ranks = self._rank_samples()
+        words = np.asarray(self.words)
+        positions = np.atleast_1d(np.asarray(index, dtype=np.int64))
+
+        superblock = positions // (_SUPERBLOCK_WORDS * 64)
+        word_index = positions >> 6
+        # The (at most 8) words from the start of the superblock up to the index
+        scanned = superblock[:, None] * _SUPERBLOCK_WORDS + np.arange(_SUPERBLOCK_WORDS)
+        in_range = scanned <= word_index[:, None]
+        masks = np.where(
+            scanned < word_index[:, None],
+            np.uint64(0xFFFFFFFFFFFFFFFF),
+            (np.uint64(1) << (positions & 63).astype(np.uint64))[:, None] - np.uint64(1),
+        )
+        scanned = np.minimum(scanned, max(len(words) - 1, 0))
+        if len(words):
+            counts = np.where(in_range, _popcount(words[scanned] & masks), 0)
+        else:
+            counts = np.zeros_like(scanned)
+        result = ranks[superblock] + counts.sum(axis=1)
+        return int(result[0]) if np.ndim(index) == 0 else result
+
+    def count(self):
+        """
+        Return the number of set bits.
+        """
+        return int(self._rank_samples()[-1])
+
+    def select(self, k):
+        """
+        Return the position of the k-th set bit (0-based).
+        Args:
+            k (int | np.ndarray): The rank(s) of the set bits, below count().
+        Returns:
+            int | np.ndarray: The position(s).
+        """
+        ranks = self._rank_samples()
+        words = np.asarray(self.words)
+        ks = np.atleast_1d(np.asarray(k, dtype=np.int64))
+        if len(ks) and (ks.min() < 0 or ks.max() >= ranks[-1]):
+            raise IndexError("Rank out of bounds")
+
+        superblock = np.searchsorted(ranks, ks, side="right") - 1
+        remaining = ks - ranks[superblock]
+        # Find the word within the superblock
+        scanned = superblock[:, None] * _SUPERBLOCK_WORDS + np.arange(_SUPERBLOCK_WORDS)
+        scanned = np.minimum(scanned, len(words) - 1)
+        cumulative = np.cumsum(_popcount(words[scanned]), axis=1)
+        offset = (cumulative <= remaining[:, None]).sum(axis=1)
+        word_index = superblock * _SUPERBLOCK_WORDS + offset
+        before = np.where(
+            offset > 0,
+            cumulative[np.arange(len(ks)), np.maximum(offset - 1, 0)],
+            0,
+        )
+        remaining -= before
+        # Find the bit within the word
+        bits = _unpack_bits(words[word_index]).reshape(-1, 64)
+        bit = (np.cumsum(bits, axis=1) <= remaining[:, None]).sum(axis=1)
+        result = word_index * 64 + bit
+        return int(result[0]) if np.ndim(k) == 0 else result
+
+    def ones(self, start=0, stop=None):
+        """
+        Return the positions of the set bits in [start, stop), in O(number of set
+        bits) instead of a scan.
+        """
+        stop = self.size if stop is None else stop
+        if start >= stop:
+            return np.zeros(0, dtype=np.int64)
+        return self.select(np.arange(self.rank(start), self.rank(stop)))
+
+    def zero_runs(self, start=0, stop=None):
+        """
+        Return the runs of unset bits in [start, stop).
+        Returns:
+            tuple: The start (inclusive) and end (exclusive) positions of the runs.
+        """
+        stop = self.size if stop is None else stop
+        ones = self.ones(start, stop)
+        run_starts = np.concatenate(([start], ones + 1))
+        run_ends = np.concatenate((ones, [stop]))
+        non_empty = run_ends > run_starts
+        return run_starts[non_empty], run_ends[non_empty]
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the bits and the rank samples.
+        """
+        return words_size_in_bytes(self.words) + self._rank_samples().nbytes
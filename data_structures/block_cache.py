@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+
+
+class BlockCache:
+    """
+    A thread safe LRU cache of decoded blocks, bounded by a byte budget.
+
+    The cached blocks are NumPy arrays, which are made read-only so that a caller
+    cannot change a cached block by accident.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Initialize an empty cache.
+        Args:
+            max_bytes (int): The maximum number of bytes of the cached blocks.
+        """
+        if max_bytes <= 0:
+            raise ValueError("The cache size must be positive")
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Return the number of cached blocks.
+        """
+        return len(self._blocks)
+
+    def get(self, key):
+        """
+        Return the cached block, or None when it is not cached.
+        Args:
+            key: The key of the block.
+        """
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+    def put(self, key, block):
+        """
+        Cache a block, and evict the least recently used blocks to stay within the
+        byte budget. A block that is larger than the budget is not cached.
+        Args:
+            key: The key of the block.
+            block (np.ndarray): The decoded block.
+        """
+        if block.nbytes > self.max_bytes:
+            return
+        block.flags.writeable = False
+        with self._lock:
+            previous = self._blocks.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._blocks[key] = block
+            self.current_bytes += block.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def invalidate(self, key):
+        """
+        Remove a block from the cache, e.g. after one of its values was changed.
+        """
+        with self._lock:
+            block = self._blocks.pop(key, None)
+            if block is not None:
+                self.current_bytes -= block.nbytes
+
+    def clear(self):
+        """
+        Remove all blocks from the cache, the hit and miss counters are kept.
+        """
+        with self._lock:
+            self._blocks.clear()
+            self.current_bytes = 0
+
+    def info(self):
+        """
+        Return the hits, misses and size of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "blocks": len(self._blocks),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+class BlockSummaries:
+    """
+    Per-block metadata of a vector, for fixed-size blocks of `block_size` values:
+    the min, max, (absolute) argmin and argmax, and the NaN count of every block.
+
+    The min and max ignore NaN values, a block with only NaN values has a NaN min and
+    max, and its argmin and argmax point to the first value of the block.
+
+    A min/max downsampler can answer a query over many blocks from the summaries of
+    the fully covered blocks, and only has to decode the partially covered edge
+    blocks.
+    """
+
+    # The names of the per-block arrays
+    ARRAY_NAMES = ("min", "max", "argmin", "argmax", "nan_count")
+
+    def __init__(self, size, block_size):
+        """
+        Initialize the (empty) summaries of a vector.
+        Args:
+            size (int): The number of values of the vector.
+            block_size (int): The number of values per block.
+        """
+        if block_size < 1:
+            raise ValueError("Block size must be positive")
+        self.size = size
+        self.block_size = block_size
+        n_blocks = -(-size // block_size)
+        self.min = np.full(n_blocks, np.nan, dtype=np.float64)
+        self.max = np.full(n_blocks, np.nan, dtype=np.float64)
+        self.argmin = np.arange(n_blocks, dtype=np.int64) * block_size
+        self.argmax = self.argmin.copy()
+        self.nan_count = np.zeros(n_blocks, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, size, block_size, arrays):
+        """
+        Create the summaries from existing arrays, e.g. memory mapped arrays.
+        Args:
+            size (int): The number of values of the vector.
+            block_size (int): The number of values per block.
+            arrays (dict): The min, max, argmin, argmax and nan_count arrays.
+        Returns:
+            BlockSummaries: The summaries, which share the arrays.
+        """
+        summaries = cls.__new__(cls)
+        summaries.size = size
+        summaries.block_size = block_size
+        for name in cls.ARRAY_NAMES:
+            setattr(summaries, name, arrays[name])
+        return summaries
+
+    def __len__(self):
+        """
+        Return the number of blocks.
+        """
+        return len(self.nan_count)
+
+    def update(self, offset, values):
+        """
+        Summarize the values of whole blocks.
+        Args:
+            offset (int): The position of the first value, a multiple of block_size.
+            values (np.ndarray): The values of the blocks, only the last block of
+                the vector can be partial.
+        """
+        if offset % self.block_size:
+            raise ValueError("The offset must be a multiple of the block size")
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        k = self.block_size
+        n_blocks = -(-len(values) // k)
+        first_block = offset // k
+        blocks = slice(first_block, first_block + n_blocks)
+
+        padded = np.full(n_blocks * k, np.nan)
+        padded[:len(values)] = values
+        padded = padded.reshape(n_blocks, k)
+        nan_mask = np.isnan(padded)
+        # The padding of the last block is not counted as NaN
+        nan_count = nan_mask.sum(axis=1)
+        nan_count[-1] -= n_blocks * k - len(values)
+
+        argmin = np.where(nan_mask, np.inf, padded).argmin(axis=1)
+        argmax = np.where(nan_mask, -np.inf, padded).argmax(axis=1)
+        rows = np.arange(n_blocks)
+        self.min[blocks] = padded[rows, argmin]
+        self.max[blocks] = padded[rows, argmax]
+        self.argmin[blocks] = offset + rows * k + argmin
+        self.argmax[blocks] = offset + rows * k + argmax
+        self.nan_count[blocks] = nan_count
+
+    def block_range(self, start, end):
+        """
+        Return the blocks that are fully covered by the positions [start, end).
+        Args:
+            start (int): The first position (inclusive).
+            end (int): The last position (exclusive).
+        Returns:
+            tuple: The first (inclusive) and last (exclusive) fully covered block.
+        """
+        first_block = -(-start // self.block_size)
+        # The last block of the vector can be partial
+        last_block = len(self) if end >= self.size else end // self.block_size
+        return first_block, max(first_block, last_block)
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the summaries.
+        """
+        return (
+            self.min.nbytes
+            + self.max.nbytes
+            + self.argmin.nbytes
+            + self.argmax.nbytes
+            + self.nan_count.nbytes
+        )
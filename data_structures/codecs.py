@@ -0,0 +1,327 @@
+import sdsl4py
+import numpy as np
+from data_structures.packed_vector import PackedIntVector, words_size_in_bytes
+
+# The registered codecs by name, see `register_codec`
+CODECS = {}
+
+
+def register_codec(codec_class):
+    """
+    Register a codec class under its name, so that the name can be used as the
+    encoding of a CompressedVector. Can be used as a class decorator.
+    Args:
+        codec_class (type): A subclass of Codec.
+    Returns:
+        type: The codec class.
+    """
+    if not codec_class.name:
+        raise ValueError("A codec must have a name")
+    CODECS[codec_class.name] = codec_class
+    return codec_class
+
+
+def _bit_length(values):
+    """
+    Return the number of bits needed for every uint64 value (0 for 0).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.zeros(values.shape, dtype=np.int64)
+    # Binary search for the highest set bit
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >> np.uint64(shift)
+        has_high = high != 0
+        lengths[has_high] += shift
+        values = np.where(has_high, high, values)
+    return lengths + (values != 0)
+
+
+def _trailing_zeros(values):
+    """
+    Return the number of trailing zero bits of every uint64 value (0 for 0).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    # Isolate the lowest set bit
+    lowest = values & (~values + np.uint64(1))
+    return np.where(values != 0, _bit_length(lowest) - 1, 0)
+
+
+class Codec:
+    """
+    The storage of the values of a CompressedVector, for the encodings other than
+    the built-in "split" and "fixed_point" encodings.
+
+    A codec encodes a stream of float64 values once, and decodes a slice or an
+    array of indices without decoding the whole vector. The CompressedVector keeps
+    the NaN bitmap, the block summaries and the block cache on top of the codec, so
+    its interface (`__getitem__`, `__len__`, `dtype`, ...) does not depend on the
+    codec.
+    """
+
+    # The name of the codec, which is the encoding of the CompressedVector
+    name = None
+
+    def encode(self, value_chunks):
+        """
+        Encode a stream of values, replacing the current values.
+        Args:
+            value_chunks (iterable): The float64 chunks of the values.
+        Returns:
+            int: The number of encoded values.
+        """
+        raise NotImplementedError
+
+    def decode(self, index):
+        """
+        Decode the values at a slice or an array of indices.
+        Args:
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The decoded float64 values.
+        """
+        raise NotImplementedError
+
+    def value(self, index):
+        """
+        Decode a single value.
+        Args:
+            index (int): A non-negative index.
+        Returns:
+            float: The decoded value.
+        """
+        return self.decode(np.array([index]))[0].item()
+
+    def quantize(self, values):
+        """
+        Return the values as the codec would decode them, as is for a lossless
+        codec.
+        """
+        return np.asarray(values, dtype=np.float64)
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the encoded values.
+        """
+        raise NotImplementedError
+
+    def to_arrays(self):
+        """
+        Return the JSON serializable metadata and the arrays of the codec, to save
+        it to a file.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def from_arrays(cls, metadata, arrays):
+        """
+        Create the codec from the metadata and the (memory mapped) arrays returned
+        by `to_arrays`.
+        """
+        raise NotImplementedError
+
+
+@register_codec
+class XorCodec(Codec):
+    """
+    A lossless codec for float64 values, in the spirit of the XOR compression of
+    Gorilla: every value is XOR-ed with the previous value, which leaves mostly
+    zero bits (the sign, the exponent and the high mantissa bits) for slowly
+    varying data.
+
+    The values are split into blocks of BLOCK_SIZE values. Every block stores its
+    first value as is, and for the other values only the window of bits between
+    the leading and trailing zeros that all the XORs of the block share. Unlike the
+    per-value windows of Gorilla, a single window per block packs every block with
+    a fixed width, so that the blocks are encoded and decoded with NumPy, and a
+    value is decoded by decoding its block only.
+    """
+
+    name = "xor"
+
+    # Number of values per block, a multiple of 64 so that every block is packed
+    # into whole words
+    BLOCK_SIZE = 1024
+
+    # The per-block packed vectors
+    BLOCK_VECTOR_NAMES = ("anchors", "shifts", "widths", "word_offsets")
+
+    def __init__(self):
+        self.n_elements = 0
+        # The first value of every block (as uint64 bits)
+        self.anchors = None
+        # The number of trailing zeros and the width of the window of every block
+        self.shifts = None
+        self.widths = None
+        # The position of the first word of every block in the words
+        self.word_offsets = None
+        # The packed windows of all the blocks, followed by a padding word
+        self.words = None
+
+    def encode(self, value_chunks):
+        k = self.BLOCK_SIZE
+        anchors, shifts, widths, words = [], [], [], []
+        n_values = 0
+        # The values that do not fill a block yet
+        pending = np.empty(0)
+        for values in value_chunks:
+            values = np.asarray(values, dtype=np.float64)
+            n_values += len(values)
+            if len(pending):
+                values = np.concatenate((pending, values))
+            n_full = len(values) // k * k
+            pending = values[n_full:].copy()
+            if n_full:
+                for part, encoded in zip(
+                    (anchors, shifts, widths, words), self._encode_blocks(values[:n_full])
+                ):
+                    part.append(encoded)
+        if len(pending):
+            # The padding repeats the last value, which XORs to zero bits
+            padded = np.full(k, pending[-1])
+            padded[:len(pending)] = pending
+            for part, encoded in zip(
+                (anchors, shifts, widths, words), self._encode_blocks(padded)
+            ):
+                part.append(encoded)
+
+        anchors, shifts, widths, words = (
+            np.concatenate(part) if part else np.empty(0, dtype=np.uint64)
+            for part in (anchors, shifts, widths, words)
+        )
+        block_words = widths.astype(np.int64) * (k // 64)
+        word_offsets = np.cumsum(block_words) - block_words
+        self.n_elements = n_values
+        self.anchors = PackedIntVector.from_array(anchors, 64)
+        self.shifts = PackedIntVector.from_array(shifts, 6)
+        self.widths = PackedIntVector.from_array(widths, 7)
+        self.word_offsets = PackedIntVector.from_array(word_offsets.astype(np.uint64))
+        self.words = sdsl4py.int_vector_64(size=len(words) + 1, default_value=0)
+        np.asarray(self.words)[:len(words)] = words
+        return n_values
+
+    def _encode_blocks(self, values):
+        """
+        Encode whole blocks of values.
+        Args:
+            values (np.ndarray): The float64 values of the blocks.
+        Returns:
+            tuple: The anchors, shifts and widths of the blocks, and their words.
+        """
+        k = self.BLOCK_SIZE
+        bits = np.ascontiguousarray(values).view(np.uint64).reshape(-1, k)
+        xors = np.zeros_like(bits)
+        xors[:, 1:] = bits[:, 1:] ^ bits[:, :-1]
+        # The bits that differ anywhere in the block
+        window = np.bitwise_or.reduce(xors, axis=1)
+        shifts = _trailing_zeros(window)
+        widths = _bit_length(window) - shifts
+        xors >>= shifts.astype(np.uint64)[:, None]
+
+        block_words = widths * (k // 64)
+        word_offsets = np.cumsum(block_words) - block_words
+        words = np.zeros(int(block_words.sum()), dtype=np.uint64)
+        # The blocks with the same width are packed together
+        for width in np.unique(widths[widths > 0]):
+            selected = np.flatnonzero(widths == width)
+            n_words = k * int(width) // 64
+            packed = PackedIntVector.from_array(xors[selected].ravel(), int(width))
+            words[word_offsets[selected][:, None] + np.arange(n_words)] = np.asarray(
+                packed.words
+            )[:len(selected) * n_words].reshape(-1, n_words)
+        return bits[:, 0], shifts.astype(np.uint64), widths.astype(np.uint64), words
+
+    def _decode_blocks(self, blocks):
+        """
+        Decode entire blocks.
+        Args:
+            blocks (np.ndarray): The (sorted, unique) block indices.
+        Returns:
+            np.ndarray: A (len(blocks), BLOCK_SIZE) float64 array. The positions
+                beyond the end of the vector repeat the last value.
+        """
+        k = self.BLOCK_SIZE
+        widths = self.widths.read(blocks).astype(np.int64)
+        word_offsets = self.word_offsets.read(blocks).astype(np.int64)
+        words = np.asarray(self.words)
+        xors = np.zeros((len(blocks), k), dtype=np.uint64)
+        for width in np.unique(widths[widths > 0]):
+            selected = np.flatnonzero(widths == width)
+            n_words = k * int(width) // 64
+            # The words of the blocks, followed by a padding word
+            block_words = np.zeros(len(selected) * n_words + 1, dtype=np.uint64)
+            block_words[:-1] = words[
+                word_offsets[selected][:, None] + np.arange(n_words)
+            ].ravel()
+            packed = PackedIntVector.from_words(
+                block_words, len(selected) * k, int(width)
+            )
+            xors[selected] = packed.read(slice(0, len(selected) * k)).reshape(-1, k)
+        xors <<= self.shifts.read(blocks)[:, None]
+        xors[:, 0] = self.anchors.read(blocks)
+        return np.bitwise_xor.accumulate(xors, axis=1).view(np.float64)
+
+    def decode(self, index):
+        k = self.BLOCK_SIZE
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step or 1
+            if start >= stop:
+                return np.empty(0)
+            first_block, last_block = start // k, (stop - 1) // k
+            values = self._decode_blocks(np.arange(first_block, last_block + 1)).ravel()
+            offset = first_block * k
+            return values[start - offset:stop - offset:step]
+
+        index = np.asarray(index, dtype=np.int64)
+        if not len(index):
+            return np.empty(0)
+        # Only decode the blocks that contain the requested indices
+        blocks, block_pos = np.unique(index // k, return_inverse=True)
+        values = self._decode_blocks(blocks)
+        return values[block_pos.ravel(), index % k]
+
+    def value(self, index):
+        block, position = divmod(index, self.BLOCK_SIZE)
+        if position == 0:
+            # The first value of a block is its anchor, no XORs are decoded
+            return np.array([self.anchors[block]], dtype=np.uint64).view(np.float64)[0].item()
+        return super().value(index)
+
+    def size_in_bytes(self):
+        if self.words is None:
+            return 0
+        return words_size_in_bytes(self.words) + sum(
+            getattr(self, name).size_in_bytes() for name in self.BLOCK_VECTOR_NAMES
+        )
+
+    def to_arrays(self):
+        metadata = {
+            "n_elements": self.n_elements,
+            "block_size": self.BLOCK_SIZE,
+            "vectors": {
+                name: {"width": getattr(self, name).width, "size": len(getattr(self, name))}
+                for name in self.BLOCK_VECTOR_NAMES
+            },
+        }
+        arrays = {
+            name: np.asarray(getattr(self, name).words)
+            for name in self.BLOCK_VECTOR_NAMES
+        }
+        arrays["words"] = np.asarray(self.words)
+        return metadata, arrays
+
+    @classmethod
+    def from_arrays(cls, metadata, arrays):
+        if metadata["block_size"] != cls.BLOCK_SIZE:
+            raise ValueError(
+                f"Unsupported block size: {metadata['block_size']}, "
+                f"expected {cls.BLOCK_SIZE}"
+            )
+        codec = cls()
+        codec.n_elements = metadata["n_elements"]
+        for name, vector in metadata["vectors"].items():
+            setattr(codec, name, PackedIntVector.from_words(
+                arrays[name], vector["size"], vector["width"]
+            ))
+        codec.words = arrays["words"]
+        return codec
@@ -1,6 +1,165 @@
 import sdsl4py
 import math
+import warnings
 import numpy as np
+from data_structures.bit_vector import BitVector, _popcount
+from data_structures.block_cache import BlockCache
+from data_structures.block_summaries import BlockSummaries
+from data_structures.codecs import CODECS
+from data_structures.csv_reader import count_rows, read_column_chunks
+from data_structures.packed_vector import (
+    PackedIntVector,
+    minimal_width,
+    words_size_in_bytes,
+)
+from data_structures.sorted_search import searchsorted_blocks
+from data_structures.precision import (
+    MAX_DECIMAL_PLACES,
+    allowed_errors,
+    check_round_trip,
+    decimal_errors,
+    infer_decimal_places,
+)
+from data_structures.vector_file import read_sections, write_sections
+
+# sdsl4py vector types which expose their words through the buffer protocol, and
+# the (memory mapped) arrays of a vector that was opened from a file
+_BUFFER_VECTOR_TYPES = (
+    sdsl4py.int_vector_8,
+    sdsl4py.int_vector_16,
+    sdsl4py.int_vector_32,
+    sdsl4py.int_vector_64,
+    np.ndarray,
+)
+
+# Number of values encoded per pass when bulk loading
+_ENCODE_CHUNK_SIZE = 1 << 20
+
+# "split": separate integer, decimal and sign parts
+# "fixed_point": a single zigzag encoded, 10**decimal_places scaled integer
+# The names of the registered codecs (see data_structures.codecs) are valid
+# encodings as well
+ENCODINGS = ("split", "fixed_point")
+
+# The widths of the integer part, "auto" packs every part at the width of the data
+INT_WIDTHS = (8, 16, 32, 64, "auto")
+
+# Number of values per cached block of decoded values
+_CACHE_BLOCK_SIZE = 1 << 12
+
+# Number of values per encoded chunk whose round trip is verified
+_VERIFY_SAMPLE_SIZE = 1 << 10
+
+
+def _zigzag_encode(values):
+    """
+    Map signed integers to unsigned integers (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...).
+    Args:
+        values (np.ndarray): The int64 values to encode.
+    Returns:
+        np.ndarray: The zigzag encoded uint64 values.
+    """
+    values = values.astype(np.int64, copy=False)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _zigzag_decode(values):
+    """
+    Inverse of `_zigzag_encode`.
+    Args:
+        values (np.ndarray): The zigzag encoded unsigned values.
+    Returns:
+        np.ndarray: The decoded int64 values.
+    """
+    values = values.astype(np.uint64, copy=False)
+    magnitude = values >> np.uint64(1)
+    sign = np.uint64(0) - (values & np.uint64(1))
+    return (magnitude ^ sign).astype(np.int64)
+
+
+def _write_component(vector, offset, values):
+    """
+    Bulk write an array of unsigned integers into a sdsl4py vector.
+    Args:
+        vector: The sdsl4py vector to write to.
+        offset (int): The index of the first value to write.
+        values (np.ndarray): The values to write.
+    """
+    if isinstance(vector, _BUFFER_VECTOR_TYPES):
+        # Write straight into the words of the vector
+        np.asarray(vector)[offset:offset + len(values)] = values
+        return
+    if isinstance(vector, PackedIntVector):
+        vector.write(offset, values)
+        return
+    for i, value in enumerate(values.tolist()):
+        vector[offset + i] = value
+
+
+def _read_component(vector, index):
+    """
+    Read the values of a sdsl4py vector at a slice or an array of indices, without
+    touching the other values of the vector.
+    Args:
+        vector: The sdsl4py vector to read from.
+        index (slice | np.ndarray): A normalized slice or an array of non-negative
+            indices.
+    Returns:
+        np.ndarray: The values at the requested positions.
+    """
+    if isinstance(vector, _BUFFER_VECTOR_TYPES):
+        # Indexing the buffer view only copies the requested words
+        return np.asarray(vector)[index]
+    if isinstance(vector, PackedIntVector):
+        return vector.read(index)
+    if isinstance(index, slice):
+        index = range(*index.indices(len(vector)))
+    return np.fromiter(
+        (vector[int(i)] for i in index), dtype=np.uint64, count=len(index)
+    )
+
+
+def _component_size_in_bytes(vector):
+    """
+    Return the size in bytes of a sdsl4py vector or a PackedIntVector.
+    """
+    if isinstance(vector, PackedIntVector):
+        return vector.size_in_bytes()
+    return words_size_in_bytes(vector)
+
+
+def _to_sdsl_vector(vector):
+    """
+    Return the vector as a sdsl4py vector, unpacking a PackedIntVector (or copying
+    a memory mapped array) into a sdsl4py.int_vector_64.
+    """
+    if not isinstance(vector, (PackedIntVector, np.ndarray)):
+        return vector
+    unpacked = sdsl4py.int_vector_64(size=len(vector), default_value=0)
+    _write_component(unpacked, 0, _read_component(vector, slice(0, len(vector))))
+    return unpacked
+
+
+def _normalize_indices(index, n_elements):
+    """
+    Return a list, tuple or array of (boolean) indices as an int64 array of
+    non-negative indices.
+    Args:
+        index (list | tuple | np.ndarray): The indices, negative indices count
+            from the end like for native Python lists.
+        n_elements (int): The number of elements that are indexed.
+    Raises:
+        IndexError: If an index is out of bounds.
+    """
+    selected = np.asarray(index)
+    if selected.dtype == bool:
+        selected = np.flatnonzero(selected)
+    selected = selected.astype(np.int64, copy=False)
+    selected = np.where(selected < 0, selected + n_elements, selected)
+    if len(selected) and (selected.min() < 0 or selected.max() >= n_elements):
+        raise IndexError("Index out of bounds")
+    return selected
+
 
 class CompressedVector:
     def __init__(
@@ -8,21 +167,74 @@ class CompressedVector:
         decimal_places=0,
         int_width=64,
         dtype=float,
-        get_decompressed = True
+        get_decompressed = True,
+        encoding="split",
+        block_size=None,
+        cache_bytes=None,
+        max_error=None
     ):
         """
         Initialize the CompressedVector with default values.
         Args:
-            decimal_places (int): Number of decimal places to keep.
-            int_width (int): Width of the integer part in bits. (default: 64)
+            decimal_places (int | str): Number of decimal places to keep, or "auto"
+                to infer the smallest number of decimal places that represents the
+                values exactly (or within max_error) when the vector is filled.
+            int_width (int | str): Width of the integer part in bits (8, 16, 32 or 64),
+                or "auto" to pack every part with the minimal width needed for the
+                data. (default: 64)
+            encoding (str): How the values are stored, either "split" (integer,
+                decimal and sign part), "fixed_point" (a single zigzag encoded
+                integer, scaled by 10**decimal_places) or the name of a registered
+                codec, e.g. "xor" (lossless, decimal_places and int_width are
+                ignored). (default: "split")
+            block_size (int): If set, keep the min, max, argmin, argmax and NaN
+                count of every block of block_size values in `block_summaries`.
+                (default: None)
+            cache_bytes (int): If set, keep the most recently decoded blocks in an
+                LRU cache of at most cache_bytes bytes, so that repeated views of
+                the same region are only decoded once. (default: None)
+            max_error (float): If set, the absolute error bound of the decimal
+                places. The round trip of a sample of every encoded chunk is
+                verified (also with decimal_places "auto"), and a ValueError is
+                raised if it is not met. (default: None)
         """
+        # The decimal places are set once they are inferred from the values
+        self.auto_decimal_places = decimal_places == "auto"
+        if self.auto_decimal_places:
+            decimal_places = 0
+        if max_error is not None and max_error < 0:
+            raise ValueError("The error bound must be non-negative")
         if decimal_places < 0:
             raise ValueError("Decimal places must be non-negative")
-        if decimal_places > int_width:
+        if int_width not in INT_WIDTHS:
+            raise ValueError(
+                f"Invalid int_width: {int_width}. Valid widths are: {INT_WIDTHS}"
+            )
+        if int_width != "auto" and decimal_places > int_width:
             raise ValueError("Decimal places cannot be greater than int_width")
+        if encoding not in ENCODINGS and encoding not in CODECS:
+            raise ValueError(
+                f"Invalid encoding: {encoding}. "
+                f"Valid encodings are: {ENCODINGS + tuple(CODECS)}"
+            )
+        if block_size is not None and block_size < 1:
+            raise ValueError("Block size must be positive")
         
         self.decimal_places = decimal_places
+        self.max_error = max_error
         self.int_width = int_width
+        self.encoding = encoding
+        self.integer_part = None
+        self.decimal_part = None
+        self.sign_part = None
+        self.value_part = None
+        # The storage of the values for the encodings of a codec
+        self.codec = CODECS[encoding]() if encoding in CODECS else None
+        # The NaN values are marked in a bit vector with rank/select support
+        self.nan_bitmap = None
+        self.block_size = block_size
+        self.block_summaries = None
+        self.block_cache = BlockCache(cache_bytes) if cache_bytes else None
         self.current = 0
         self.n_elements = 0
         self.get_decompressed = get_decompressed
@@ -43,51 +255,57 @@ class CompressedVector:
         Return the number of elements in the compressed vector.
         """
         return self.n_elements
-    
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Convert the compressed vector to a NumPy array with one vectorized decode,
+        instead of the per-element sequence protocol. The array has the float64
+        dtype of the vector, unless another dtype is requested.
+
+        When the words of the integer part hold the values as is (a split encoding
+        with 0 decimal places, an integer part with a buffer of 8, 16, 32 or 64
+        bits, and no negative or NaN values), requesting the unsigned dtype of the
+        integer part returns a read-only view on its words, without a decode.
+        Args:
+            dtype: The dtype of the array. If None, the dtype of the vector.
+            copy (bool): If False, the array must share the memory of the vector,
+                which is only possible for a view on the words of the integer part.
+        """
+        raw = self._raw_array() if dtype is not None else None
+        if raw is not None and np.dtype(dtype) == raw.dtype:
+            return raw.copy() if copy else raw
+        if copy is False:
+            raise ValueError(
+                "The values of the compressed vector have to be decoded, "
+                "which requires a copy"
+            )
+        values = self._decode(slice(0, self.n_elements))
+        return values if dtype is None else values.astype(dtype, copy=False)
+
     def __getitem__(self, index):
-        if isinstance(index, int):
+        if isinstance(index, (int, np.integer)):
             # Handle negative indices like native Python lists
             if index < 0:
                 index += self.n_elements
             if index < 0 or index >= self.n_elements:
                 raise IndexError("Index out of bounds")
-            return self._reconstruct_float_value(index)
-
-        elif isinstance(index, (slice, list, np.ndarray, tuple)):
-            if self.get_decompressed:
-                if isinstance(index, slice):
-                    # Convert slice to a proper list of indices
-                    index = range(*index.indices(self.n_elements))
-
-                selected = np.array(index)
-                int_arr = np.asarray(self.integer_part)
-                dec_arr = np.asarray(self.decimal_part)
-                sign_arr = np.asarray(self.sign_part)
-
-                denom = 10 ** self.decimal_places
-                float_arr = int_arr[selected] + dec_arr[selected] / denom
-                float_arr[sign_arr[selected] == 0] *= -1
-                return float_arr
-
-            else:
-                new_vector = CompressedVector(
-                    decimal_places=self.decimal_places,
-                    int_width=self.int_width,
-                    get_decompressed=False
-                )
+            return self._reconstruct_float_value(int(index))
 
-                if isinstance(index, slice):
-                    start, stop, step = index.indices(self.n_elements)
-                    index_range = range(start, stop, step)
-                    len_index = len(index_range)
-                    new_vector.create_vector(len_index)
-                    new_vector.fill_from_vector(self, start=start, end=stop)
-                else:
-                    len_index = len(index)
-                    new_vector.create_vector(len_index)
-                    new_vector.fill_from_vector(self, start=0, end=len_index)
+        elif isinstance(index, slice):
+            start, stop, step = index.indices(self.n_elements)
+            if not self.get_decompressed:
+                # A view on the positions, which shares the storage of the vector
+                return CompressedVectorView(self, range(start, stop, step))
+            # Only decode the requested window
+            if step < 0:
+                return self._decode_cached(np.arange(start, stop, step))
+            return self._decode_cached(slice(start, stop, step))
 
-                return new_vector
+        elif isinstance(index, (list, np.ndarray, tuple)):
+            selected = _normalize_indices(index, self.n_elements)
+            if not self.get_decompressed:
+                return CompressedVectorView(self, selected)
+            return self._decode_cached(selected)
 
         else:
             raise TypeError(f"Invalid index type: {type(index)}. Expected int, slice, list or ndarray.")
@@ -103,6 +321,10 @@ class CompressedVector:
                 raise IndexError("Index out of range")
             
             self._insert_value(index, value)
+            if self.block_summaries is not None:
+                self._update_block_summary(index)
+            if self.block_cache is not None:
+                self.block_cache.invalidate(index // _CACHE_BLOCK_SIZE)
 
 
     def _insert_value(self, index, value):
@@ -112,24 +334,115 @@ class CompressedVector:
             index (int): The index to insert the value at.
             value (float): The value to insert.
         """
+        if self.codec is not None:
+            raise ValueError(f"The {self.encoding} encoding does not support item assignment")
+        if self.encoding == "fixed_point":
+            self._insert_fixed_point_value(index, value)
+            return
+
         # Check for NaN values
         if math.isnan(value):
-            # Choose how to represent NaN in your compressed format
-            # Option 1: Use a special value combination
             self.integer_part[index] = 0
             self.decimal_part[index] = 0
-            self.sign_part[index] = 2  # Special code for NaN (not 0 or 1)
+            self.sign_part[index] = 1
+            self.nan_bitmap[index] = True
             return
+        if self.nan_bitmap[index]:
+            self.nan_bitmap[index] = False
             
         # Original code for normal values
-        int_part = int(abs(value))
-        dec_part = abs(value) - int_part
-        dec_part = round(dec_part, self.decimal_places)
-        dec_part = int(dec_part * (10 ** self.decimal_places))
+        scale = 10 ** self.decimal_places
+        int_part = math.floor(abs(value))
+        dec_part = round((abs(value) - int_part) * scale)
+        if dec_part >= scale:
+            # The decimals were rounded up to a full unit
+            int_part += 1
+            dec_part -= scale
         sign_part = 1 if value >= 0 else 0
-        self.integer_part[index] = int_part
-        self.decimal_part[index] = dec_part
-        self.sign_part[index] = sign_part
+        self._set_part("integer_part", index, int_part)
+        self._set_part("decimal_part", index, dec_part)
+        self._set_part("sign_part", index, sign_part)
+
+    def _set_part(self, name, index, part):
+        """
+        Set an encoded part of the value at the specified index. A vector packed at
+        the width of the fill data (int_width="auto") is re-packed at a wider width
+        when the part does not fit it.
+        Args:
+            name (str): The attribute name of the vector of the part.
+            index (int): The index of the value.
+            part (int): The unsigned encoded part.
+        Raises:
+            ValueError: If the part does not fit a fixed int_width.
+        """
+        vector = getattr(self, name)
+        if part >> self._vector_width(vector):
+            if not isinstance(vector, PackedIntVector):
+                raise ValueError(
+                    f"The value at index {index} overflows int_width {self.int_width}, "
+                    "consider using int_width='auto'"
+                )
+            vector = vector.widened(minimal_width(part))
+            setattr(self, name, vector)
+        vector[index] = part
+
+    def _insert_fixed_point_value(self, index, value):
+        """
+        Insert a value at the specified index for the fixed_point encoding.
+        Args:
+            index (int): The index to insert the value at.
+            value (float): The value to insert.
+        """
+        if math.isnan(value):
+            self.value_part[index] = 0
+            self.nan_bitmap[index] = True
+            return
+
+        if self.nan_bitmap[index]:
+            self.nan_bitmap[index] = False
+        scaled = round(value * 10 ** self.decimal_places)
+        self._set_part("value_part", index, (scaled << 1) ^ (scaled >> 63))
+
+    def _scale_values(self, values):
+        """
+        Vectorized fixed_point encoding, scales the values to zigzag encoded
+        integers.
+        Args:
+            values (np.ndarray): The float values to encode.
+        Returns:
+            tuple: The zigzag encoded uint64 values and the NaN mask.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        nan_mask = np.isnan(values)
+        scaled = np.rint(np.where(nan_mask, 0.0, values) * 10 ** self.decimal_places)
+        return _zigzag_encode(scaled.astype(np.int64)), nan_mask
+
+    def _split_values(self, values):
+        """
+        Vectorized counterpart of `_insert_value`, splits the values into their
+        integer, decimal and sign parts.
+        Args:
+            values (np.ndarray): The float values to split.
+        Returns:
+            tuple: The integer, decimal and sign parts as uint64 arrays and the
+                NaN mask.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        nan_mask = np.isnan(values)
+        abs_values = np.abs(np.where(nan_mask, 0.0, values))
+
+        scale = 10 ** self.decimal_places
+        int_part = np.floor(abs_values)
+        dec_part = np.rint((abs_values - int_part) * scale)
+        # The decimals that were rounded up to a full unit are carried over
+        carry = dec_part >= scale
+        int_part[carry] += 1
+        dec_part[carry] -= scale
+
+        sign_part = (values >= 0).astype(np.uint64)
+        sign_part[nan_mask] = 1
+        parts = int_part.astype(np.uint64), dec_part.astype(np.uint64), sign_part
+        return parts, nan_mask
 
     def set_decompressed_config(self, get_decompressed):
         """
@@ -142,9 +455,13 @@ class CompressedVector:
     def create_vector(self, size):
         """
         Create the integer and decimal vectors.
+        With int_width "auto", the vectors are only created when they are filled,
+        once the needed width is known.
         """
         self.n_elements = size
         match self.int_width:
+            case "auto":
+                pass
             case 8:
                 self._create_vector(sdsl4py.int_vector_8)
             case 16:
@@ -154,8 +471,10 @@ class CompressedVector:
             case 64:
                 self._create_vector(sdsl4py.int_vector_64)
             case _:
-                print(f"Unsupported int_width: {self.int_width}, defaulting to 64")
-                self._create_vector(sdsl4py.int_vector_64)
+                raise ValueError(
+                    f"Invalid int_width: {self.int_width}. "
+                    f"Valid widths are: {INT_WIDTHS}"
+                )
 
     
     def fill_from_vector(self, original_vector, start=0, end=None):
@@ -166,7 +485,7 @@ class CompressedVector:
             start (int): The start index in the original vector (inclusive).
             end (int): The end index in the original vector (exclusive). If None, use the length of the vector.
         """
-        if self.integer_part is None or self.decimal_part is None or self.sign_part is None:
+        if self.int_width != "auto" and not self._vectors_created():
             raise ValueError("Vectors not created. Call create_vector() first.")
         
         # Handle default end value and validate indices
@@ -177,51 +496,226 @@ class CompressedVector:
         
         # Ensure start is valid
         start = max(0, start)
-        
-        for i in range(start, end):
-            self.current += 1
-            self._insert_value(self.current - 1, original_vector[i])
-                
-        self.n_elements = (end - start)
+
+        self._fill(lambda: self._vector_chunks(original_vector, start, end), end - start)
+
+    def _fill(self, value_chunks, size):
+        """
+        Encode a stream of values into the vectors. With int_width "auto", the
+        stream is read twice: once for the minimal width of every part, and once to
+        write the parts.
+        Args:
+            value_chunks (callable): Returns an iterator over the float64 chunks of
+                the values, called once per pass.
+            size (int): The (maximum) number of values of the stream.
+        """
+        if self.codec is not None:
+            self._fill_codec(value_chunks, size)
+            return
+        if self.auto_decimal_places:
+            self.decimal_places = self._infer_decimal_places(value_chunks())
+        if self.int_width == "auto":
+            # First pass: scan the data for the minimal width of every part
+            max_values = [0] * len(self._vector_names())
+            size = 0
+            for offset, _, parts, nan_mask in self._encode_chunks(value_chunks()):
+                max_values = [
+                    max(max_value, int(part.max())) if len(part) else max_value
+                    for max_value, part in zip(max_values, parts)
+                ]
+                size = offset + len(nan_mask)
+            for name, max_value in zip(self._vector_names(), max_values):
+                vector = PackedIntVector(size, minimal_width(max_value))
+                setattr(self, name, vector)
+
+        self.nan_bitmap = BitVector(size)
+        n_values = 0
+        overflow = False
+        verify = self.auto_decimal_places or self.max_error is not None
+        for offset, values, parts, nan_mask in self._encode_chunks(value_chunks()):
+            for vector, part in zip(self._vectors(), parts):
+                if len(part) and int(part.max()) >> self._vector_width(vector):
+                    overflow = True
+                _write_component(vector, offset, part)
+            self.nan_bitmap.write(offset, nan_mask)
+            n_values = offset + len(nan_mask)
+            if verify and len(values):
+                # Decode a sample back from the vectors, which also catches an
+                # overflow of the integer widths
+                sample = np.unique(np.linspace(
+                    0, len(values) - 1, min(len(values), _VERIFY_SAMPLE_SIZE)
+                ).astype(np.int64))
+                check_round_trip(
+                    values[sample],
+                    self._decode(offset + sample),
+                    self.max_error,
+                    offset,
+                )
+
+        if overflow:
+            warnings.warn(
+                f"Values overflow int_width {self.int_width} and are truncated, "
+                "consider using int_width='auto'",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+        self._filled(n_values)
+
+    def _infer_decimal_places(self, value_chunks):
+        """
+        Return the smallest number of decimal places that represents the values of
+        every chunk exactly, or within max_error.
+        Args:
+            value_chunks (iterable): The float64 chunks of the values.
+        """
+        decimal_places = 0
+        for values in value_chunks:
+            values = np.asarray(values, dtype=np.float64)
+            finite = values[np.isfinite(values)]
+            if np.all(
+                decimal_errors(finite, decimal_places)
+                <= allowed_errors(finite, self.max_error)
+            ):
+                continue
+            decimal_places = infer_decimal_places(
+                finite, self.max_error, min_decimal_places=decimal_places + 1
+            )
+            if decimal_places is None:
+                bound = "exactly" if self.max_error is None else f"within {self.max_error}"
+                raise ValueError(
+                    f"The values cannot be represented {bound} with up to "
+                    f"{MAX_DECIMAL_PLACES} decimal places, use a larger max_error "
+                    "or a lossless codec (encoding='xor')"
+                )
+        return decimal_places
+
+    def _fill_codec(self, value_chunks, size):
+        """
+        Encode a stream of values with the codec, and mark the NaN values.
+        Args:
+            value_chunks (callable): Returns an iterator over the float64 chunks of
+                the values.
+            size (int): The (maximum) number of values of the stream.
+        """
+        self.nan_bitmap = BitVector(size)
+
+        def marked_chunks():
+            offset = 0
+            for values in value_chunks():
+                values = np.asarray(values, dtype=np.float64)
+                self.nan_bitmap.write(offset, np.isnan(values))
+                offset += len(values)
+                yield values
+
+        self._filled(self.codec.encode(marked_chunks()))
+
+    def _filled(self, n_values):
+        """
+        Set the length after the vector was filled, and summarize it.
+        """
+        self.n_elements = n_values
         self.current = 0
+        if self.block_size is not None:
+            self._build_block_summaries()
+        if self.block_cache is not None:
+            self.block_cache.clear()
+
+    def _build_block_summaries(self):
+        """
+        Summarize every block of the (filled) compressed vector.
+        """
+        self.block_summaries = BlockSummaries(self.n_elements, self.block_size)
+        # Decode whole blocks per pass
+        chunk_size = max(_ENCODE_CHUNK_SIZE // self.block_size, 1) * self.block_size
+        for start in range(0, self.n_elements, chunk_size):
+            stop = min(start + chunk_size, self.n_elements)
+            self.block_summaries.update(start, self._decode(slice(start, stop)))
+
+    def _update_block_summary(self, index):
+        """
+        Summarize the block that contains the index again, after it was changed.
+        """
+        start = index - index % self.block_size
+        stop = min(start + self.block_size, self.n_elements)
+        self.block_summaries.update(start, self._decode(slice(start, stop)))
+
+    def _vector_chunks(self, original_vector, start, end):
+        """
+        Read the values of a vector in chunks, so that the temporary arrays stay
+        bounded.
+        Args:
+            original_vector (list): The vector to read.
+            start (int): The start index in the vector (inclusive).
+            end (int): The end index in the vector (exclusive).
+        Yields:
+            np.ndarray: The float64 values of every chunk.
+        """
+        for chunk_start in range(start, end, _ENCODE_CHUNK_SIZE):
+            chunk_end = min(chunk_start + _ENCODE_CHUNK_SIZE, end)
+            if isinstance(original_vector, CompressedVector):
+                yield original_vector._decode(slice(chunk_start, chunk_end))
+            else:
+                yield np.asarray(
+                    original_vector[chunk_start:chunk_end], dtype=np.float64
+                )
+
+    def _encode_chunks(self, value_chunks):
+        """
+        Encode chunks of values.
+        Args:
+            value_chunks (iterable): The float64 chunks of the values.
+        Yields:
+            tuple: The offset of the chunk, the float64 values, the encoded parts
+                (in the order of `_vector_names`) and the NaN mask.
+        """
+        offset = 0
+        for values in value_chunks:
+            values = np.asarray(values, dtype=np.float64)
+            if self.encoding == "fixed_point":
+                scaled, nan_mask = self._scale_values(values)
+                yield offset, values, (scaled,), nan_mask
+            else:
+                parts, nan_mask = self._split_values(values)
+                yield offset, values, parts, nan_mask
+            offset += len(values)
 
     def fill_from_file(self, file_path, column=1, delimiter=";", truncate=None):
         """
-        Build the compressed vector from a specific column in a csv file.
+        Build the compressed vector from a specific column in a csv file. The file is
+        streamed in chunks of rows, so the memory use is bounded by the chunk size
+        instead of the file size. The rows are counted up front, so that the vectors
+        are only sized once.
         Args:
             file_path (str): The path to the file containing the original vector.
             column (int): The column index (0-based) to extract the vector from.
             delimiter (str): The delimiter used in the csv file.
             truncate (int): The maximum number of rows to process. If None, process all rows.
+        Returns:
+            int: The number of rows of the file (up to truncate).
         """
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-            original_vector = []
-            for i, line in enumerate(lines):
-                if truncate is not None and i >= truncate:
-                    break
-                values = line.strip().split(delimiter)
-                if len(values) > column:
-                    value_to_add = values[column]
-                    try:
-                        value_to_add = float(value_to_add)
-                        self.current += 1
-                        self._insert_value(self.current-1, value_to_add)
-                    except ValueError:
-                        print(f"Invalid value at line {i}: {value_to_add}")
-                    
-            self.n_elements = len(original_vector)
-            self.current = 0
-    
+        n_rows = count_rows(file_path, truncate)
+        if self.int_width != "auto" and (
+            not self._vectors_created() or len(self._vectors()[0]) < n_rows
+        ):
+            self.create_vector(n_rows)
+        self._fill(
+            lambda: read_column_chunks(file_path, column, delimiter, truncate), n_rows
+        )
+        return n_rows
+
     def size_in_bytes(self):
         """
         Return the size in bytes of the compressed vector.
         """ 
         total = (
                 # sdsl4py vectors
-                sdsl4py.size_in_bytes(self.integer_part) 
-                + sdsl4py.size_in_bytes(self.decimal_part)
-                + sdsl4py.size_in_bytes(self.sign_part)
+                sum(_component_size_in_bytes(vector) for vector in self._vectors())
+                + (self.codec.size_in_bytes() if self.codec is not None else 0)
+                + (self.nan_bitmap.size_in_bytes() if self.nan_bitmap is not None else 0)
+                + (
+                    self.block_summaries.size_in_bytes()
+                    if self.block_summaries is not None else 0
+                )
 
                 # self attributes
                 + self.n_elements.__sizeof__()
@@ -230,19 +724,118 @@ class CompressedVector:
                 )
         return total
     
+    def save(self, file_path):
+        """
+        Save the compressed vector to a single file: a header, the packed
+        component vectors, the NaN bitmap and the block summaries (if any). The
+        file can be reopened with `CompressedVector.open` without decoding.
+        Args:
+            file_path (str): The path of the file to write.
+        """
+        if not self._vectors_created() or self.nan_bitmap is None:
+            raise ValueError("The vector is not filled. Call fill_from_vector() first.")
+
+        components = {}
+        arrays = {}
+        for name, vector in zip(self._vector_names(), self._vectors()):
+            if isinstance(vector, PackedIntVector):
+                components[name] = {
+                    "kind": "packed", "width": vector.width, "size": len(vector)
+                }
+                arrays[name] = np.asarray(vector.words)
+            elif isinstance(vector, _BUFFER_VECTOR_TYPES):
+                components[name] = {"kind": "int", "size": len(vector)}
+                arrays[name] = np.asarray(vector)
+            else:
+                raise ValueError(
+                    f"{type(vector).__name__} vectors cannot be saved, "
+                    "save the vector before calling compress()"
+                )
+        codec = None
+        if self.codec is not None:
+            codec, codec_arrays = self.codec.to_arrays()
+            for name, array in codec_arrays.items():
+                arrays[f"codec.{name}"] = array
+        arrays["nan_bitmap"] = np.asarray(self.nan_bitmap.words)
+        if self.block_summaries is not None:
+            for name in BlockSummaries.ARRAY_NAMES:
+                arrays[f"summaries.{name}"] = getattr(self.block_summaries, name)
+
+        header = {
+            "encoding": self.encoding,
+            "decimal_places": self.decimal_places,
+            "int_width": self.int_width,
+            "n_elements": self.n_elements,
+            "block_size": self.block_size if self.block_summaries is not None else None,
+            "components": components,
+            "codec": codec,
+        }
+        write_sections(file_path, header, arrays)
+
+    @classmethod
+    def open(cls, file_path, mode="r", get_decompressed=True, cache_bytes=None):
+        """
+        Open a compressed vector saved with `save`. The vectors are memory mapped,
+        so only the pages of the values that are accessed are loaded.
+        Args:
+            file_path (str): The path of the file to open.
+            mode (str): The numpy.memmap mode, "r" (read-only), "r+" (changes are
+                written to the file) or "c" (copy-on-write). (default: "r")
+            get_decompressed (bool): Whether to return decompressed values.
+            cache_bytes (int): The byte budget of the block cache, if any.
+        Returns:
+            CompressedVector: The compressed vector.
+        """
+        header, arrays = read_sections(file_path, mode)
+        vector = cls(
+            decimal_places=header["decimal_places"],
+            int_width=header["int_width"],
+            get_decompressed=get_decompressed,
+            encoding=header["encoding"],
+            block_size=header["block_size"],
+            cache_bytes=cache_bytes,
+        )
+        vector.n_elements = header["n_elements"]
+        for name, component in header["components"].items():
+            if component["kind"] == "packed":
+                setattr(vector, name, PackedIntVector.from_words(
+                    arrays[name], component["size"], component["width"]
+                ))
+            else:
+                setattr(vector, name, arrays[name])
+        if header.get("codec") is not None:
+            vector.codec = CODECS[header["encoding"]].from_arrays(
+                header["codec"],
+                {
+                    name[len("codec."):]: array
+                    for name, array in arrays.items()
+                    if name.startswith("codec.")
+                },
+            )
+        vector.nan_bitmap = BitVector.from_words(arrays["nan_bitmap"], vector.n_elements)
+        if header["block_size"] is not None:
+            vector.block_summaries = BlockSummaries.from_arrays(
+                vector.n_elements,
+                header["block_size"],
+                {
+                    name: arrays[f"summaries.{name}"]
+                    for name in BlockSummaries.ARRAY_NAMES
+                },
+            )
+        return vector
+
     def compress(self, vector_type=sdsl4py.int_vector_64):
         """
         Compress the vector using the specified vector type.
         Args:
             vector_type: The type of vector to use for compression.
         """
-        if self.integer_part is None or self.decimal_part is None or self.sign_part is None:
+        if not self._vectors_created():
             raise ValueError("Vectors not created. Call create_vector() first.")
         
         # Create compressed vectors
-        self.integer_part = vector_type(self.integer_part)
-        self.decimal_part = vector_type(self.decimal_part)
-        self.sign_part = vector_type(self.sign_part)
+        for name, vector in zip(self._vector_names(), self._vectors()):
+            setattr(self, name, vector_type(_to_sdsl_vector(vector)))
 
     def destroy(self):
         """
@@ -257,6 +850,15 @@ class CompressedVector:
         if self.sign_part is not None:
             del self.sign_part
             self.sign_part = None
+        if self.value_part is not None:
+            del self.value_part
+            self.value_part = None
+        if self.codec is not None:
+            self.codec = type(self.codec)()
+        self.nan_bitmap = None
+        self.block_summaries = None
+        if self.block_cache is not None:
+            self.block_cache.clear()
         
         # Reset attributes
         self.n_elements = 0
@@ -267,9 +869,14 @@ class CompressedVector:
         """
         Create the integer and decimal vectors with the specified type.
         """
-        self.integer_part = vector_type(size=self.n_elements, default_value=0)
-        self.decimal_part = vector_type(size=self.n_elements, default_value=0)
-        self.sign_part = vector_type(size=self.n_elements, default_value=0)
+        for name in self._vector_names():
+            if name == "sign_part":
+                # The sign is a single bit, the NaNs are marked in the NaN bitmap
+                vector = PackedIntVector(self.n_elements, 1)
+            else:
+                vector = vector_type(size=self.n_elements, default_value=0)
+            setattr(self, name, vector)
+        self.nan_bitmap = BitVector(self.n_elements)
 
     def _reconstruct_float_value(self, index):
         """
@@ -282,14 +889,271 @@ class CompressedVector:
         Returns:
             float: Reconstructed value with correct sign
         """
-        if self.sign_part[index] == 2:
+        if self.nan_bitmap[index]:
             return float('nan')
+        if self.codec is not None:
+            return self.codec.value(index)
+        if self.encoding == "fixed_point":
+            zigzag = int(self.value_part[index])
+            return ((zigzag >> 1) ^ -(zigzag & 1)) / (10 ** self.decimal_places)
         value = (
             self.integer_part[index]  # integer part
             + self.decimal_part[index] / (10 ** self.decimal_places)  # decimal part
         )
         return value if self.sign_part[index] == 1 else -value  # sign part
     
+    def _decode(self, index):
+        """
+        Vectorized counterpart of `_reconstruct_float_value`, decodes the values
+        at a slice or an array of indices.
+        Args:
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The reconstructed float values.
+        """
+        if self.codec is not None:
+            return self.codec.decode(index)
+        parts = [_read_component(vector, index) for vector in self._vectors()]
+        return self._join_values(parts, self.nan_bitmap.get(index))
+
+    def _join_values(self, parts, nan_mask):
+        """
+        Inverse of `_split_values` (or `_scale_values` for the fixed_point
+        encoding), combines the encoded parts into float values.
+        Args:
+            parts (list): The encoded parts, in the order of `_vector_names`.
+            nan_mask (np.ndarray): The NaN mask.
+        Returns:
+            np.ndarray: The reconstructed float values.
+        """
+        if self.encoding == "fixed_point":
+            float_arr = _zigzag_decode(parts[0]) / (10 ** self.decimal_places)
+            float_arr[nan_mask] = np.nan
+            return float_arr
+
+        int_arr, dec_arr, sign_arr = parts
+        denom = 10 ** self.decimal_places
+        float_arr = int_arr + dec_arr / denom
+        float_arr[sign_arr == 0] *= -1
+        float_arr[nan_mask] = np.nan
+        return float_arr
+
+    def quantize(self, values):
+        """
+        Return the values as the compressed vector would decode them, i.e. rounded
+        to decimal_places by the encoding, without storing them.
+        Args:
+            values (np.ndarray): The float values.
+        Returns:
+            np.ndarray: The quantized float values.
+        """
+        if self.codec is not None:
+            return self.codec.quantize(values)
+        if self.encoding == "fixed_point":
+            scaled, nan_mask = self._scale_values(values)
+            return self._join_values([scaled], nan_mask)
+        parts, nan_mask = self._split_values(values)
+        return self._join_values(list(parts), nan_mask)
+
+    def _decode_cached(self, index):
+        """
+        Decode the values at a slice or an array of indices through the block
+        cache. Without a cache, or for a window that does not fit in the cache, the
+        values are decoded directly.
+        Args:
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The reconstructed float values.
+        """
+        if self.block_cache is None:
+            return self._decode(index)
+        k = _CACHE_BLOCK_SIZE
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step or 1
+            if start >= stop or (stop - start) * 8 > self.block_cache.max_bytes:
+                # A window larger than the cache would evict all the hot blocks
+                return self._decode(index)
+            first_block = start // k
+            blocks = range(first_block, (stop - 1) // k + 1)
+            values = np.concatenate([self._cached_block(block) for block in blocks])
+            offset = first_block * k
+            return values[start - offset:stop - offset:step]
+
+        if not len(index) or len(index) * 8 > self.block_cache.max_bytes:
+            return self._decode(index)
+        blocks, block_pos = np.unique(index // k, return_inverse=True)
+        decoded = [self._cached_block(block) for block in blocks]
+        # The position of every block in the concatenated blocks
+        offsets = np.concatenate(([0], np.cumsum([len(block) for block in decoded])))
+        values = np.concatenate(decoded)
+        return values[offsets[block_pos.ravel()] + index % k]
+
+    def _raw_array(self):
+        """
+        Return a read-only view on the words of the integer part, when they hold
+        the values as is (see `__array__`), otherwise None.
+        """
+        if (
+            self.encoding != "split"
+            or self.decimal_places != 0
+            or not isinstance(self.integer_part, _BUFFER_VECTOR_TYPES)
+            or not isinstance(self.sign_part, PackedIntVector)
+            or self.nan_bitmap is None
+        ):
+            return None
+        # Every sign bit must be set (non-negative), the padding bits are unset
+        sign_words = np.asarray(self.sign_part.words)
+        if int(_popcount(sign_words).sum()) != self.n_elements or self.count_nans():
+            return None
+        raw = np.asarray(self.integer_part)[:self.n_elements]
+        raw.flags.writeable = False
+        return raw
+
+    def _cached_block(self, block):
+        """
+        Return the decoded values of a cache block, decoding it on a cache miss.
+        """
+        values = self.block_cache.get(block)
+        if values is None:
+            start = block * _CACHE_BLOCK_SIZE
+            stop = min(start + _CACHE_BLOCK_SIZE, self.n_elements)
+            values = self._decode(slice(start, stop))
+            self.block_cache.put(block, values)
+        return values
+
+    def cache_info(self):
+        """
+        Return the hits, misses and size of the block cache, or None without a
+        cache.
+        """
+        return self.block_cache.info() if self.block_cache is not None else None
+
+    def searchsorted(self, values, side="left"):
+        """
+        Find the positions where values would be inserted to keep the (sorted)
+        vector sorted, like np.searchsorted. The first value of every cache block
+        is used to narrow the search down to one block, which is decoded (through
+        the block cache) and searched.
+        Args:
+            values (float | array_like): The value(s) to insert.
+            side (str): "left" or "right", as for np.searchsorted.
+        Returns:
+            int | np.ndarray: The insertion position(s), an int for a single value.
+        """
+        k = _CACHE_BLOCK_SIZE
+        return searchsorted_blocks(
+            values,
+            side,
+            self.n_elements,
+            k,
+            first_value=lambda block: self._reconstruct_float_value(block * k),
+            search_block=lambda block, block_values, side: np.searchsorted(
+                self._decode_cached(
+                    slice(block * k, min((block + 1) * k, self.n_elements), 1)
+                ),
+                block_values,
+                side,
+            ),
+        )
+
+    def count_nans(self, start=0, end=None):
+        """
+        Return the number of NaN values in [start, end), in O(1) with the rank
+        support of the NaN bitmap.
+        Args:
+            start (int): The start index (inclusive).
+            end (int): The end index (exclusive). If None, use the length of the vector.
+        """
+        end = self.n_elements if end is None else min(end, self.n_elements)
+        start = max(0, start)
+        if start >= end:
+            return 0
+        return self.nan_bitmap.rank(end) - self.nan_bitmap.rank(start)
+
+    def non_nan_runs(self, start=0, end=None):
+        """
+        Return the runs of non-NaN values in [start, end), found with the select
+        support of the NaN bitmap instead of a scan.
+        Args:
+            start (int): The start index (inclusive).
+            end (int): The end index (exclusive). If None, use the length of the vector.
+        Returns:
+            tuple: The start (inclusive) and end (exclusive) indices of the runs.
+        """
+        end = self.n_elements if end is None else min(end, self.n_elements)
+        return self.nan_bitmap.zero_runs(max(0, start), end)
+
+    def _vector_names(self):
+        """
+        Return the attribute names of the vectors of the current encoding, none
+        for a codec, which keeps its own vectors.
+        """
+        if self.codec is not None:
+            return []
+        if self.encoding == "fixed_point":
+            return ["value_part"]
+        return ["integer_part", "decimal_part", "sign_part"]
+
+    def _vectors(self):
+        """
+        Return the sdsl4py vectors of the current encoding.
+        """
+        return [getattr(self, name) for name in self._vector_names()]
+
+    def _vector_width(self, vector):
+        """
+        Return the number of bits per value of one of the vectors.
+        """
+        if isinstance(vector, PackedIntVector):
+            return vector.width
+        return self.int_width if self.int_width in (8, 16, 32, 64) else 64
+
+    @property
+    def component_widths(self):
+        """
+        Return the number of bits per value of every vector, e.g.
+        {"integer_part": 11, "decimal_part": 14, "sign_part": 1}.
+        """
+        return {
+            name: self._vector_width(vector)
+            for name, vector in zip(self._vector_names(), self._vectors())
+            if vector is not None
+        }
+
+    @property
+    def bits_per_value(self):
+        """
+        Return the average number of bits used per value, based on size_in_bytes.
+        """
+        if self.n_elements == 0:
+            return 0.0
+        return self.size_in_bytes() * 8 / self.n_elements
+
+    @property
+    def is_monotonic_increasing(self):
+        """
+        Return whether the values are (non-strictly) increasing, decoded in chunks
+        instead of value by value. As in pandas, NaN values are not monotonic.
+        """
+        if self.count_nans():
+            return False
+        previous = -np.inf
+        for start in range(0, self.n_elements, _ENCODE_CHUNK_SIZE):
+            stop = min(start + _ENCODE_CHUNK_SIZE, self.n_elements)
+            values = self._decode(slice(start, stop))
+            if values[0] < previous or np.any(np.diff(values) < 0):
+                return False
+            previous = values[-1]
+        return True
+
+    def _vectors_created(self):
+        """
+        Return whether the sdsl4py vectors of the current encoding are created.
+        """
+        return all(vector is not None for vector in self._vectors())
+
     @property
     def dtype(self):
         """
@@ -308,3 +1172,143 @@ class CompressedVector:
     @property
     def size(self):
         return self.n_elements
+
+
+class CompressedVectorView:
+    """
+    A lazy view on positions of a CompressedVector, as returned by indexing a
+    vector with get_decompressed=False.
+
+    The view shares the storage of its vector and only keeps the positions it
+    selects: an offset, length and stride (a range) for a slice, or an array of
+    positions for a list or an array of indices. Slicing a view composes the
+    positions in O(1), and the values are only decoded when the view is
+    converted into an array (e.g. with np.asarray) or a single value is read.
+    """
+
+    def __init__(self, vector, positions):
+        """
+        Args:
+            vector (CompressedVector): The vector whose storage is shared.
+            positions (range | np.ndarray): The positions in the vector, a range
+                or an int64 array of non-negative positions.
+        """
+        self.vector = vector
+        self.positions = positions
+
+    def __len__(self):
+        """
+        Return the number of elements in the view.
+        """
+        return len(self.positions)
+
+    def __iter__(self):
+        # Decode chunk by chunk, instead of value by value
+        for start in range(0, len(self), _ENCODE_CHUNK_SIZE):
+            yield from self[start:start + _ENCODE_CHUNK_SIZE].decompress().tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Decode the values of the view into a NumPy array.
+        """
+        if copy is False:
+            raise ValueError("The values of a view have to be decoded, which requires a copy")
+        values = self.decompress()
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            # Handle negative indices like native Python lists
+            if index < 0:
+                index += len(self)
+            if index < 0 or index >= len(self):
+                raise IndexError("Index out of bounds")
+            return self.vector._reconstruct_float_value(int(self.positions[index]))
+
+        elif isinstance(index, slice):
+            # Slicing a range or an array does not copy the positions
+            return CompressedVectorView(self.vector, self.positions[index])
+
+        elif isinstance(index, (list, np.ndarray, tuple)):
+            selected = _normalize_indices(index, len(self))
+            if isinstance(self.positions, range):
+                positions = self.positions.start + self.positions.step * selected
+            else:
+                positions = self.positions[selected]
+            return CompressedVectorView(self.vector, positions)
+
+        raise TypeError(
+            f"Invalid index type: {type(index)}. Expected int, slice, list or ndarray."
+        )
+
+    @property
+    def offset(self):
+        """
+        Return the position of the first element of a slice view in the vector.
+        """
+        return self.positions.start if isinstance(self.positions, range) else None
+
+    @property
+    def stride(self):
+        """
+        Return the step between the positions of a slice view in the vector.
+        """
+        return self.positions.step if isinstance(self.positions, range) else None
+
+    def decompress(self):
+        """
+        Decode the values of the view, only the blocks of its positions are
+        decoded.
+        Returns:
+            np.ndarray: The reconstructed float values.
+        """
+        positions = self.positions
+        if isinstance(positions, range):
+            if positions.step > 0:
+                return self.vector._decode_cached(
+                    slice(positions.start, positions.stop, positions.step)
+                )
+            positions = np.arange(positions.start, positions.stop, positions.step)
+        return self.vector._decode_cached(positions)
+
+    def count_nans(self, start=0, end=None):
+        """
+        Return the number of NaN values in [start, end) of the view.
+        """
+        end = len(self) if end is None else min(end, len(self))
+        start = max(0, start)
+        if start >= end:
+            return 0
+        positions = self.positions[start:end]
+        if isinstance(positions, range) and positions.step == 1:
+            # With the rank support of the NaN bitmap of the vector
+            return self.vector.count_nans(positions.start, positions.stop)
+        return int(np.isnan(CompressedVectorView(self.vector, positions).decompress()).sum())
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the positions of the view, the storage of the
+        values is shared with the vector.
+        """
+        if isinstance(self.positions, range):
+            return 3 * (0).__sizeof__()
+        return self.positions.nbytes
+
+    @property
+    def dtype(self):
+        """
+        Return the data type of the view.
+        """
+        return self.vector.dtype
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def size(self):
+        return len(self)
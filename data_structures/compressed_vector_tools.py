@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from data_structures import compressed_vector
+from data_structures.encoding_tuner import choose_encoding
 
-def convert_vectors_to_sdsl4py(*args, decimal_places=4, int_width=64):
+def convert_vectors_to_sdsl4py(
+    *args, decimal_places=4, int_width=64, auto_tune=False, n_workers=None
+):
     """
     Convert multiple vectors to sdsl4py format.
     
@@ -8,19 +12,55 @@ def convert_vectors_to_sdsl4py(*args, decimal_places=4, int_width=64):
     ----------
     *args : list, numpy.ndarray, etc.
         Any number of vectors to convert.
+    auto_tune : bool
+        If True, choose the encoding, bit width and decimal places of every vector
+        from a sample of it (see `encoding_tuner.choose_encoding`), instead of
+        using decimal_places and int_width.
+    n_workers : int
+        The number of threads that convert the vectors in parallel. The encoding
+        runs in vectorized NumPy kernels, which release the GIL, so the threads
+        share the data without copies or pickling. If None or 1, the vectors are
+        converted one after another.
         
     Returns:
     -------
     list
-        List of converted vectors.
+        List of converted vectors, in the order of the arguments. With auto_tune,
+        a tuple of the list of converted vectors and the list of the
+        `EncodingChoice` reports.
     """
-    converted_vectors = []
-    for vec in args:
-        c_vec = compressed_vector.CompressedVector(
-            int_width=int_width,
-            decimal_places=decimal_places
-        )
-        c_vec.create_vector(len(vec))
-        c_vec.fill_from_vector(vec)
-        converted_vectors.append(c_vec)
-    return converted_vectors
\ No newline at end of file
+    def convert(vec):
+        return _convert_vector(vec, decimal_places, int_width, auto_tune)
+
+    if n_workers is not None and n_workers < 1:
+        raise ValueError("The number of workers must be positive")
+    if n_workers is None or n_workers == 1 or len(args) < 2:
+        results = [convert(vec) for vec in args]
+    else:
+        with ThreadPoolExecutor(max_workers=min(n_workers, len(args))) as executor:
+            results = list(executor.map(convert, args))
+
+    converted_vectors = [vector for vector, _ in results]
+    if auto_tune:
+        return converted_vectors, [choice for _, choice in results]
+    return converted_vectors
+
+def _convert_vector(vec, decimal_places, int_width, auto_tune):
+    """
+    Convert a single vector, see `convert_vectors_to_sdsl4py`.
+
+    Returns:
+    -------
+    tuple
+        The converted vector and its `EncodingChoice` (None without auto_tune).
+    """
+    if auto_tune:
+        choice = choose_encoding(vec)
+        return choice.build(vec), choice
+    c_vec = compressed_vector.CompressedVector(
+        int_width=int_width,
+        decimal_places=decimal_places
+    )
+    c_vec.create_vector(len(vec))
+    c_vec.fill_from_vector(vec)
+    return c_vec, None
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Number of bytes read per pass when counting the rows of a file
+_COUNT_CHUNK_BYTES = 1 << 24
+
+# Number of rows parsed per chunk
+_PARSE_CHUNK_ROWS = 1 << 20
+
+# The texts of a NaN value, as accepted by float() (case insensitive). Other texts
+# pandas reads as NaN by default, e.g. an empty field or "NA", are invalid values
+_NAN_TEXTS = ("nan", "+nan", "-nan")
+
+
+def count_rows(file_path, truncate=None):
+    """
+    Count the rows of a csv file, by counting the line breaks in large binary
+    chunks instead of parsing the rows.
+    Args:
+        file_path (str): The path of the csv file.
+        truncate (int): The maximum number of rows. If None, count all rows.
+    Returns:
+        int: The number of rows, an upper bound on the number of values of a column
+            (the blank lines are counted as well).
+    """
+    n_rows = 0
+    last_byte = b"\n"
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(_COUNT_CHUNK_BYTES)
+            if not chunk:
+                break
+            n_rows += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    if last_byte != b"\n":
+        # The last row has no line break
+        n_rows += 1
+    return n_rows if truncate is None else min(n_rows, truncate)
+
+
+def read_column_chunks(file_path, column=1, delimiter=";", truncate=None, chunk_rows=None):
+    """
+    Read a column of a csv file in chunks of rows, with the vectorized pandas csv
+    parser, so that the memory use is bounded by the chunk size.
+    Invalid values, e.g. an empty field or a row without the column, are reported
+    and skipped, only the texts of a NaN value (e.g. "nan") are read as NaN.
+    Args:
+        file_path (str): The path of the csv file.
+        column (int): The column index (0-based) to read.
+        delimiter (str): The delimiter used in the csv file.
+        truncate (int): The maximum number of rows to read. If None, read all rows.
+        chunk_rows (int): The number of rows per chunk. If None, use the default.
+    Yields:
+        np.ndarray: The float64 values of every chunk.
+    """
+    if truncate == 0:
+        return
+    if chunk_rows is None:
+        chunk_rows = _PARSE_CHUNK_ROWS
+    try:
+        reader = pd.read_csv(
+            file_path,
+            sep=delimiter,
+            header=None,
+            usecols=[column],
+            keep_default_na=False,
+            na_values=[*_NAN_TEXTS, "NaN", "NAN"],
+            nrows=truncate,
+            chunksize=chunk_rows,
+            engine="c",
+        )
+    except pd.errors.EmptyDataError:
+        return
+    with reader:
+        for chunk in reader:
+            values = chunk[column]
+            if not pd.api.types.is_numeric_dtype(values):
+                # Only the chunks with invalid values take this slower path
+                parsed = pd.to_numeric(values, errors="coerce")
+                # The parser only reads the texts of a NaN value as missing values
+                is_nan = values.isna() | (
+                    values.astype(str).str.strip().str.lower().isin(_NAN_TEXTS)
+                )
+                invalid = parsed.isna() & ~is_nan
+                for line, value in values[invalid].items():
+                    print(f"Invalid value at line {line}: {value}")
+                values = parsed[~invalid]
+            yield values.to_numpy(dtype=np.float64)
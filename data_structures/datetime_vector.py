@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from data_structures.delta_vector import DeltaVector
+
+
+class DatetimeVector:
+    """
+    A compressed vector of timestamps, e.g. a datetime x-axis.
+
+    The timestamps are stored as int64 nanoseconds since the epoch (UTC) in a
+    DeltaVector, so a fixed sampling rate needs about a single bit per value, and
+    the timezone is kept as metadata.
+
+    Indexing behaves like a pd.DatetimeIndex: a position returns a pd.Timestamp,
+    and a slice or an array of positions returns a pd.DatetimeIndex, in the
+    timezone of the vector. Only the blocks of the requested positions are
+    decoded.
+    """
+
+    def __init__(self, tz=None, anchor_interval=128):
+        """
+        Initialize the DatetimeVector with default values.
+        Args:
+            tz (str | tzinfo): The timezone of the timestamps. If None, the timezone
+                of the data that fills the vector is used (if any).
+            anchor_interval (int): Number of values per block of the DeltaVector.
+        """
+        self.tz = tz
+        self.nanoseconds = DeltaVector(0, anchor_interval, dtype=np.int64)
+
+    def __len__(self):
+        """
+        Return the number of elements in the datetime vector.
+        """
+        return len(self.nanoseconds)
+
+    def __iter__(self):
+        for nanoseconds in self.nanoseconds:
+            yield self._to_timestamp(nanoseconds)
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Convert the datetime vector to a NumPy array, like a pd.DatetimeIndex.
+        """
+        return np.asarray(self[:], dtype=dtype)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self._to_timestamp(self.nanoseconds[index])
+        return self._to_index(self.nanoseconds[index])
+
+    def create_vector(self, size):
+        """
+        Set the size of the datetime vector, the vectors are created when filled.
+        """
+        self.nanoseconds.create_vector(size)
+
+    def fill_from_vector(self, original_vector, start=0, end=None):
+        """
+        Build the datetime vector from timestamps.
+        Args:
+            original_vector (pd.DatetimeIndex | pd.Series | np.ndarray): The
+                timestamps, anything that pd.DatetimeIndex accepts.
+            start (int): The start index in the original vector (inclusive).
+            end (int): The end index in the original vector (exclusive). If None, use the length of the vector.
+        """
+        index = pd.DatetimeIndex(original_vector)
+        if index.hasnans:
+            raise ValueError("DatetimeVector does not support NaT values")
+        if index.tz is not None:
+            self.tz = index.tz
+        elif self.tz is not None:
+            # Naive timestamps are wall times in the timezone of the vector
+            index = index.tz_localize(self.tz)
+        # The nanoseconds since the epoch, in UTC for timezone aware timestamps
+        nanoseconds = index.as_unit("ns").asi8
+        self.nanoseconds.fill_from_vector(nanoseconds, start, end)
+
+    def searchsorted(self, values, side="left"):
+        """
+        Find the positions where timestamps would be inserted to keep the (sorted)
+        vector sorted, like pd.DatetimeIndex.searchsorted, with the searchsorted
+        of the nanoseconds.
+        Args:
+            values (pd.Timestamp | str | array_like): The timestamp(s) to insert,
+                naive timestamps are wall times in the timezone of the vector.
+            side (str): "left" or "right", as for np.searchsorted.
+        Returns:
+            int | np.ndarray: The insertion position(s), an int for a single value.
+        """
+        is_scalar = np.ndim(values) == 0
+        index = pd.DatetimeIndex([values] if is_scalar else values)
+        if index.tz is None and self.tz is not None:
+            index = index.tz_localize(self.tz)
+        elif index.tz is not None and self.tz is None:
+            # As for a naive pd.DatetimeIndex, the wall time is compared
+            index = index.tz_localize(None)
+        nanoseconds = index.as_unit("ns").asi8
+        return self.nanoseconds.searchsorted(
+            nanoseconds[0] if is_scalar else nanoseconds, side
+        )
+
+    def _to_timestamp(self, nanoseconds):
+        """
+        Convert nanoseconds since the epoch to a pd.Timestamp in the timezone.
+        """
+        timestamp = pd.Timestamp(int(nanoseconds))
+        if self.tz is None:
+            return timestamp
+        return timestamp.tz_localize("UTC").tz_convert(self.tz)
+
+    def _to_index(self, nanoseconds):
+        """
+        Convert nanoseconds since the epoch to a pd.DatetimeIndex in the timezone.
+        """
+        index = pd.DatetimeIndex(nanoseconds.view("datetime64[ns]"))
+        if self.tz is None:
+            return index
+        return index.tz_localize("UTC").tz_convert(self.tz)
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the datetime vector.
+        """
+        return self.nanoseconds.size_in_bytes()
+
+    @property
+    def bits_per_value(self):
+        """
+        Return the average number of bits used per value, based on size_in_bytes.
+        """
+        return self.nanoseconds.bits_per_value
+
+    @property
+    def is_monotonic_increasing(self):
+        return self.nanoseconds.is_monotonic_increasing
+
+    @property
+    def dtype(self):
+        """
+        Return the data type of the datetime vector, as for a pd.DatetimeIndex.
+        """
+        if self.tz is None:
+            return np.dtype("datetime64[ns]")
+        return pd.DatetimeTZDtype("ns", self.tz)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def size(self):
+        return len(self)
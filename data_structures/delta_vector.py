@@ -0,0 +1,349 @@
+import numpy as np
+from data_structures.compressed_vector import _zigzag_decode, _zigzag_encode
+from data_structures.packed_vector import PackedIntVector, minimal_width
+from data_structures.sorted_search import searchsorted_blocks
+
+# Number of values encoded per pass when bulk loading (a multiple of any
+# anchor interval that is a power of two up to 2**20)
+_ENCODE_CHUNK_SIZE = 1 << 20
+
+
+class DeltaVector:
+    """
+    A compressed vector for (mostly) monotonic data, such as timestamps or sample
+    indices on the x-axis.
+
+    The values are scaled by 10**decimal_places to integers and split into blocks of
+    `anchor_interval` values. Every block stores its first value (the anchor) and the
+    smallest delta between consecutive values in the block (the base delta). The
+    remaining values are stored as the (non-negative) residual of their delta on top
+    of the base delta, bit packed with the minimal width over all blocks. A constant
+    step series thus needs a single bit per value.
+
+    Decoding a value or a slice only decodes the blocks that contain it, i.e.,
+    O(anchor_interval + window).
+    """
+
+    def __init__(self, decimal_places=0, anchor_interval=128, dtype=float):
+        """
+        Initialize the DeltaVector with default values.
+        Args:
+            decimal_places (int): Number of decimal places to keep.
+            anchor_interval (int): Number of values per block, i.e. every
+                anchor_interval-th value is stored as an absolute anchor.
+            dtype: The dtype of the decoded values, float or an integer type
+                (only for decimal_places 0).
+        """
+        if decimal_places < 0:
+            raise ValueError("Decimal places must be non-negative")
+        if anchor_interval < 1:
+            raise ValueError("Anchor interval must be positive")
+        dtype = np.dtype(dtype)
+        if decimal_places > 0 and np.issubdtype(dtype, np.integer):
+            raise ValueError("An integer dtype requires 0 decimal places")
+
+        self.decimal_places = decimal_places
+        self.anchor_interval = anchor_interval
+        self._dtype = dtype
+        self.n_elements = 0
+        self.anchors = None
+        self.base_deltas = None
+        self.residuals = None
+        self.is_monotonic_increasing = True
+
+    def __len__(self):
+        """
+        Return the number of elements in the delta vector.
+        """
+        return self.n_elements
+
+    def __iter__(self):
+        # Decode chunk by chunk, instead of block by block for every value
+        for start in range(0, self.n_elements, _ENCODE_CHUNK_SIZE):
+            stop = min(start + _ENCODE_CHUNK_SIZE, self.n_elements)
+            yield from self._decode(slice(start, stop, 1)).tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Convert the delta vector to a NumPy array with one vectorized decode,
+        instead of the per-element sequence protocol. The array has the dtype of
+        the vector, unless another dtype is requested.
+        Args:
+            dtype: The dtype of the array. If None, the dtype of the vector.
+            copy (bool): If False, the array must share the memory of the vector,
+                which is not possible as the values have to be decoded.
+        """
+        if copy is False:
+            raise ValueError(
+                "The values of the delta vector have to be decoded, which requires a copy"
+            )
+        values = self._decode(slice(0, self.n_elements, 1))
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            # Handle negative indices like native Python lists
+            if index < 0:
+                index += self.n_elements
+            if index < 0 or index >= self.n_elements:
+                raise IndexError("Index out of bounds")
+            return self._decode(np.array([index]))[0].item()
+
+        elif isinstance(index, slice):
+            start, stop, step = index.indices(self.n_elements)
+            if step < 0:
+                return self._decode(np.arange(start, stop, step))
+            return self._decode(slice(start, stop, step))
+
+        elif isinstance(index, (list, np.ndarray, tuple)):
+            selected = np.asarray(index)
+            if selected.dtype == bool:
+                selected = np.flatnonzero(selected)
+            selected = selected.astype(np.int64, copy=False)
+            # Handle negative indices like native Python lists
+            selected = np.where(selected < 0, selected + self.n_elements, selected)
+            if len(selected) and (
+                selected.min() < 0 or selected.max() >= self.n_elements
+            ):
+                raise IndexError("Index out of bounds")
+            return self._decode(selected)
+
+        raise TypeError(
+            f"Invalid index type: {type(index)}. Expected int, slice, list or ndarray."
+        )
+
+    def create_vector(self, size):
+        """
+        Set the size of the delta vector, the vectors are created when filled.
+        """
+        self.n_elements = size
+
+    def fill_from_vector(self, original_vector, start=0, end=None):
+        """
+        Build the delta vector from a vector.
+        Args:
+            original_vector (list): The original vector to fill the delta vector with.
+            start (int): The start index in the original vector (inclusive).
+            end (int): The end index in the original vector (exclusive). If None, use the length of the vector.
+        """
+        if end is None or end > len(original_vector):
+            end = len(original_vector)
+        start = max(0, start)
+        self.n_elements = max(end - start, 0)
+
+        n_blocks = -(-self.n_elements // self.anchor_interval)
+        anchors = np.zeros(n_blocks, dtype=np.int64)
+        base_deltas = np.zeros(n_blocks, dtype=np.int64)
+
+        # First pass: the anchors, base deltas and the largest residual
+        max_residual = 0
+        self.is_monotonic_increasing = True
+        previous = None
+        for offset, scaled in self._scaled_chunks(original_vector, start, end):
+            block = offset // self.anchor_interval
+            chunk_anchors, chunk_bases, residuals = self._encode_blocks(scaled)
+            anchors[block:block + len(chunk_anchors)] = chunk_anchors
+            base_deltas[block:block + len(chunk_bases)] = chunk_bases
+            max_residual = max(max_residual, int(residuals.max()))
+            if (previous is not None and scaled[0] < previous) or np.any(
+                np.diff(scaled) < 0
+            ):
+                self.is_monotonic_increasing = False
+            previous = scaled[-1]
+
+        # Second pass: pack the residuals with the minimal width
+        self.residuals = PackedIntVector(self.n_elements, minimal_width(max_residual))
+        for offset, scaled in self._scaled_chunks(original_vector, start, end):
+            _, _, residuals = self._encode_blocks(scaled)
+            self.residuals.write(offset, residuals[:len(scaled)])
+
+        self.anchors = PackedIntVector.from_array(_zigzag_encode(anchors))
+        self.base_deltas = PackedIntVector.from_array(_zigzag_encode(base_deltas))
+
+    def _scaled_chunks(self, original_vector, start, end):
+        """
+        Scale the values of a vector to integers, in chunks which start at an
+        anchor.
+        Yields:
+            tuple: The offset of the chunk and the scaled int64 values.
+        """
+        chunk_size = max(
+            _ENCODE_CHUNK_SIZE // self.anchor_interval, 1
+        ) * self.anchor_interval
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+            values = np.asarray(original_vector[chunk_start:chunk_end])
+            if np.issubdtype(values.dtype, np.integer) and self.decimal_places == 0:
+                scaled = values.astype(np.int64)
+            else:
+                values = values.astype(np.float64)
+                if np.isnan(values).any():
+                    raise ValueError("DeltaVector does not support NaN values")
+                scaled = np.rint(values * 10 ** self.decimal_places).astype(np.int64)
+            yield chunk_start - start, scaled
+
+    def _encode_blocks(self, scaled):
+        """
+        Encode scaled values, starting at an anchor, into blocks.
+        Args:
+            scaled (np.ndarray): The scaled int64 values.
+        Returns:
+            tuple: The anchors, the base deltas and the (padded) residuals.
+        """
+        k = self.anchor_interval
+        n_blocks = -(-len(scaled) // k)
+        padded = np.empty(n_blocks * k, dtype=np.int64)
+        padded[:len(scaled)] = scaled
+        padded[len(scaled):] = scaled[-1]
+        blocks = padded.reshape(n_blocks, k)
+
+        deltas = np.zeros_like(blocks)
+        deltas[:, 1:] = np.diff(blocks, axis=1)
+        if k > 1:
+            base_deltas = deltas[:, 1:].min(axis=1)
+            # The padding of the last block should not lower its base delta
+            n_last = len(scaled) - (n_blocks - 1) * k
+            if n_last > 1:
+                base_deltas[-1] = deltas[-1, 1:n_last].min()
+        else:
+            base_deltas = np.zeros(n_blocks, dtype=np.int64)
+        residuals = deltas - base_deltas[:, None]
+        residuals[:, 0] = 0
+        residuals = np.maximum(residuals, 0).astype(np.uint64).ravel()
+        return blocks[:, 0], base_deltas, residuals
+
+    def _decode_blocks(self, blocks):
+        """
+        Decode entire blocks to their scaled integer values.
+        Args:
+            blocks (np.ndarray): The (sorted, unique) block indices.
+        Returns:
+            np.ndarray: A (len(blocks), anchor_interval) int64 array. The positions
+                beyond the end of the vector are garbage.
+        """
+        k = self.anchor_interval
+        positions = (blocks[:, None] * k + np.arange(k)).ravel()
+        positions = np.minimum(positions, self.n_elements - 1)
+        residuals = self.residuals.read(positions).astype(np.int64).reshape(-1, k)
+        anchors = _zigzag_decode(self.anchors.read(blocks))
+        base_deltas = _zigzag_decode(self.base_deltas.read(blocks))
+
+        deltas = residuals + base_deltas[:, None]
+        deltas[:, 0] = anchors
+        return np.cumsum(deltas, axis=1)
+
+    def _decode(self, index):
+        """
+        Decode the values at a slice or an array of indices.
+        Args:
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The decoded values.
+        """
+        k = self.anchor_interval
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step or 1
+            if start >= stop:
+                return self._to_dtype(np.empty(0, dtype=np.int64))
+            first_block, last_block = start // k, (stop - 1) // k
+            blocks = np.arange(first_block, last_block + 1)
+            scaled = self._decode_blocks(blocks).ravel()
+            offset = first_block * k
+            return self._to_dtype(scaled[start - offset:stop - offset:step])
+
+        index = np.asarray(index, dtype=np.int64)
+        if not len(index):
+            return self._to_dtype(np.empty(0, dtype=np.int64))
+        # Only decode the blocks that contain the requested indices
+        blocks, block_pos = np.unique(index // k, return_inverse=True)
+        scaled = self._decode_blocks(blocks)
+        return self._to_dtype(scaled[block_pos.ravel(), index % k])
+
+    def searchsorted(self, values, side="left"):
+        """
+        Find the positions where values would be inserted to keep the (sorted)
+        vector sorted, like np.searchsorted. The anchors narrow the search down to
+        a single block, which is decoded and searched.
+        Args:
+            values (float | array_like): The value(s) to insert.
+            side (str): "left" or "right", as for np.searchsorted.
+        Returns:
+            int | np.ndarray: The insertion position(s), an int for a single value.
+        """
+        k = self.anchor_interval
+        return searchsorted_blocks(
+            values,
+            side,
+            self.n_elements,
+            k,
+            first_value=self._anchor_value,
+            search_block=lambda block, block_values, side: np.searchsorted(
+                self._decode(slice(block * k, min((block + 1) * k, self.n_elements), 1)),
+                block_values,
+                side,
+            ),
+        )
+
+    def _anchor_value(self, block):
+        """
+        Return the first value of a block, i.e. its decoded anchor.
+        """
+        zigzag = self.anchors[block]
+        scaled = (zigzag >> 1) ^ -(zigzag & 1)
+        if self._dtype.kind in "iu":
+            return scaled
+        return scaled / (10 ** self.decimal_places)
+
+    def _to_dtype(self, scaled):
+        """
+        Convert the scaled integers to the dtype of the vector.
+        """
+        if np.issubdtype(self._dtype, np.integer):
+            return scaled.astype(self._dtype, copy=False)
+        return scaled / (10 ** self.decimal_places)
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the delta vector.
+        """
+        total = (
+                # packed vectors
+                self.residuals.size_in_bytes()
+                + self.anchors.size_in_bytes()
+                + self.base_deltas.size_in_bytes()
+
+                # self attributes
+                + self.n_elements.__sizeof__()
+                + self.decimal_places.__sizeof__()
+                + self.anchor_interval.__sizeof__()
+                )
+        return total
+
+    @property
+    def bits_per_value(self):
+        """
+        Return the average number of bits used per value, based on size_in_bytes.
+        """
+        if self.n_elements == 0:
+            return 0.0
+        return self.size_in_bytes() * 8 / self.n_elements
+
+    @property
+    def dtype(self):
+        """
+        Return the data type of the delta vector.
+        """
+        return self._dtype
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def shape(self):
+        return (self.n_elements,)
+
+    @property
+    def size(self):
+        return self.n_elements
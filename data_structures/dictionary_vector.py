@@ -0,0 +1,157 @@
+import sys
+import numpy as np
+import pandas as pd
+from data_structures.packed_vector import PackedIntVector, minimal_width
+
+# Number of values decoded per pass when iterating
+_DECODE_CHUNK_SIZE = 1 << 20
+
+
+class DictionaryVector:
+    """
+    A compressed vector for repetitive strings, such as text or hovertext labels.
+
+    The distinct values are stored once in a dictionary, and every position stores
+    the code of its value (its index in the dictionary), bit packed with the
+    minimal width for the number of distinct values. A column with a few labels
+    thus needs a few bits per value.
+
+    Indexing behaves like an object array: a position returns its value, and a
+    slice or an array of positions returns an object array. Only the codes of the
+    requested positions are unpacked.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty DictionaryVector.
+        """
+        self.n_elements = 0
+        self.categories = np.empty(0, dtype=object)
+        self.codes = None
+
+    def __len__(self):
+        """
+        Return the number of elements in the dictionary vector.
+        """
+        return self.n_elements
+
+    def __iter__(self):
+        # Decode chunk by chunk, instead of value by value
+        for start in range(0, self.n_elements, _DECODE_CHUNK_SIZE):
+            yield from self[start:start + _DECODE_CHUNK_SIZE].tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Convert the dictionary vector to a NumPy object array.
+        """
+        return np.asarray(self[:], dtype=dtype)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            # Handle negative indices like native Python lists
+            if index < 0:
+                index += self.n_elements
+            if index < 0 or index >= self.n_elements:
+                raise IndexError("Index out of bounds")
+            return self.categories[self.codes[int(index)]]
+
+        elif isinstance(index, slice):
+            selected = np.arange(*index.indices(self.n_elements))
+
+        elif isinstance(index, (list, np.ndarray, tuple)):
+            selected = np.asarray(index)
+            if selected.dtype == bool:
+                selected = np.flatnonzero(selected)
+            selected = selected.astype(np.int64, copy=False)
+            # Handle negative indices like native Python lists
+            selected = np.where(selected < 0, selected + self.n_elements, selected)
+            if len(selected) and (
+                selected.min() < 0 or selected.max() >= self.n_elements
+            ):
+                raise IndexError("Index out of bounds")
+
+        else:
+            raise TypeError(
+                f"Invalid index type: {type(index)}. Expected int, slice, list or ndarray."
+            )
+
+        if not len(selected):
+            return np.empty(0, dtype=object)
+        return self.categories[self.codes.read(selected).astype(np.int64)]
+
+    def create_vector(self, size):
+        """
+        Set the size of the dictionary vector, the vectors are created when filled.
+        """
+        self.n_elements = size
+
+    def fill_from_vector(self, original_vector, start=0, end=None):
+        """
+        Build the dictionary vector from a vector.
+        Args:
+            original_vector (list | np.ndarray | pd.Series): The values, missing
+                values (None or NaN) are decoded as None.
+            start (int): The start index in the original vector (inclusive).
+            end (int): The end index in the original vector (exclusive). If None, use the length of the vector.
+        """
+        if end is None or end > len(original_vector):
+            end = len(original_vector)
+        start = max(0, start)
+        values = np.asarray(original_vector[start:end], dtype=object)
+        self.n_elements = len(values)
+
+        codes, categories = pd.factorize(values)
+        categories = np.asarray(categories, dtype=object)
+        missing = codes < 0
+        if missing.any():
+            # The missing values share the last code of the dictionary
+            categories = np.append(categories, None)
+            codes[missing] = len(categories) - 1
+        self.categories = categories
+        self.codes = PackedIntVector.from_array(
+            codes.astype(np.uint64), minimal_width(max(len(categories) - 1, 0))
+        )
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the dictionary vector.
+        """
+        return (
+            # packed codes
+            (self.codes.size_in_bytes() if self.codes is not None else 0)
+
+            # dictionary
+            + self.categories.nbytes
+            + sum(sys.getsizeof(category) for category in self.categories)
+
+            # self attributes
+            + self.n_elements.__sizeof__()
+        )
+
+    @property
+    def bits_per_value(self):
+        """
+        Return the average number of bits used per value, based on size_in_bytes.
+        """
+        if self.n_elements == 0:
+            return 0.0
+        return self.size_in_bytes() * 8 / self.n_elements
+
+    @property
+    def dtype(self):
+        """
+        Return the data type of the dictionary vector, as for an object array.
+        """
+        return np.dtype(object)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def shape(self):
+        return (self.n_elements,)
+
+    @property
+    def size(self):
+        return self.n_elements
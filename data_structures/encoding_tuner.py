@@ -0,0 +1,299 @@
+import time
+import numpy as np
+from data_structures.compressed_vector import CompressedVector
+from data_structures.delta_vector import DeltaVector
+from data_structures.precision import infer_decimal_places
+
+# The column is sampled in evenly spaced contiguous windows, so that the deltas
+# between consecutive values are kept
+_SAMPLE_WINDOWS = 8
+_SAMPLE_WINDOW_SIZE = 1 << 13
+
+# The largest number of decimal places that is inferred
+_MAX_DECIMAL_PLACES = 8
+
+# Number of timed decodes per candidate, the fastest one is kept
+_DECODE_REPEATS = 3
+
+# The relative slack of the allowed error of a candidate, for the float rounding
+_ERROR_SLACK = 1e-6
+
+# Number of values per pass when validating the sample on the whole column
+_SCAN_CHUNK_SIZE = 1 << 20
+
+
+def sample_column(values, n_windows=_SAMPLE_WINDOWS, window_size=_SAMPLE_WINDOW_SIZE):
+    """
+    Sample evenly spaced contiguous windows of a column.
+    Args:
+        values (list | np.ndarray): The values of the column, any vector that
+            supports len() and slicing.
+        n_windows (int): The number of windows.
+        window_size (int): The number of values per window.
+    Returns:
+        list: The float64 windows, a single window with the whole column when it
+            is not larger than the windows.
+    """
+    n = len(values)
+    if n <= n_windows * window_size:
+        return [np.asarray(values[0:n], dtype=np.float64)]
+    starts = np.linspace(0, n - window_size, n_windows).astype(np.int64)
+    return [
+        np.asarray(values[int(start):int(start) + window_size], dtype=np.float64)
+        for start in starts
+    ]
+
+
+def column_statistics(windows, max_decimal_places=_MAX_DECIMAL_PLACES):
+    """
+    Describe a sampled column, e.g. whether it is monotonic, whether it has a
+    constant step and how many distinct values it has.
+    Args:
+        windows (list): The float64 windows of the column, see `sample_column`.
+        max_decimal_places (int): The largest number of decimal places to infer.
+    Returns:
+        dict: The statistics of the column.
+    """
+    values = np.concatenate(windows)
+    nan_mask = np.isnan(values)
+    finite = values[~nan_mask]
+    # The steps between the windows are not deltas of the column
+    deltas = np.concatenate([np.diff(window) for window in windows])
+    return {
+        "n_values": len(values),
+        "n_nans": int(nan_mask.sum()),
+        "has_infinite": bool(np.isinf(values).any()),
+        "n_distinct": int(len(np.unique(finite))),
+        # The windows are in order, so the column is monotonic if the sample is
+        "is_monotonic": bool(not nan_mask.any() and np.all(np.diff(values) >= 0)),
+        "is_constant_step": bool(
+            not nan_mask.any() and len(deltas) > 0 and np.allclose(deltas, deltas[0])
+        ),
+        "max_abs_delta": (
+            float(np.nanmax(np.abs(deltas))) if np.any(~np.isnan(deltas)) else 0.0
+        ),
+        "min": float(finite.min()) if len(finite) else float("nan"),
+        "max": float(finite.max()) if len(finite) else float("nan"),
+        "decimal_places": infer_decimal_places(
+            values, max_decimal_places=max_decimal_places
+        ),
+    }
+
+
+def scan_column(values, max_decimal_places=_MAX_DECIMAL_PLACES,
+                chunk_size=_SCAN_CHUNK_SIZE):
+    """
+    Scan a whole column, in chunks, for the statistics that must hold for every
+    value and not only for a sample: whether it is monotonic (without NaN values),
+    whether it has infinite values and how many decimal places it has.
+    Args:
+        values (list | np.ndarray): The values of the column, any vector that
+            supports len() and slicing.
+        max_decimal_places (int): The largest number of decimal places to infer.
+        chunk_size (int): The number of values per pass.
+    Returns:
+        dict: The is_monotonic, has_infinite and decimal_places statistics of the
+            column.
+    """
+    is_monotonic = True
+    has_infinite = False
+    decimal_places = 0
+    previous = -np.inf
+    for start in range(0, len(values), chunk_size):
+        chunk = np.asarray(values[start:start + chunk_size], dtype=np.float64)
+        if is_monotonic:
+            is_monotonic = bool(
+                not np.isnan(chunk).any()
+                and chunk[0] >= previous
+                and np.all(np.diff(chunk) >= 0)
+            )
+            previous = chunk[-1]
+        has_infinite = has_infinite or bool(np.isinf(chunk).any())
+        if decimal_places is not None:
+            # The decimal places of the previous chunks are the least to try
+            decimal_places = infer_decimal_places(
+                chunk,
+                max_decimal_places=max_decimal_places,
+                min_decimal_places=decimal_places,
+            )
+    return {
+        "is_monotonic": is_monotonic,
+        "has_infinite": has_infinite,
+        "decimal_places": decimal_places,
+    }
+
+
+class EncodingChoice:
+    """
+    The encoding chosen for a column, with the statistics of the column and the
+    measurements of every candidate encoding on the sample.
+    """
+
+    def __init__(self, vector_class, params, statistics, candidates):
+        """
+        Args:
+            vector_class (type): CompressedVector or DeltaVector.
+            params (dict): The keyword arguments of the vector class.
+            statistics (dict): The statistics of the sampled column, see
+                `choose_encoding`.
+            candidates (list): The measurements of every candidate, dicts with the
+                name, vector_class, params, bits_per_value, decode_rate (values per
+                second) and max_error on the sample.
+        """
+        self.vector_class = vector_class
+        self.params = params
+        self.statistics = statistics
+        self.candidates = candidates
+
+    @property
+    def name(self):
+        """
+        Return the name of the chosen encoding.
+        """
+        return _candidate_name(self.vector_class, self.params)
+
+    def build(self, values):
+        """
+        Build the vector of a column with the chosen encoding.
+        Args:
+            values (list | np.ndarray): The values of the column.
+        Returns:
+            CompressedVector | DeltaVector: The filled vector.
+        """
+        vector = self.vector_class(**self.params)
+        vector.create_vector(len(values))
+        vector.fill_from_vector(values)
+        return vector
+
+    def __str__(self):
+        statistics = ", ".join(f"{key}={value}" for key, value in self.statistics.items())
+        lines = [f"chosen: {self.name}", f"column: {statistics}", "candidates:"]
+        for candidate in self.candidates:
+            lines.append(
+                f"  {candidate['name']}: {candidate['bits_per_value']:.2f} bits/value, "
+                f"{candidate['decode_rate'] / 1e6:.1f} M values/s, "
+                f"max error {candidate['max_error']:g}"
+            )
+        return "\n".join(lines)
+
+
+def _candidate_name(vector_class, params):
+    """
+    Return a readable name of a candidate encoding.
+    """
+    if vector_class is DeltaVector:
+        return f"delta (decimal_places={params['decimal_places']})"
+    if params["encoding"] in ("split", "fixed_point"):
+        return (
+            f"{params['encoding']} (decimal_places={params['decimal_places']}, "
+            f"int_width={params['int_width']})"
+        )
+    return params["encoding"]
+
+
+def _candidates(statistics, decimal_places):
+    """
+    Return the candidate encodings for a column, as (vector class, params) pairs.
+    """
+    candidates = [(CompressedVector, {"encoding": "xor"})]
+    if decimal_places is None or statistics["has_infinite"]:
+        # Only the lossless codecs fit a column without a decimal precision, or
+        # with infinite values, which the scaled integers cannot represent
+        return candidates
+    for encoding in ("split", "fixed_point"):
+        candidates.append((CompressedVector, {
+            "decimal_places": decimal_places, "int_width": "auto", "encoding": encoding
+        }))
+    if statistics["is_monotonic"]:
+        candidates.append((DeltaVector, {"decimal_places": decimal_places}))
+    return candidates
+
+
+def _allowed_error(params):
+    """
+    Return the largest error of a candidate that is accurate: half a unit of its
+    decimal places, with some slack for the float rounding, and none for a
+    lossless codec.
+    """
+    if "decimal_places" not in params:
+        return 0.0
+    return 0.5 * 10.0 ** -params["decimal_places"] * (1 + _ERROR_SLACK)
+
+
+def _measure(vector_class, params, sample):
+    """
+    Encode the sample with a candidate, and measure its size, decode rate and
+    error.
+    """
+    vector = vector_class(**params)
+    vector.create_vector(len(sample))
+    # A candidate that cannot represent the values (e.g. an overflow of the scaled
+    # integers) is rejected on its error, instead of warning about it
+    with np.errstate(invalid="ignore", over="ignore"):
+        vector.fill_from_vector(sample)
+        decode_time = float("inf")
+        for _ in range(_DECODE_REPEATS):
+            start = time.perf_counter()
+            decoded = vector[0:len(sample)]
+            decode_time = min(decode_time, time.perf_counter() - start)
+        decoded = np.asarray(decoded, dtype=np.float64)
+        errors = np.where(decoded == sample, 0.0, np.abs(decoded - sample))
+    # A NaN value that is not decoded as NaN, or vice versa, is not represented
+    nan_mask = np.isnan(sample)
+    errors[nan_mask != np.isnan(decoded)] = np.inf
+    errors[nan_mask & np.isnan(decoded)] = 0.0
+    return {
+        "name": _candidate_name(vector_class, params),
+        "vector_class": vector_class,
+        "params": params,
+        "bits_per_value": vector.size_in_bytes() * 8 / max(len(sample), 1),
+        "decode_rate": len(sample) / max(decode_time, 1e-9),
+        "max_error": float(errors.max()) if len(errors) else 0.0,
+    }
+
+
+def choose_encoding(values, decimal_places=None, min_decode_rate=None):
+    """
+    Choose the encoding of a column from a sample: the candidate with the smallest
+    measured size, among the candidates that decode fast enough. A candidate that
+    does not decode the sample within half a unit of its decimal places is
+    rejected, the lossless codec is always accurate. The statistics
+    that every value must satisfy (the monotonicity of a delta encoding and the
+    decimal places) are validated on the whole column, a value outside the
+    sample could otherwise not be encoded, or be rounded.
+    Args:
+        values (list | np.ndarray): The values of the column.
+        decimal_places (int): The number of decimal places to keep. If None, the
+            decimal places are inferred from the column, and if it has too many
+            only lossless encodings are considered.
+        min_decode_rate (float): The minimal decode rate in values per second. If
+            no candidate reaches it, the fastest candidate is chosen. If None, only
+            the size counts.
+    Returns:
+        EncodingChoice: The chosen encoding and the report of the measurements.
+    """
+    windows = sample_column(values)
+    statistics = column_statistics(windows)
+    sample = np.concatenate(windows)
+    if len(sample) < len(values):
+        statistics.update(scan_column(values))
+    if decimal_places is None:
+        decimal_places = statistics["decimal_places"]
+
+    candidates = [
+        _measure(vector_class, params, sample)
+        for vector_class, params in _candidates(statistics, decimal_places)
+    ]
+    accurate = [
+        candidate for candidate in candidates
+        if candidate["max_error"] <= _allowed_error(candidate["params"])
+    ]
+    eligible = [
+        candidate for candidate in accurate
+        if min_decode_rate is None or candidate["decode_rate"] >= min_decode_rate
+    ]
+    if eligible:
+        best = min(eligible, key=lambda c: (c["bits_per_value"], -c["decode_rate"]))
+    else:
+        best = max(accurate, key=lambda c: c["decode_rate"])
+    return EncodingChoice(best["vector_class"], best["params"], statistics, candidates)
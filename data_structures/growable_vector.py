@@ -0,0 +1,399 @@
+import threading
+import numpy as np
+from data_structures.block_summaries import BlockSummaries
+from data_structures.codecs import CODECS
+from data_structures.compressed_vector import ENCODINGS, CompressedVector
+from data_structures.sorted_search import searchsorted_blocks
+
+# Number of values per sealed block
+_SEAL_SIZE = 1 << 16
+
+
+class GrowableCompressedVector:
+    """
+    An append-only compressed vector, for data that keeps arriving, e.g. the
+    samples of a live dashboard.
+
+    The values are stored in immutable sealed blocks of `seal_size` values, every
+    block a CompressedVector, and one mutable tail block of (quantized) float
+    values. Once the tail is full it is encoded into a new sealed block, so an
+    append costs O(1) amortized and the history is never encoded again. With
+    int_width "auto", every sealed block is packed with the minimal width for its
+    own values.
+
+    The number of sealed blocks, the tail and the length are published together
+    once the appended values are written, so a reader in another thread (e.g. the
+    callback of a FigureResampler whose trace holds the vector) always sees a
+    consistent length, and never a partially written value.
+    """
+
+    def __init__(
+        self,
+        decimal_places=0,
+        int_width="auto",
+        encoding="split",
+        seal_size=_SEAL_SIZE,
+        block_size=None,
+    ):
+        """
+        Initialize an empty growable vector.
+        Args:
+            decimal_places (int): Number of decimal places to keep.
+            int_width (int | str): Width of the integer part of the sealed blocks
+                in bits (8, 16, 32 or 64), or "auto". (default: "auto")
+            encoding (str): The encoding of the sealed blocks, "split",
+                "fixed_point" or the name of a codec. (default: "split")
+            seal_size (int): Number of values per sealed block.
+            block_size (int): If set, keep the min, max, argmin, argmax and NaN
+                count of every block of block_size values in `block_summaries`.
+                (default: None)
+        """
+        if seal_size < 1:
+            raise ValueError("Seal size must be positive")
+        if decimal_places == "auto":
+            # The tail is quantized before the values of the sealed blocks are known
+            raise ValueError("A growable vector needs fixed decimal places")
+        if block_size is not None and block_size < 1:
+            raise ValueError("Block size must be positive")
+        if encoding not in ENCODINGS and encoding not in CODECS:
+            raise ValueError(
+                f"Invalid encoding: {encoding}. "
+                f"Valid encodings are: {ENCODINGS + tuple(CODECS)}"
+            )
+        # An empty vector with the settings of the sealed blocks, which quantizes
+        # the values of the tail the same way as the sealed blocks
+        self._quantizer = CompressedVector(decimal_places, int_width, encoding=encoding)
+        self.decimal_places = decimal_places
+        self.int_width = int_width
+        self.encoding = encoding
+        self.seal_size = seal_size
+        self.block_size = block_size
+        # Only appended to, so that the blocks of a published state never change
+        self._sealed = []
+        self._summaries = (
+            BlockSummaries(seal_size, block_size) if block_size is not None else None
+        )
+        # The published state: the number of sealed blocks, the tail, the length
+        # and the summaries of the full blocks
+        self._state = (0, np.empty(seal_size), 0, self._summaries)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Return the number of elements in the vector.
+        """
+        return self._state[2]
+
+    def __iter__(self):
+        state = self._state
+        for start in range(0, state[2], self.seal_size):
+            stop = min(start + self.seal_size, state[2])
+            yield from self._decode(state, slice(start, stop, 1)).tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Convert the vector to a NumPy array, decoding block by block.
+        """
+        if copy is False:
+            raise ValueError("The values of the vector have to be decoded, which requires a copy")
+        state = self._state
+        values = self._decode(state, slice(0, state[2], 1))
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def __getitem__(self, index):
+        # Every index is resolved against a single state
+        state = self._state
+        n_elements = state[2]
+        if isinstance(index, (int, np.integer)):
+            # Handle negative indices like native Python lists
+            if index < 0:
+                index += n_elements
+            if index < 0 or index >= n_elements:
+                raise IndexError("Index out of bounds")
+            return self._decode(state, np.array([index]))[0].item()
+
+        elif isinstance(index, slice):
+            start, stop, step = index.indices(n_elements)
+            if step < 0:
+                return self._decode(state, np.arange(start, stop, step))
+            return self._decode(state, slice(start, stop, step))
+
+        elif isinstance(index, (list, np.ndarray, tuple)):
+            selected = np.asarray(index)
+            if selected.dtype == bool:
+                selected = np.flatnonzero(selected)
+            selected = selected.astype(np.int64, copy=False)
+            # Handle negative indices like native Python lists
+            selected = np.where(selected < 0, selected + n_elements, selected)
+            if len(selected) and (
+                selected.min() < 0 or selected.max() >= n_elements
+            ):
+                raise IndexError("Index out of bounds")
+            return self._decode(state, selected)
+
+        raise TypeError(
+            f"Invalid index type: {type(index)}. Expected int, slice, list or ndarray."
+        )
+
+    def append(self, value):
+        """
+        Append a single value.
+        Args:
+            value (float): The value to append.
+        """
+        self.extend([value])
+
+    def extend(self, values):
+        """
+        Append values. The tail is filled up and sealed as often as needed, and the
+        new length is published once all values are written.
+        Args:
+            values (Iterable): The values to append.
+        """
+        values = self._quantizer.quantize(np.asarray(values, dtype=np.float64).ravel())
+        with self._lock:
+            n_sealed, tail, n_elements, summaries = self._state
+            old_n_elements = n_elements
+            position = 0
+            while position < len(values):
+                filled = n_elements - n_sealed * self.seal_size
+                n_values = min(self.seal_size - filled, len(values) - position)
+                # The positions beyond the published length are not read
+                tail[filled:filled + n_values] = values[position:position + n_values]
+                position += n_values
+                n_elements += n_values
+                if filled + n_values == self.seal_size:
+                    self._sealed.append(self._seal(tail))
+                    n_sealed += 1
+                    # A new tail, as the published states may still hold the old one
+                    tail = np.empty(self.seal_size)
+            state = (n_sealed, tail, n_elements, summaries)
+            if self._summaries is not None:
+                state = self._summarize(state, old_n_elements)
+            self._state = state
+
+    def _seal(self, tail):
+        """
+        Encode a full tail into a sealed block.
+        """
+        block = CompressedVector(
+            self.decimal_places, self.int_width, encoding=self.encoding
+        )
+        block.create_vector(self.seal_size)
+        block.fill_from_vector(tail)
+        return block
+
+    def _summarize(self, state, old_n_elements):
+        """
+        Summarize the blocks that were completed since old_n_elements. The
+        summaries of the completed blocks never change, as the vector is append
+        only, so every block is only summarized once.
+        Args:
+            state (tuple): The (unpublished) state after the append.
+            old_n_elements (int): The length before the append.
+        Returns:
+            tuple: The state with the updated summaries.
+        """
+        n_sealed, tail, n_elements, summaries = state
+        k = self.block_size
+        first_block, last_block = old_n_elements // k, n_elements // k
+        if first_block == last_block:
+            return state
+        if last_block > len(summaries):
+            # Grow the summaries by doubling, so that the copies are amortized; the
+            # published states keep the old arrays
+            grown = BlockSummaries(max(2 * len(summaries), last_block) * k, k)
+            for name in BlockSummaries.ARRAY_NAMES:
+                getattr(grown, name)[:first_block] = getattr(summaries, name)[:first_block]
+            summaries = self._summaries = grown
+        summaries.update(
+            first_block * k, self._decode(state, slice(first_block * k, last_block * k, 1))
+        )
+        return n_sealed, tail, n_elements, summaries
+
+    def _decode(self, state, index):
+        """
+        Decode the values at a slice or an array of indices of a state.
+        Args:
+            state (tuple): The state to read from.
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The decoded float values.
+        """
+        n_sealed, tail, n_elements, _ = state
+        k = self.seal_size
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step or 1
+            if start >= stop:
+                return np.empty(0)
+            values = []
+            # Decode the part of every block that overlaps the slice
+            for block in range(start // k, (stop - 1) // k + 1):
+                # The first position in the block that is part of the slice
+                first = max(start, block * k)
+                first += -(first - start) % step
+                last = min(stop, (block + 1) * k)
+                if first >= last:
+                    continue
+                local = slice(first - block * k, last - block * k, step)
+                if block < n_sealed:
+                    values.append(self._sealed[block][local])
+                else:
+                    values.append(tail[local])
+            return np.concatenate(values) if values else np.empty(0)
+
+        values = np.empty(len(index))
+        blocks = index // k
+        for block in np.unique(blocks):
+            selected = blocks == block
+            local = index[selected] - block * k
+            if block < n_sealed:
+                values[selected] = self._sealed[block][local]
+            else:
+                values[selected] = tail[local]
+        return values
+
+    @property
+    def block_summaries(self):
+        """
+        Return the block summaries of the current values, or None without a
+        block_size. The full blocks were summarized when they were completed, only
+        the last, partial block is summarized here.
+        """
+        if self._summaries is None:
+            return None
+        state = self._state
+        summaries, n_elements, k = state[3], state[2], self.block_size
+        n_full = n_elements // k
+        partial = BlockSummaries(n_elements - n_full * k, k)
+        partial.update(0, self._decode(state, slice(n_full * k, n_elements, 1)))
+        partial.argmin += n_full * k
+        partial.argmax += n_full * k
+        return BlockSummaries.from_arrays(
+            n_elements,
+            k,
+            {
+                name: np.concatenate(
+                    (getattr(summaries, name)[:n_full], getattr(partial, name))
+                )
+                for name in BlockSummaries.ARRAY_NAMES
+            },
+        )
+
+    def searchsorted(self, values, side="left"):
+        """
+        Find the positions where values would be inserted to keep the (sorted)
+        vector sorted, like np.searchsorted. The first values of the sealed
+        vectors narrow the search down to a single sealed vector (which is
+        searched with its own searchsorted) or the tail.
+        Args:
+            values (float | array_like): The value(s) to insert.
+            side (str): "left" or "right", as for np.searchsorted.
+        Returns:
+            int | np.ndarray: The insertion position(s), an int for a single value.
+        """
+        # The search is resolved against a single state
+        state = self._state
+        n_sealed, tail, n_elements, _ = state
+        k = self.seal_size
+
+        def search_block(block, block_values, side):
+            if block < n_sealed:
+                return self._sealed[block].searchsorted(block_values, side)
+            return np.searchsorted(tail[:n_elements - block * k], block_values, side)
+
+        return searchsorted_blocks(
+            values,
+            side,
+            n_elements,
+            k,
+            first_value=lambda block: self._decode(state, np.array([block * k]))[0],
+            search_block=search_block,
+        )
+
+    def count_nans(self, start=0, end=None):
+        """
+        Return the number of NaN values in [start, end).
+        Args:
+            start (int): The start index (inclusive).
+            end (int): The end index (exclusive). If None, use the length of the vector.
+        """
+        n_sealed, tail, n_elements, _ = self._state
+        end = n_elements if end is None else min(end, n_elements)
+        start = max(0, start)
+        if start >= end:
+            return 0
+        k = self.seal_size
+        count = 0
+        for block in range(start // k, (end - 1) // k + 1):
+            first = max(start, block * k) - block * k
+            last = min(end, (block + 1) * k) - block * k
+            if block < n_sealed:
+                count += self._sealed[block].count_nans(first, last)
+            else:
+                count += int(np.isnan(tail[first:last]).sum())
+        return count
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the vector, the tail included.
+        """
+        n_sealed, tail, _, summaries = self._state
+        total = (
+                # sealed blocks
+                sum(block.size_in_bytes() for block in self._sealed[:n_sealed])
+                + tail.nbytes
+                + (summaries.size_in_bytes() if summaries is not None else 0)
+
+                # self attributes
+                + self.decimal_places.__sizeof__()
+                + self.seal_size.__sizeof__()
+                )
+        return total
+
+    @property
+    def bits_per_value(self):
+        """
+        Return the average number of bits used per value, based on size_in_bytes.
+        """
+        if len(self) == 0:
+            return 0.0
+        return self.size_in_bytes() * 8 / len(self)
+
+    @property
+    def is_monotonic_increasing(self):
+        """
+        Return whether the values are (non-strictly) increasing, decoded block by
+        block. As in pandas, NaN values are not monotonic.
+        """
+        state = self._state
+        previous = -np.inf
+        for start in range(0, state[2], self.seal_size):
+            stop = min(start + self.seal_size, state[2])
+            values = self._decode(state, slice(start, stop, 1))
+            if np.isnan(values).any():
+                return False
+            if values[0] < previous or np.any(np.diff(values) < 0):
+                return False
+            previous = values[-1]
+        return True
+
+    @property
+    def dtype(self):
+        """
+        Return the data type of the vector.
+        """
+        return np.dtype(float)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def size(self):
+        return len(self)
@@ -0,0 +1,215 @@
+import sdsl4py
+import numpy as np
+
+
+def minimal_width(max_value):
+    """
+    Return the minimal number of bits needed to store the values up to max_value.
+    Args:
+        max_value (int): The largest (unsigned) value that has to be stored.
+    Returns:
+        int: The minimal bit width (at least 1).
+    """
+    return max(1, int(max_value).bit_length())
+
+
+def words_size_in_bytes(words):
+    """
+    Return the size in bytes of words, a sdsl4py vector or a (memory mapped) array.
+    """
+    if isinstance(words, np.ndarray):
+        return words.nbytes
+    return sdsl4py.size_in_bytes(words)
+
+
+def _low_mask(width):
+    """
+    Return a uint64 mask with the lowest `width` bits set.
+    """
+    if width >= 64:
+        return np.uint64(0xFFFFFFFFFFFFFFFF)
+    return np.uint64((1 << width) - 1)
+
+
+def _or_per_word(word_index, parts):
+    """
+    OR together the parts that land in the same word.
+    Args:
+        word_index (np.ndarray): The (non-decreasing) word index of every part.
+        parts (np.ndarray): The uint64 parts, with disjoint bits per word.
+    Returns:
+        tuple: The unique word indices and the OR-ed parts per word.
+    """
+    if not len(word_index):
+        return word_index, parts
+    starts = np.flatnonzero(np.r_[True, word_index[1:] != word_index[:-1]])
+    return word_index[starts], np.bitwise_or.reduceat(parts, starts)
+
+
+def _merge_into_words(words, word_index, parts, part_masks):
+    """
+    Overwrite the masked bits of the words with the parts.
+    Args:
+        words (np.ndarray): The uint64 words to write to.
+        word_index (np.ndarray): The (non-decreasing) word index of every part.
+        parts (np.ndarray): The uint64 parts, shifted to their position in the word.
+        part_masks (np.ndarray): The bits of the word covered by every part.
+    """
+    index, merged_parts = _or_per_word(word_index, parts)
+    _, merged_masks = _or_per_word(word_index, part_masks)
+    words[index] = (words[index] & ~merged_masks) | merged_parts
+
+
+class PackedIntVector:
+    """
+    An unsigned integer vector with an arbitrary bit width (1 to 64 bits per value).
+
+    The values are packed back to back, least significant bit first, into the words
+    of a sdsl4py.int_vector_64 (the same layout as a sdsl int_vector with that
+    width). Reading and writing is vectorized with NumPy, and only touches the words
+    of the requested positions.
+    """
+
+    def __init__(self, size, width):
+        """
+        Initialize the packed vector with zeros.
+        Args:
+            size (int): The number of values.
+            width (int): The number of bits per value (1 to 64).
+        """
+        if width < 1 or width > 64:
+            raise ValueError(f"Invalid width: {width}. Valid widths are 1 to 64")
+        self.size = size
+        self.width = width
+        # One padding word, so that a value can always be read from two words
+        n_words = (size * width + 63) // 64 + 1
+        self.words = sdsl4py.int_vector_64(size=n_words, default_value=0)
+
+    @classmethod
+    def from_array(cls, values, width=None):
+        """
+        Create a packed vector holding the values.
+        Args:
+            values (np.ndarray): The unsigned integer values.
+            width (int): The number of bits per value. If None, the minimal width
+                for the values is used.
+        Returns:
+            PackedIntVector: The packed vector.
+        """
+        values = np.asarray(values, dtype=np.uint64)
+        if width is None:
+            width = minimal_width(values.max() if len(values) else 0)
+        vector = cls(len(values), width)
+        vector.write(0, values)
+        return vector
+
+    @classmethod
+    def from_words(cls, words, size, width):
+        """
+        Create a packed vector over existing words, e.g. a memory mapped array.
+        Args:
+            words: The words, a sdsl4py.int_vector_64 or a uint64 array.
+            size (int): The number of values.
+            width (int): The number of bits per value.
+        Returns:
+            PackedIntVector: The packed vector, which shares the words.
+        """
+        vector = cls.__new__(cls)
+        vector.size = size
+        vector.width = width
+        vector.words = words
+        return vector
+
+    def widened(self, width):
+        """
+        Return a copy of the packed vector with a larger width.
+        Args:
+            width (int): The number of bits per value of the copy.
+        Returns:
+            PackedIntVector: The re-packed vector.
+        """
+        return PackedIntVector.from_array(self.read(slice(0, self.size)), width)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if index < 0 or index >= self.size:
+            raise IndexError("Index out of bounds")
+        # Plain integer arithmetic, as NumPy has a large overhead for a single value
+        bit_pos = index * self.width
+        word_index, shift = bit_pos >> 6, bit_pos & 63
+        value = int(self.words[word_index]) >> shift
+        if shift + self.width > 64:
+            value |= int(self.words[word_index + 1]) << (64 - shift)
+        return value & ((1 << self.width) - 1)
+
+    def __setitem__(self, index, value):
+        if index < 0 or index >= self.size:
+            raise IndexError("Index out of range")
+        self.write(index, np.array([value], dtype=np.uint64))
+
+    def read(self, index):
+        """
+        Unpack the values at a slice or an array of indices.
+        Args:
+            index (slice | np.ndarray): A normalized slice or an array of
+                non-negative indices.
+        Returns:
+            np.ndarray: The uint64 values.
+        """
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(self.size))
+        bit_pos = np.asarray(index, dtype=np.uint64) * np.uint64(self.width)
+        word_index = (bit_pos >> np.uint64(6)).astype(np.int64)
+        shift = bit_pos & np.uint64(63)
+
+        words = np.asarray(self.words)
+        values = words[word_index] >> shift
+        # The values that continue into the next word
+        spill = shift + np.uint64(self.width) > np.uint64(64)
+        if spill.any():
+            high = words[word_index[spill] + 1] << (np.uint64(64) - shift[spill])
+            values[spill] |= high
+        return values & _low_mask(self.width)
+
+    def write(self, offset, values):
+        """
+        Pack the values into the positions offset, offset + 1, ...
+        Args:
+            offset (int): The position of the first value.
+            values (np.ndarray): The unsigned integer values, which must fit in the
+                width of the vector.
+        """
+        values = np.asarray(values, dtype=np.uint64)
+        mask = _low_mask(self.width)
+        bit_pos = (
+            np.arange(offset, offset + len(values), dtype=np.uint64)
+            * np.uint64(self.width)
+        )
+        word_index = (bit_pos >> np.uint64(6)).astype(np.int64)
+        shift = bit_pos & np.uint64(63)
+
+        words = np.asarray(self.words)
+        # The part of every value that lands in its first word
+        _merge_into_words(
+            words, word_index, (values & mask) << shift, np.full_like(values, mask) << shift
+        )
+        # The part of the values that continue into the next word
+        spill = shift + np.uint64(self.width) > np.uint64(64)
+        if spill.any():
+            high_shift = np.uint64(64) - shift[spill]
+            _merge_into_words(
+                words,
+                word_index[spill] + 1,
+                (values[spill] & mask) >> high_shift,
+                mask >> high_shift,
+            )
+
+    def size_in_bytes(self):
+        """
+        Return the size in bytes of the packed words.
+        """
+        return words_size_in_bytes(self.words)
@@ -0,0 +1,87 @@
+import numpy as np
+
+# The largest number of decimal places that is inferred, beyond it the scaled
+# values no longer fit the 53 bits of precision of a float64
+MAX_DECIMAL_PLACES = 15
+
+# Without an error bound, a value is exact if it is decoded within this many
+# units in the last place, the float rounding of the decimal
+_EXACT_ULPS = 4
+
+
+def decimal_errors(values, decimal_places):
+    """
+    Return the absolute error of rounding every value to decimal_places.
+    Args:
+        values (np.ndarray): The float64 values.
+        decimal_places (int): The number of decimal places.
+    Returns:
+        np.ndarray: The absolute errors.
+    """
+    scale = 10 ** decimal_places
+    return np.abs(np.rint(values * scale) / scale - values)
+
+
+def allowed_errors(values, max_error=None):
+    """
+    Return the error that is allowed for every value: max_error, or the float
+    rounding of the value when there is no bound.
+    Args:
+        values (np.ndarray): The float64 values.
+        max_error (float): The absolute error bound. If None, the values must be
+            exact.
+    """
+    if max_error is None:
+        return _EXACT_ULPS * np.spacing(np.abs(values))
+    return max_error
+
+
+def infer_decimal_places(
+    values, max_error=None, max_decimal_places=MAX_DECIMAL_PLACES, min_decimal_places=0
+):
+    """
+    Return the smallest number of decimal places that represents every value
+    exactly, or within max_error.
+    Args:
+        values (np.ndarray): The float64 values, NaN and infinite values are ignored.
+        max_error (float): The absolute error bound. If None, the values must be
+            exact.
+        max_decimal_places (int): The largest number of decimal places to try.
+        min_decimal_places (int): The smallest number of decimal places to try.
+    Returns:
+        int: The number of decimal places, or None if more than
+            max_decimal_places are needed.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    allowed = allowed_errors(values, max_error)
+    for decimal_places in range(min_decimal_places, max_decimal_places + 1):
+        if np.all(decimal_errors(values, decimal_places) <= allowed):
+            return decimal_places
+    return None
+
+
+def check_round_trip(values, decoded, max_error=None, offset=0):
+    """
+    Check that the decoded values match the original values, exactly or within
+    max_error, and that the NaN values are kept.
+    Args:
+        values (np.ndarray): The original float64 values.
+        decoded (np.ndarray): The decoded float64 values.
+        max_error (float): The absolute error bound. If None, the values must be
+            exact.
+        offset (int): The index of the first value, for the error message.
+    Raises:
+        ValueError: If a decoded value does not match its original value.
+    """
+    nan_mask = np.isnan(values)
+    mismatch = (nan_mask != np.isnan(decoded)) | (
+        ~nan_mask & ~(np.abs(decoded - values) <= allowed_errors(values, max_error))
+    )
+    if mismatch.any():
+        i = int(np.flatnonzero(mismatch)[0])
+        bound = "exactly" if max_error is None else f"within {max_error}"
+        raise ValueError(
+            f"The value {values[i]} at index {offset + i} was decoded as "
+            f"{decoded[i]}, which does not match it {bound}"
+        )
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def _find_block(first_value, n_blocks, value, side):
+    """
+    Binary search the block that holds the insertion position of a value, with
+    a single decoded value per step.
+    Args:
+        first_value (callable): Return the first value of a block.
+        n_blocks (int): The number of blocks.
+        value: The value to insert.
+        side (str): "left" or "right", as for np.searchsorted.
+    Returns:
+        int: The last block whose first value is smaller than the value (or equal
+            to it, for the right side), or 0 if there is none.
+    """
+    low, high = 0, n_blocks - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        first = first_value(middle)
+        if first < value or (side == "right" and first == value):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def searchsorted_blocks(values, side, n_elements, block_size, first_value, search_block):
+    """
+    Find the insertion positions of values in a sorted vector which is stored in
+    blocks, like np.searchsorted. The first values of the blocks narrow the search
+    down to a single block, which is then searched on its own, so only
+    O(log(n_blocks)) single values and one block per value are decoded.
+    Args:
+        values: A value or an array of values to insert.
+        side (str): "left" or "right", as for np.searchsorted.
+        n_elements (int): The number of elements of the vector.
+        block_size (int): The number of elements per block.
+        first_value (callable): Return the first value of a block.
+        search_block (callable): Return the insertion positions of an array of
+            values within a block, as search_block(block, values, side).
+    Returns:
+        int | np.ndarray: The insertion position(s), an int for a single value.
+    Raises:
+        ValueError: If side is not "left" or "right".
+    """
+    if side not in ("left", "right"):
+        raise ValueError(f"Invalid side: {side}. Valid sides are 'left' and 'right'")
+    values = np.asarray(values)
+    is_scalar = values.ndim == 0
+    values = values.ravel()
+
+    positions = np.zeros(len(values), dtype=np.int64)
+    if n_elements > 0:
+        n_blocks = -(-n_elements // block_size)
+        blocks = np.array(
+            [_find_block(first_value, n_blocks, value, side) for value in values],
+            dtype=np.int64,
+        )
+        # Every block is only searched once, for all the values it holds
+        for block in np.unique(blocks):
+            selected = blocks == block
+            positions[selected] = block * block_size + np.asarray(
+                search_block(int(block), values[selected], side)
+            )
+    return int(positions[0]) if is_scalar else positions
@@ -0,0 +1,91 @@
+import json
+import struct
+
+import numpy as np
+
+# The file starts with the magic bytes and the length of the JSON header
+_MAGIC = b"SDSLVEC1"
+_HEADER_LENGTH = struct.Struct("<Q")
+
+# Every array section starts at a multiple of the alignment, so that the memory
+# mapped arrays are aligned for every dtype
+_ALIGNMENT = 64
+
+
+def _aligned(offset):
+    """
+    Round the offset up to the alignment of the array sections.
+    """
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_sections(file_path, header, arrays):
+    """
+    Write a JSON header and named arrays to a single file.
+
+    The file layout is: the magic bytes, the length of the JSON header, the JSON
+    header, and the (aligned) raw bytes of every array. The header holds the given
+    metadata and the dtype, shape and offset of every array.
+    Args:
+        file_path (str): The path of the file to write.
+        header (dict): JSON serializable metadata.
+        arrays (dict): The arrays to write, by name.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    # The offsets are relative to the start of the data, right after the header
+    sections = {}
+    offset = 0
+    for name, array in arrays.items():
+        sections[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps({"metadata": header, "sections": sections}).encode()
+    data_start = _aligned(len(_MAGIC) + _HEADER_LENGTH.size + len(header_bytes))
+
+    with open(file_path, "wb") as file:
+        file.write(_MAGIC)
+        file.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        file.write(header_bytes)
+        for name, array in arrays.items():
+            file.seek(data_start + sections[name]["offset"])
+            # Write the array without an intermediate bytes copy
+            file.write(memoryview(array).cast("B"))
+        file.truncate(data_start + offset)
+
+
+def read_sections(file_path, mode="r"):
+    """
+    Read the header of a file written by `write_sections`, and memory map its
+    arrays, so that only the pages that are accessed are loaded.
+    Args:
+        file_path (str): The path of the file to read.
+        mode (str): The numpy.memmap mode, "r" (read-only), "r+" (write through to
+            the file) or "c" (copy-on-write). (default: "r")
+    Returns:
+        tuple: The metadata and the memory mapped arrays, by name.
+    """
+    with open(file_path, "rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{file_path} is not a compressed vector file")
+        (header_length,) = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+        header = json.loads(file.read(header_length))
+    data_start = _aligned(len(_MAGIC) + _HEADER_LENGTH.size + header_length)
+
+    arrays = {}
+    for name, section in header["sections"].items():
+        shape = tuple(section["shape"])
+        if not np.prod(shape):
+            # An empty array cannot be memory mapped
+            arrays[name] = np.zeros(shape, dtype=section["dtype"])
+            continue
+        arrays[name] = np.memmap(
+            file_path,
+            dtype=section["dtype"],
+            mode=mode,
+            offset=data_start + section["offset"],
+            shape=shape,
+        )
+    return header["metadata"], arrays
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from plotly import graph_objects as go
+from plotly_resampler import FigureResampler
+from plotly_resampler.aggregation import MinMaxAggregator
+from plotly_resampler.aggregation.aggregation_cache import AggregationCache
+
+
+def test_aggregation_cache_lru():
+    cache = AggregationCache(max_bytes=3 * 1000 * 8)
+    result = lambda: (np.arange(500.0), np.arange(500.0), np.arange(500))  # noqa: E731
+    for i in range(4):
+        cache.put(("uid", i), result())
+    # The least recently used result is evicted to stay within the byte budget
+    assert len(cache) == 2 and cache.current_bytes <= cache.max_bytes
+    assert cache.get(("uid", 0)) is None and cache.get(("uid", 3)) is not None
+    assert cache.info()["hits"] == 1 and cache.info()["misses"] == 1
+    # The cached results are shared and thus read-only
+    with pytest.raises(ValueError):
+        cache.get(("uid", 3))[1][0] = 1
+
+    cache.invalidate("uid")
+    assert len(cache) == 0 and cache.current_bytes == 0
+    with pytest.raises(ValueError):
+        AggregationCache(0)
+
+
+def test_aggregation_cache_figure():
+    y = np.random.default_rng(13).normal(size=100_000)
+    fig = FigureResampler(
+        default_n_shown_samples=500,
+        default_downsampler=MinMaxAggregator(),
+        aggregation_cache_bytes=1 << 24,
+    )
+    fig.add_trace(go.Scattergl(name="cached"), hf_y=y)
+    zoom = {"xaxis.range[0]": 1_000, "xaxis.range[1]": 50_000}
+    reset = {"xaxis.autorange": True, "xaxis.showspikes": False}
+
+    # Zooming in and resetting the axes twice only aggregates every window once
+    first_zoom = fig._construct_update_data(zoom)
+    first_reset = fig._construct_update_data(reset)
+    second_zoom = fig._construct_update_data(zoom)
+    second_reset = fig._construct_update_data(reset)
+    info = fig.aggregation_cache_info()
+    assert info["hits"] >= 2 and info["entries"] == 2
+    assert np.array_equal(first_zoom[1]["y"], second_zoom[1]["y"])
+    assert np.array_equal(first_reset[1]["y"], second_reset[1]["y"])
+
+    # Replacing the hf data invalidates the cached results of the trace
+    fig.hf_data[0]["y"] = -y
+    update = fig._construct_update_data(zoom)
+    assert np.array_equal(update[1]["y"], -np.asarray(first_zoom[1]["y"]))
+
+    # Changing the number of shown samples changes the key
+    fig.hf_data[0]["max_n_samples"] = 100
+    assert len(fig._construct_update_data(zoom)[1]["y"]) <= 100
+
+    # Changing the downsampler kwargs changes the key
+    hf_trace_data = fig.hf_data[0]
+    key = AggregationCache.make_key("uid", hf_trace_data, 1_000, 50_000)
+    hf_trace_data["downsampler_kwargs"] = {"parallel": True}
+    assert AggregationCache.make_key("uid", hf_trace_data, 1_000, 50_000) != key
+
+    # The cache is opt-in
+    assert FigureResampler().aggregation_cache_info() is None
+    assert FigureResampler(aggregation_cache_bytes=None).aggregation_cache_info() is None
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotly_resampler.aggregation import MinMaxAggregator, MinMaxLTTB, NoGapHandler
+from plotly_resampler.aggregation.bucket_grid import BucketGrids
+from plotly_resampler.aggregation.plotly_aggregator_parser import PlotlyAggregatorParser
+
+
+def _brute_force_minmax(y, start_idx, end_idx, k):
+    """The min and max of every grid-aligned bucket of k values in the range."""
+    indices = []
+    for bucket_start in range(start_idx - start_idx % k, end_idx, k):
+        lo, hi = max(bucket_start, start_idx), min(bucket_start + k, end_idx)
+        values = y[lo:hi]
+        if not np.isnan(values).all():
+            indices += [lo + np.nanargmin(values), lo + np.nanargmax(values)]
+    return np.unique(indices) - start_idx
+
+
+def test_bucket_grid_pan():
+    rng = np.random.default_rng(14)
+    y = rng.normal(size=100_000)
+    y[[10, 5_000, 5_001]] = np.nan
+    y[20_000:21_000] = np.nan
+    grids = BucketGrids(y)
+
+    start, width, n_bins = 1_234, 40_000, 200
+    k = grids.bucket_size(width, n_bins)
+    assert width / k <= n_bins - 2
+    for shift in (0, 1_500, 3_000, 2_000, 55_000):
+        indices = grids.minmax(start + shift, start + shift + width, n_bins)
+        assert np.array_equal(
+            indices, _brute_force_minmax(y, start + shift, start + shift + width, k)
+        )
+        # At most n_bins buckets, including the partial edge buckets
+        assert len(indices) <= 2 * n_bins
+
+    # The pans only summarized the newly exposed buckets, the jump a new window
+    def n_full_buckets(start_idx, end_idx):
+        return end_idx // k + start_idx // -k
+
+    assert grids.grids[k].n_summarized == n_full_buckets(
+        start, start + 3_000 + width
+    ) + n_full_buckets(start + 55_000, start + 55_000 + width)
+
+    # Selecting the first NaN of every bucket that contains NaNs
+    indices = grids.minmax(0, width, n_bins, keep_nans=True)
+    for nan_idx in (10, 5_000):
+        assert nan_idx in indices
+    assert 5_001 not in indices
+
+
+@pytest.mark.parametrize(
+    "downsampler", [MinMaxAggregator(grid_aligned=True), MinMaxLTTB(grid_aligned=True)]
+)
+def test_grid_aligned_aggregation(downsampler):
+    y = np.random.default_rng(15).normal(size=200_000).cumsum()
+    hf_trace_data = {
+        "x": np.arange(len(y)),
+        "y": y,
+        "downsampler": downsampler,
+        "gap_handler": NoGapHandler(),
+        "max_n_samples": 500,
+    }
+    for start in (10_000, 12_000, 14_000):
+        agg_x, agg_y, indices = PlotlyAggregatorParser.aggregate(
+            hf_trace_data, start, start + 100_000
+        )
+        assert 0 < len(agg_y) <= 500
+        assert np.array_equal(y[agg_x], agg_y)
+        if isinstance(downsampler, MinMaxAggregator):
+            assert agg_y.max() == y[start : start + 100_000].max()
+            assert agg_y.min() == y[start : start + 100_000].min()
+    assert len(hf_trace_data["bucket_grids"].grids) == 1
+
+
+@pytest.mark.parametrize(
+    "downsampler", [MinMaxAggregator(grid_aligned=True), MinMaxLTTB(grid_aligned=True)]
+)
+def test_grid_aligned_tz_aware_x(downsampler):
+    from plotly import graph_objects as go
+    from plotly_resampler import FigureResampler
+
+    y = np.random.default_rng(20).normal(size=200_000).cumsum()
+    x = pd.date_range("2024-01-01", periods=len(y), freq="1s", tz="Europe/Brussels")
+    fig = FigureResampler(default_n_shown_samples=500, default_downsampler=downsampler)
+    fig.add_trace(go.Scattergl(name="grid"), hf_x=x, hf_y=y)
+    assert 0 < len(fig.data[0]["y"]) <= 500
+
+    relayout = {"xaxis.range[0]": str(x[10_000]), "xaxis.range[1]": str(x[150_000])}
+    update = fig._construct_update_data(relayout)
+    agg_x, agg_y = pd.DatetimeIndex(update[1]["x"]), np.asarray(update[1]["y"])
+    assert 0 < len(agg_y) <= 500
+    assert np.array_equal(y[x.get_indexer(agg_x)], agg_y)
@@ -1,6 +1,10 @@
 import pytest
 import numpy as np
-from data_structures.compressed_vector import CompressedVector
+from data_structures.compressed_vector import (
+    ENCODINGS,
+    CompressedVector,
+    CompressedVectorView,
+)
 import sdsl4py
 
 def get_original_vector_and_decimal_places(width):
@@ -174,3 +178,454 @@ def test_get_compressed():
     for i, index in enumerate(indices_list):
         assert round(cv_list_values[i], decimal_places) == round(original_list_values[index], decimal_places), \
             f"Decompressed value {cv_list_values[i]} does not match original {original_list_values[index]}"
+
+
+def test_compressed_views():
+    original_vector = np.round(np.random.randn(20_000), 2)
+    original_vector[5] = np.nan
+    cv = CompressedVector(2, "auto", get_decompressed=False)
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+    expected = cv.quantize(original_vector)
+
+    # Chained slices compose the positions, without decoding or copying
+    view = cv[1_000:19_000:3][10:5_000][::2]
+    assert isinstance(view, CompressedVectorView)
+    assert view.vector is cv
+    assert (view.offset, view.stride, len(view)) == (1_030, 6, 2_495)
+    np.testing.assert_array_equal(np.asarray(view), expected[1_000:19_000:3][10:5_000][::2])
+    assert view[-1] == expected[1_000:19_000:3][10:5_000][::2][-1]
+
+    # The requested positions are selected, also for lists and arrays of indices
+    np.testing.assert_array_equal(np.asarray(cv[[7, 1, -1]]), expected[[7, 1, -1]])
+    np.testing.assert_array_equal(np.asarray(cv[10:100][[3, -1]]), expected[10:100][[3, -1]])
+    np.testing.assert_array_equal(np.asarray(cv[::-1][:10]), expected[::-1][:10])
+    assert cv[0:10].count_nans() == 1 and cv[0:10][::2].count_nans() == 0
+
+
+@pytest.mark.parametrize("encoding", ["split", "xor"])
+def test_searchsorted(encoding):
+    rng = np.random.default_rng(0)
+    x = np.round(np.cumsum(rng.integers(0, 3, 100_000)) / 10, 1)
+    cv = CompressedVector(1, "auto", encoding=encoding, cache_bytes=1 << 20)
+    cv.create_vector(len(x))
+    cv.fill_from_vector(x)
+
+    values = np.concatenate((x[rng.integers(0, len(x), 50)] + [0, 0.05] * 25, [-1, x[-1] + 1]))
+    for side in ("left", "right"):
+        np.testing.assert_array_equal(cv.searchsorted(values, side), np.searchsorted(x, values, side))
+        assert cv.searchsorted(x[1_234], side) == np.searchsorted(x, x[1_234], side)
+    with pytest.raises(ValueError):
+        cv.searchsorted(1.0, "middle")
+
+
+def test_fill_from_vector_bulk_encoding():
+    original_vector = [-12.56, 0.29, 98.43, -42.0, 0.999, float("nan"), 1.5]
+    decimal_places = 2
+    # Encode the values in bulk
+    cv = CompressedVector(decimal_places, 16)
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+
+    # Encode the values one by one
+    cv_single = CompressedVector(decimal_places, 16)
+    cv_single.create_vector(len(original_vector))
+    for i, value in enumerate(original_vector):
+        cv_single[i] = value
+
+    for bulk, single in zip(cv, cv_single):
+        assert (np.isnan(bulk) and np.isnan(single)) or bulk == single, \
+            f"Bulk encoded value {bulk} does not match single encoded value {single}"
+
+    # The decimals that round up to a full unit are carried to the integer part
+    assert cv[4] == 1.0
+    assert np.isnan(cv[5])
+
+
+def test_decompressed_window_decode():
+    original_vector = np.array([-12.56, 0.01, 98.43, float("nan"), 0.99, -3.5, 7.25])
+    decimal_places = 2
+    cv = CompressedVector(decimal_places, 16)
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+
+    # The sdsl4py compressed vectors have no buffer, so they are decoded per index
+    for c_vector in (cv, CompressedVector(decimal_places, 16)):
+        if c_vector is not cv:
+            c_vector.create_vector(len(original_vector))
+            c_vector.fill_from_vector(original_vector)
+            c_vector.compress(sdsl4py.dac_vector)
+
+        for index in (slice(2, 5), slice(None, None, -2), [0, -1, 3], np.array([6, 1])):
+            assert np.allclose(
+                c_vector[index], original_vector[index], equal_nan=True
+            ), f"Decompressed window {c_vector[index]} does not match {original_vector[index]}"
+
+        with pytest.raises(IndexError):
+            c_vector[[len(original_vector)]]
+
+
+def test_fixed_point_encoding():
+    original_vector, decimal_places = get_original_vector_and_decimal_places(64)
+    cv = CompressedVector(decimal_places, 64, encoding="fixed_point")
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+    verify_compressed_vector(original_vector, decimal_places, cv)
+
+    # Only a single vector is stored
+    assert cv.integer_part is None and cv.decimal_part is None and cv.sign_part is None
+    assert type(cv.value_part) == sdsl4py.int_vector_64
+
+    # NaN values are kept aside and can be overwritten
+    values = [-1.25, float("nan"), 3.5, float("nan")]
+    cv = CompressedVector(2, 16, encoding="fixed_point")
+    cv.create_vector(len(values))
+    cv.fill_from_vector(values)
+    assert np.allclose(cv[0:4], values, equal_nan=True)
+    cv[1] = -0.5
+    assert list(cv.nan_bitmap.ones()) == [3]
+    assert np.allclose(cv[[1, 3]], [-0.5, float("nan")], equal_nan=True)
+
+    with pytest.raises(ValueError):
+        CompressedVector(2, 16, encoding="unknown")
+    with pytest.raises(ValueError, match="Invalid int_width"):
+        CompressedVector(2, 12)
+
+
+def test_auto_int_width():
+    original_vector = [-1234.56, 0.01, 987.65, -42.0, 0.99, float("nan")]
+    decimal_places = 2
+    cv = CompressedVector(decimal_places, "auto")
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+    assert np.allclose(cv[0:len(original_vector)], original_vector, equal_nan=True)
+
+    # 1234 needs 11 bits, 99 needs 7 bits and the sign a single bit
+    assert cv.component_widths == {"integer_part": 11, "decimal_part": 7, "sign_part": 1}
+
+    cv_64 = CompressedVector(decimal_places, 64)
+    cv_64.create_vector(len(original_vector))
+    cv_64.fill_from_vector(original_vector)
+    assert cv.size_in_bytes() < cv_64.size_in_bytes()
+    assert cv.bits_per_value < cv_64.bits_per_value
+
+
+def test_auto_int_width_assignment():
+    for encoding in ("split", "fixed_point"):
+        cv = CompressedVector(1, "auto", encoding=encoding)
+        cv.create_vector(3)
+        cv.fill_from_vector([1.0, 2.0, 3.0])
+        widths = cv.component_widths
+
+        # A value that needs more bits than the fill data re-packs its part
+        cv[0] = 1000.5
+        cv[1] = -2.5
+        assert cv[0:3].tolist() == [1000.5, -2.5, 3.0]
+        assert sum(cv.component_widths.values()) > sum(widths.values())
+
+    # A fixed int_width cannot hold it
+    cv = CompressedVector(1, 8)
+    cv.create_vector(3)
+    cv.fill_from_vector([1.0, 2.0, 3.0])
+    with pytest.raises(ValueError, match="overflows int_width 8"):
+        cv[0] = 1000.5
+
+
+def test_nan_bitmap():
+    original_vector = [1.5, float("nan"), float("nan"), -2.25, 0.5, float("nan"), 3.0]
+    for encoding in ("split", "fixed_point"):
+        cv = CompressedVector(2, 16, encoding=encoding)
+        cv.create_vector(len(original_vector))
+        cv.fill_from_vector(original_vector)
+        assert np.allclose(cv[0:7], original_vector, equal_nan=True)
+        assert np.isnan(cv[1]) and cv[3] == -2.25
+
+        assert cv.count_nans() == 3
+        assert cv.count_nans(2, 5) == 1
+        run_starts, run_ends = cv.non_nan_runs()
+        assert list(zip(run_starts, run_ends)) == [(0, 1), (3, 5), (6, 7)]
+
+        cv[2] = -1.0
+        cv[6] = float("nan")
+        assert cv.count_nans() == 3
+        assert np.allclose(cv[[2, 6]], [-1.0, float("nan")], equal_nan=True)
+
+        if encoding == "split":
+            # The sign is stored in a single bit, instead of a full integer width
+            assert cv.component_widths["sign_part"] == 1
+
+
+def test_block_summaries():
+    rng = np.random.default_rng(6)
+    original_vector = rng.normal(size=10_000).round(2)
+    original_vector[[5, 130, 9_999]] = np.nan
+    block_size = 64
+    cv = CompressedVector(2, 32, block_size=block_size)
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+
+    summaries = cv.block_summaries
+    assert len(summaries) == -(-len(original_vector) // block_size)
+    for block in (0, 2, len(summaries) - 1):
+        values = original_vector[block * block_size:(block + 1) * block_size]
+        assert summaries.nan_count[block] == np.isnan(values).sum()
+        assert summaries.min[block] == pytest.approx(np.nanmin(values))
+        assert summaries.max[block] == pytest.approx(np.nanmax(values))
+        assert summaries.argmin[block] == block * block_size + np.nanargmin(values)
+        assert summaries.argmax[block] == block * block_size + np.nanargmax(values)
+
+    # The summary of a block is kept up to date when a value is set
+    cv[70] = 9.5
+    assert summaries.max[1] == pytest.approx(9.5)
+    assert summaries.argmax[1] == 70
+
+
+def test_block_summaries_aggregation():
+    from plotly import graph_objects as go
+    from plotly_resampler import FigureResampler
+    from plotly_resampler.aggregation import MinMaxAggregator
+
+    rng = np.random.default_rng(7)
+    original_vector = rng.normal(size=100_000).round(2)
+    cv = CompressedVector(2, "auto", encoding="fixed_point", block_size=128)
+    cv.fill_from_vector(original_vector)
+
+    fig = FigureResampler(
+        default_n_shown_samples=200, default_downsampler=MinMaxAggregator()
+    )
+    fig.add_trace(go.Scattergl(name="summaries"), hf_y=cv)
+
+    # The selected points are the real data points, including the extremes
+    agg_x, agg_y = np.asarray(fig.data[0]["x"]), np.asarray(fig.data[0]["y"])
+    assert len(agg_y) <= 200
+    assert np.allclose(original_vector[agg_x], agg_y)
+    assert agg_y.max() == pytest.approx(original_vector.max())
+    assert agg_y.min() == pytest.approx(original_vector.min())
+
+
+
+@pytest.mark.parametrize("downsampler", ["MinMaxAggregator", "MinMaxLTTB"])
+def test_block_summaries_tz_aware_x(downsampler):
+    import pandas as pd
+    from plotly import graph_objects as go
+    from plotly_resampler import FigureResampler
+    from plotly_resampler import aggregation
+
+    rng = np.random.default_rng(21)
+    original_vector = rng.normal(size=200_000).cumsum().round(2)
+    cv = CompressedVector(2, "auto", encoding="fixed_point", block_size=64)
+    cv.fill_from_vector(original_vector)
+    x = pd.date_range("2024-01-01", periods=len(cv), freq="1s", tz="Europe/Brussels")
+
+    figures = []
+    for hf_y in (cv, original_vector):
+        fig = FigureResampler(
+            default_n_shown_samples=20,
+            default_downsampler=getattr(aggregation, downsampler)(),
+        )
+        fig.add_trace(go.Scattergl(name="summaries"), hf_x=x, hf_y=hf_y)
+        figures.append(fig)
+
+    # The block summaries select the same data points as the in-memory data
+    relayout = {"xaxis.range[0]": str(x[1_234]), "xaxis.range[1]": str(x[-4_321])}
+    summarized, expected = (fig._construct_update_data(relayout) for fig in figures)
+    assert np.array_equal(summarized[1]["x"], expected[1]["x"])
+    assert np.allclose(summarized[1]["y"], expected[1]["y"])
+
+
+def test_block_cache():
+    from concurrent.futures import ThreadPoolExecutor
+
+    rng = np.random.default_rng(8)
+    original_vector = rng.normal(size=50_000).round(2)
+    # A budget of 3 cached blocks of 4096 float64 values
+    cv = CompressedVector(2, 32, cache_bytes=3 * 4096 * 8)
+    cv.create_vector(len(original_vector))
+    cv.fill_from_vector(original_vector)
+
+    assert np.allclose(cv[100:5000], original_vector[100:5000])
+    assert cv.cache_info()["misses"] == 2 and cv.cache_info()["hits"] == 0
+    # The same view only hits the cache
+    assert np.allclose(cv[100:5000], original_vector[100:5000])
+    assert cv.cache_info()["misses"] == 2 and cv.cache_info()["hits"] == 2
+    assert np.allclose(cv[[10, 4100, 20]], original_vector[[10, 4100, 20]])
+    assert cv.cache_info()["hits"] == 4
+
+    # The least recently used blocks are evicted to stay within the budget
+    assert np.allclose(cv[20_000:30_000], original_vector[20_000:30_000])
+    info = cv.cache_info()
+    assert info["blocks"] == 3 and info["current_bytes"] <= info["max_bytes"]
+
+    # A changed value invalidates its cached block
+    cv[20_001] = 1.25
+    assert cv[20_000:20_002][1] == 1.25
+
+    # Concurrent readers get the right values
+    windows = [(start, start + 3000) for start in range(0, 45_000, 1500)] * 4
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda w: cv[w[0]:w[1]], windows))
+    expected = original_vector.copy()
+    expected[20_001] = 1.25
+    for (start, stop), values in zip(windows, results):
+        assert np.allclose(values, expected[start:stop])
+
+
+def test_numpy_interop():
+    # Non-negative integers keep the float64 dtype of the vector
+    cv = CompressedVector(0, 32)
+    cv.create_vector(5)
+    cv.fill_from_vector([1, 2, 3, 4, 5])
+    assert np.asarray(cv).dtype == cv.dtype
+    assert np.array(cv).dtype == cv.dtype
+    assert np.asarray(cv).tolist() == [1, 2, 3, 4, 5]
+
+    # The unsigned dtype of the integer part is exported without a decode nor a copy
+    words = np.asarray(cv.integer_part)
+    array = np.asarray(cv, dtype=words.dtype)
+    assert array.tolist() == [1, 2, 3, 4, 5]
+    assert np.shares_memory(array, words)
+    assert not array.flags.writeable
+    assert not np.shares_memory(np.array(cv, dtype=words.dtype, copy=True), words)
+
+    # Other values are decoded with a single vectorized decode
+    values = [1.5, -2.25, float("nan")]
+    cv = CompressedVector(2, 16)
+    cv.create_vector(len(values))
+    cv.fill_from_vector(values)
+    assert np.asarray(cv).dtype == cv.dtype
+    assert np.allclose(np.asarray(cv), values, equal_nan=True)
+    with pytest.raises(ValueError):
+        np.array(cv, copy=False)
+
+
+def test_save_and_open(tmp_path):
+    rng = np.random.default_rng(10)
+    original_vector = rng.normal(size=10_000).round(2)
+    original_vector[[3, 4_000]] = np.nan
+    file_path = str(tmp_path / "vector.cvec")
+    for int_width, encoding in ((16, "split"), ("auto", "fixed_point")):
+        cv = CompressedVector(2, int_width, encoding=encoding, block_size=256)
+        cv.create_vector(len(original_vector))
+        cv.fill_from_vector(original_vector)
+        cv.save(file_path)
+
+        opened = CompressedVector.open(file_path)
+        assert len(opened) == len(original_vector)
+        assert np.allclose(opened[:], original_vector, equal_nan=True)
+        assert np.allclose(opened[[0, 9_999]], original_vector[[0, 9_999]])
+        assert opened.count_nans() == 2
+        assert np.array_equal(opened.block_summaries.max, cv.block_summaries.max)
+
+        # The file is memory mapped read-only, unless another mode is asked
+        with pytest.raises(ValueError):
+            opened[0] = 1.0
+        copy_on_write = CompressedVector.open(file_path, mode="c")
+        copy_on_write[0] = 1.0
+        assert copy_on_write[0] == 1.0
+        assert CompressedVector.open(file_path)[0] == original_vector[0]
+
+
+def test_fill_from_file_streaming(tmp_path, monkeypatch, capsys):
+    import data_structures.csv_reader as csv_reader
+
+    # Small chunks, so that the file is read in several chunks
+    monkeypatch.setattr(csv_reader, "_PARSE_CHUNK_ROWS", 7)
+    rng = np.random.default_rng(11)
+    values = rng.normal(size=50).round(2)
+    file_path = tmp_path / "data.csv"
+    file_path.write_text(
+        "".join(f"{i};{value};{-value}\n" for i, value in enumerate(values))
+    )
+    assert csv_reader.count_rows(str(file_path)) == 50
+    assert csv_reader.count_rows(str(file_path), truncate=20) == 20
+
+    for int_width in (64, "auto"):
+        cv = CompressedVector(2, int_width)
+        assert cv.fill_from_file(str(file_path)) == 50
+        assert len(cv) == 50
+        assert np.allclose(cv[:], values)
+
+        cv = CompressedVector(2, int_width)
+        cv.fill_from_file(str(file_path), column=2, truncate=20)
+        assert len(cv) == 20
+        assert np.allclose(cv[:], -values[:20])
+
+    # Invalid values are skipped
+    file_path.write_text("0;1.5\n1;abc\n2;2.5")
+    cv = CompressedVector(1, 64)
+    cv.fill_from_file(str(file_path))
+    assert len(cv) == 2
+    assert np.allclose(cv[:], [1.5, 2.5])
+
+    # Empty fields and rows without the column are skipped as well, only the texts
+    # of a NaN value are read as NaN
+    file_path.write_text("0;1.5\n1;\n2\n3;nan\n4;NA\n5;2.5\n6; -NaN\n")
+    capsys.readouterr()
+    cv = CompressedVector(1, 64)
+    cv.fill_from_file(str(file_path))
+    assert np.allclose(cv[:len(cv)], [1.5, np.nan, 2.5, np.nan], equal_nan=True)
+    assert capsys.readouterr().out.count("Invalid value") == 3
+
+
+def test_xor_codec():
+    rng = np.random.default_rng(13)
+    # Slowly varying raw float64 values, which do not fit any decimal places
+    original_vector = 20.0 + np.cumsum(rng.normal(size=5_000)) * 1e-3
+    original_vector[[7, 4_000]] = np.nan
+    original_vector[9] = -0.0
+    cv = CompressedVector(encoding="xor", block_size=256)
+    cv.fill_from_vector(original_vector)
+
+    # Lossless, down to the bits
+    assert len(cv) == len(original_vector)
+    assert np.array_equal(cv[:].view(np.uint64), original_vector.view(np.uint64))
+    assert np.array_equal(cv[5:4_990:13], original_vector[5:4_990:13], equal_nan=True)
+    indices = rng.integers(0, len(original_vector), 100)
+    assert np.array_equal(cv[indices], original_vector[indices], equal_nan=True)
+    assert cv[-1] == original_vector[-1]
+    assert cv.count_nans() == 2
+    assert cv.block_summaries.nan_count.sum() == 2
+    assert cv.bits_per_value < 64
+
+    # A constant series only stores the first value of every block (and the NaN
+    # bitmap)
+    cv = CompressedVector(encoding="xor")
+    cv.fill_from_vector(np.full(10_000, 3.5))
+    assert np.all(cv[:] == 3.5)
+    assert cv.bits_per_value < 2
+    with pytest.raises(ValueError):
+        cv[0] = 1.0
+
+
+def test_auto_decimal_places():
+    rng = np.random.default_rng(16)
+    original_vector = rng.normal(size=10_000).round(3)
+    original_vector[5] = np.nan
+    for encoding in ENCODINGS:
+        cv = CompressedVector("auto", "auto", encoding=encoding)
+        cv.fill_from_vector(original_vector)
+        assert cv.decimal_places == 3
+        np.testing.assert_allclose(cv[:], original_vector, rtol=0, atol=1e-12)
+
+    # The smallest decimal places within an error bound
+    cv = CompressedVector("auto", "auto", max_error=0.01)
+    cv.fill_from_vector(original_vector)
+    assert cv.decimal_places == 2
+    assert np.nanmax(np.abs(cv[:] - original_vector)) <= 0.01
+
+    # The error bound cannot be met with the given decimal places
+    cv = CompressedVector(1, "auto", max_error=0.01)
+    with pytest.raises(ValueError):
+        cv.fill_from_vector(original_vector)
+
+    # The round trip check catches an overflow of a fixed width
+    cv = CompressedVector("auto", 8)
+    cv.create_vector(100)
+    with pytest.raises(ValueError):
+        cv.fill_from_vector(np.arange(100) * 10.5)
+
+    # Without a round trip check, an overflow of a fixed width is warned about
+    cv = CompressedVector(1, 8)
+    cv.create_vector(100)
+    with pytest.warns(RuntimeWarning, match="overflow int_width 8"):
+        cv.fill_from_vector(np.arange(100) * 10.5)
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from data_structures.compressed_vector_tools import convert_vectors_to_sdsl4py
+
+
+def test_parallel_conversion():
+    rng = np.random.default_rng(15)
+    columns = [rng.normal(size=10_000).round(3) for _ in range(6)]
+
+    sequential = convert_vectors_to_sdsl4py(*columns, decimal_places=3, int_width="auto")
+    parallel = convert_vectors_to_sdsl4py(
+        *columns, decimal_places=3, int_width="auto", n_workers=4
+    )
+    # The vectors are returned in the order of the columns
+    for column, vector, parallel_vector in zip(columns, sequential, parallel):
+        np.testing.assert_allclose(parallel_vector[:], column)
+        assert parallel_vector.size_in_bytes() == vector.size_in_bytes()
+
+    vectors, reports = convert_vectors_to_sdsl4py(*columns, auto_tune=True, n_workers=3)
+    assert len(vectors) == len(reports) == len(columns)
+    with pytest.raises(ValueError):
+        convert_vectors_to_sdsl4py(*columns, n_workers=0)
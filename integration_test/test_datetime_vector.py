@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotly import graph_objects as go
+from data_structures.datetime_vector import DatetimeVector
+from plotly_resampler import FigureResampler
+
+
+def test_datetime_vector_round_trip():
+    index = pd.date_range(
+        "2022-03-27", periods=5_000, freq="250ms", tz="Europe/Brussels"
+    ).as_unit("ns")
+    dv = DatetimeVector()
+    dv.create_vector(len(index))
+    dv.fill_from_vector(index)
+
+    assert len(dv) == len(index)
+    assert str(dv.tz) == "Europe/Brussels"
+    assert dv.dtype == index.dtype
+    assert dv.is_monotonic_increasing
+    assert dv[7] == index[7]
+    assert dv[-1] == index[-1]
+    pd.testing.assert_index_equal(dv[100:4_000:3], index[100:4_000:3])
+    pd.testing.assert_index_equal(dv[[3, 1, 4_999]], index[[3, 1, 4_999]])
+    for ts in ["2022-03-27 01:00:00.1", pd.Timestamp("2022-03-27 00:05:00", tz="UTC")]:
+        for side in ("left", "right"):
+            assert dv.searchsorted(ts, side) == index.searchsorted(ts, side)
+    # A fixed sampling rate needs about a single bit per value
+    assert dv.bits_per_value < 8
+
+    # Naive timestamps stay naive
+    dv = DatetimeVector()
+    dv.fill_from_vector(index.tz_localize(None).values)
+    assert dv.tz is None
+    assert dv[0] == index[0].tz_localize(None)
+
+    with pytest.raises(ValueError):
+        DatetimeVector().fill_from_vector(pd.DatetimeIndex(["2022-01-01", None]))
+
+
+@pytest.mark.parametrize("tz", [None, "Europe/Brussels"])
+def test_datetime_vector_figure_resampler(tz):
+    index = pd.date_range("2022-03-27", periods=50_000, freq="1s", tz=tz)
+    y = np.sin(np.arange(len(index)) / 100)
+    dv = DatetimeVector()
+    dv.fill_from_vector(index)
+
+    fig = FigureResampler(go.Figure(), default_n_shown_samples=500)
+    fig.add_trace(go.Scattergl(name="s"), hf_x=dv, hf_y=y)
+    reference = FigureResampler(go.Figure(), default_n_shown_samples=500)
+    reference.add_trace(go.Scattergl(name="s"), hf_x=index, hf_y=y)
+    # The datetime vector is not converted into a pd.DatetimeIndex
+    assert fig.hf_data[0]["x"] is dv
+    assert fig.data[0].name == reference.data[0].name
+
+    relayout_data = {
+        "xaxis.range[0]": "2022-03-27 01:30:00",
+        "xaxis.range[1]": "2022-03-27 05:00:00",
+    }
+    update = fig._construct_update_data(relayout_data)[1]
+    reference_update = reference._construct_update_data(relayout_data)[1]
+    assert update["name"] == reference_update["name"]
+    np.testing.assert_array_equal(update["x"], reference_update["x"])
+    np.testing.assert_array_equal(update["y"], reference_update["y"])
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from plotly import graph_objects as go
+from data_structures.delta_vector import DeltaVector
+from plotly_resampler import FigureResampler
+
+
+def test_delta_vector_round_trip():
+    rng = np.random.default_rng(42)
+    original_vector = np.cumsum(rng.integers(0, 50, 1000)) / 100
+    dv = DeltaVector(decimal_places=2, anchor_interval=64)
+    dv.create_vector(len(original_vector))
+    dv.fill_from_vector(original_vector)
+
+    assert len(dv) == len(original_vector)
+    assert dv.is_monotonic_increasing
+    np.testing.assert_allclose(dv[:], original_vector)
+    np.testing.assert_allclose(dv[100:900:7], original_vector[100:900:7])
+    np.testing.assert_allclose(dv[::-1], original_vector[::-1])
+    indices = rng.integers(0, len(original_vector), 50)
+    np.testing.assert_allclose(dv[indices], original_vector[indices])
+    assert dv[-1] == pytest.approx(original_vector[-1])
+
+    # Non-monotonic data is still encoded losslessly
+    noisy_vector = rng.normal(size=500).round(3)
+    dv = DeltaVector(decimal_places=3)
+    dv.fill_from_vector(noisy_vector)
+    assert not dv.is_monotonic_increasing
+    np.testing.assert_allclose(dv[:], noisy_vector)
+
+
+def test_delta_vector_numpy_interop(monkeypatch):
+    original_vector = np.arange(10_000, dtype=np.int64) * 3
+    dv = DeltaVector(anchor_interval=64, dtype=np.int64)
+    dv.fill_from_vector(original_vector)
+
+    # The values are decoded in one pass, not element by element
+    monkeypatch.setattr(DeltaVector, "__iter__", None)
+    array = np.asarray(dv)
+    assert array.dtype == dv.dtype
+    np.testing.assert_array_equal(array, original_vector)
+    assert np.asarray(dv, dtype=np.float64).dtype == np.float64
+    with pytest.raises(ValueError):
+        np.array(dv, copy=False)
+
+
+def test_delta_vector_constant_step():
+    # A constant step (e.g., a sampling timestamp) needs about a single bit per value
+    original_vector = np.arange(100_000, dtype=np.int64) * 5 + 1_700_000_000
+    dv = DeltaVector(anchor_interval=128, dtype=np.int64)
+    dv.fill_from_vector(original_vector)
+
+    assert dv.dtype == np.int64
+    assert np.array_equal(dv[:], original_vector)
+    assert dv.bits_per_value < 2
+
+
+def test_delta_vector_as_hf_x():
+    n = 10_000
+    x = np.arange(n) * 2
+    y = np.sin(np.arange(n) / 100)
+    dv = DeltaVector(dtype=np.int64)
+    dv.fill_from_vector(x)
+
+    fig = FigureResampler(default_n_shown_samples=500)
+    fig.add_trace(go.Scattergl(name="delta"), hf_x=dv, hf_y=y)
+
+    # The compressed vector is stored as is, and only the view is decoded
+    assert fig.hf_data[0]["x"] is dv
+    assert len(fig.data[0]["x"]) <= 500
+    assert np.isin(fig.data[0]["x"], x).all()
+
+    # The x-data must be monotonic
+    non_monotonic = DeltaVector()
+    non_monotonic.fill_from_vector(x[::-1])
+    with pytest.raises(AssertionError):
+        FigureResampler().add_trace(
+            go.Scattergl(name="reversed"), hf_x=non_monotonic, hf_y=y
+        )
+
+
+@pytest.mark.parametrize("side", ["left", "right"])
+def test_delta_vector_searchsorted(side):
+    rng = np.random.default_rng(0)
+    x = np.round(np.cumsum(rng.integers(0, 3, 100_000)) / 10, 1)
+    dv = DeltaVector(1)
+    dv.fill_from_vector(x)
+
+    values = np.concatenate((x[rng.integers(0, len(x), 50)] + [0, 0.05] * 25, [-1, x[-1] + 1]))
+    np.testing.assert_array_equal(dv.searchsorted(values, side), np.searchsorted(x, values, side))
+    assert dv.searchsorted(x[1_234], side) == np.searchsorted(x, x[1_234], side)
@@ -0,0 +1,47 @@
+import numpy as np
+from plotly import graph_objects as go
+from data_structures.dictionary_vector import DictionaryVector
+from plotly_resampler import FigureResampler
+
+
+def test_dictionary_vector_round_trip():
+    labels = np.array(["low", "mid", "high", None], dtype=object)[
+        np.arange(10_000) % 7 % 4
+    ]
+    dv = DictionaryVector()
+    dv.create_vector(len(labels))
+    dv.fill_from_vector(labels)
+
+    assert len(dv) == len(labels)
+    assert dv.dtype == object
+    assert dv[1] == labels[1]
+    assert dv[3] is None
+    assert list(dv) == list(labels)
+    np.testing.assert_array_equal(dv[100:4_000:3], labels[100:4_000:3])
+    np.testing.assert_array_equal(dv[[3, 1, -1]], labels[[3, 1, -1]])
+    # Four distinct values need two bits per code
+    assert dv.codes.width == 2
+    assert dv.bits_per_value < 4
+
+
+def test_dictionary_vector_figure_resampler():
+    n = 50_000
+    labels = np.array([f"sensor {i % 5}" for i in range(n)], dtype=object)
+    y = np.sin(np.arange(n) / 100)
+    dv = DictionaryVector()
+    dv.fill_from_vector(labels)
+
+    fig = FigureResampler(go.Figure(), default_n_shown_samples=500)
+    fig.add_trace(go.Scattergl(name="s"), hf_y=y, hf_hovertext=dv, hf_text=dv)
+    reference = FigureResampler(go.Figure(), default_n_shown_samples=500)
+    reference.add_trace(go.Scattergl(name="s"), hf_y=y, hf_hovertext=labels, hf_text=labels)
+    # The dictionary vector is not converted into an array
+    assert fig.hf_data[0]["hovertext"] is dv
+    np.testing.assert_array_equal(fig.data[0].hovertext, reference.data[0].hovertext)
+
+    relayout_data = {"xaxis.range[0]": 10_000, "xaxis.range[1]": 20_000}
+    update = fig._construct_update_data(relayout_data)[1]
+    reference_update = reference._construct_update_data(relayout_data)[1]
+    np.testing.assert_array_equal(update["x"], reference_update["x"])
+    np.testing.assert_array_equal(update["text"], reference_update["text"])
+    np.testing.assert_array_equal(update["hovertext"], reference_update["hovertext"])
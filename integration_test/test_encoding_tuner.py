@@ -0,0 +1,89 @@
+import numpy as np
+from data_structures.compressed_vector import CompressedVector
+from data_structures.compressed_vector_tools import convert_vectors_to_sdsl4py
+from data_structures.delta_vector import DeltaVector
+from data_structures.encoding_tuner import choose_encoding
+from data_structures.precision import infer_decimal_places
+
+
+def test_infer_decimal_places():
+    assert infer_decimal_places(np.array([1.0, 2.0, np.nan])) == 0
+    assert infer_decimal_places(np.array([0.1, 0.25, -3.125])) == 3
+    assert infer_decimal_places(np.array([np.pi]), max_decimal_places=6) is None
+
+
+def test_choose_encoding():
+    rng = np.random.default_rng(14)
+    x = np.arange(200_000) * 0.5
+    y = rng.normal(size=200_000).cumsum().round(2)
+    raw = 20.0 + np.cumsum(rng.normal(size=200_000)) * 1e-3
+
+    choice = choose_encoding(x)
+    assert choice.statistics["is_monotonic"]
+    assert choice.statistics["is_constant_step"]
+    assert choice.statistics["decimal_places"] == 1
+    assert choice.vector_class is DeltaVector
+
+    choice = choose_encoding(y)
+    assert choice.statistics["decimal_places"] == 2
+    assert choice.params["encoding"] in ("split", "fixed_point")
+    assert all(candidate["max_error"] < 1e-9 for candidate in choice.candidates)
+
+    # Without a decimal precision, only the lossless codec is a candidate
+    choice = choose_encoding(raw)
+    assert choice.params == {"encoding": "xor"}
+    assert "chosen: xor" in str(choice)
+
+    vectors, reports = convert_vectors_to_sdsl4py(x, y, raw, auto_tune=True)
+    assert [report.vector_class for report in reports] == [
+        DeltaVector, CompressedVector, CompressedVector
+    ]
+    for vector, original_vector in zip(vectors, (x, y, raw)):
+        np.testing.assert_allclose(vector[:], original_vector)
+
+
+def test_choose_encoding_non_finite():
+    values = np.random.default_rng(16).normal(size=10_000).round(2)
+    values[[10, 20, 30]] = [np.inf, -np.inf, np.nan]
+    values[40] = -0.0
+
+    # The scaled integers cannot represent infinite values, only the lossless
+    # codec is a candidate
+    choice = choose_encoding(values)
+    assert choice.statistics["has_infinite"]
+    assert choice.params == {"encoding": "xor"}
+    vector = choice.build(values)
+    decoded = vector[0:len(values)]
+    np.testing.assert_array_equal(decoded, values)
+    assert np.signbit(decoded[40])
+
+    # An infinite value outside the sample is found as well
+    column = np.arange(2_000_000) * 0.5
+    column[1_234_567] = np.inf
+    assert choose_encoding(column).params == {"encoding": "xor"}
+
+    # A candidate that does not decode the sample accurately is rejected, e.g. the
+    # fixed point encoding of values that overflow its scaled integers
+    choice = choose_encoding(np.arange(1_000) * 1e17, decimal_places=2)
+    errors = {c["name"]: c["max_error"] for c in choice.candidates}
+    assert errors[choice.name] <= 0.005
+    assert not errors["fixed_point (decimal_places=2, int_width=auto)"] <= 0.005
+
+
+def test_choose_encoding_validates_column():
+    # A NaN outside the sample makes a monotonic sample unfit for a delta encoding
+    x = np.arange(2_000_000) * 0.5
+    x[1_234_567] = np.nan
+    choice = choose_encoding(x)
+    assert not choice.statistics["is_monotonic"]
+    assert choice.vector_class is CompressedVector
+
+    # A value outside the sample with more decimal places is not rounded
+    y = np.random.default_rng(15).normal(size=2_000_000).round(2)
+    y[1_234_567] = 0.123456
+    choice = choose_encoding(y)
+    assert choice.statistics["decimal_places"] == 6
+
+    vectors, _ = convert_vectors_to_sdsl4py(x, y, auto_tune=True)
+    np.testing.assert_array_equal(vectors[0][:], x)
+    assert vectors[1][1_234_567] == 0.123456
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from data_structures.growable_vector import GrowableCompressedVector
+
+
+def test_growable_vector_append():
+    rng = np.random.default_rng(12)
+    original_vector = rng.normal(size=1_000).round(2)
+    original_vector[[5, 700]] = np.nan
+    gv = GrowableCompressedVector(decimal_places=2, seal_size=128, block_size=32)
+    assert len(gv) == 0
+
+    # Appends of every size, across the sealed block boundaries
+    gv.append(original_vector[0])
+    position = 1
+    for size in (3, 128, 1, 300, 567):
+        gv.extend(original_vector[position:position + size])
+        position += size
+        assert len(gv) == position
+        np.testing.assert_allclose(gv[:], original_vector[:position], equal_nan=True)
+    assert len(gv._sealed) == 1_000 // 128
+
+    np.testing.assert_allclose(gv[100:900:7], original_vector[100:900:7])
+    np.testing.assert_allclose(gv[::-3], original_vector[::-3], equal_nan=True)
+    indices = rng.integers(0, len(original_vector), 50)
+    np.testing.assert_allclose(gv[indices], original_vector[indices], equal_nan=True)
+    assert gv[-1] == pytest.approx(original_vector[-1])
+    assert gv.count_nans() == 2
+    assert gv.count_nans(6, 700) == 0
+
+    # The summaries of the full blocks and of the partial last block
+    summaries = gv.block_summaries
+    assert len(summaries) == -(-1_000 // 32)
+    blocks = np.pad(original_vector, (0, 24), constant_values=np.nan).reshape(-1, 32)
+    np.testing.assert_allclose(summaries.max, np.nanmax(blocks, axis=1))
+    np.testing.assert_allclose(
+        original_vector[summaries.argmin], np.nanmin(blocks, axis=1)
+    )
+    assert summaries.nan_count.sum() == 2
+
+
+def test_growable_vector_consistent_state():
+    gv = GrowableCompressedVector(decimal_places=1, seal_size=4)
+    gv.extend([1.0, 2.0, 3.0])
+    # A reader keeps the state it started with, while the vector grows
+    state = gv._state
+    gv.extend([4.0, 5.0, 6.0])
+    np.testing.assert_allclose(gv._decode(state, slice(0, state[2], 1)), [1, 2, 3])
+    np.testing.assert_allclose(gv[:], [1, 2, 3, 4, 5, 6])
+    assert gv.is_monotonic_increasing
+    gv.append(0.5)
+    assert not gv.is_monotonic_increasing
+
+
+def test_growable_vector_searchsorted():
+    x = np.round(np.cumsum(np.random.default_rng(0).integers(0, 3, 20_000)) / 10, 1)
+    gv = GrowableCompressedVector(1, seal_size=4_096)
+    gv.extend(x)
+
+    # The values are in the sealed vectors, the tail, and beyond both ends
+    values = np.concatenate((x[[0, 5_000, 19_999]], x[::997] + 0.05, [-1, x[-1] + 1]))
+    for side in ("left", "right"):
+        np.testing.assert_array_equal(gv.searchsorted(values, side), np.searchsorted(x, values, side))
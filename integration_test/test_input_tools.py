@@ -99,4 +99,23 @@ def test_sdsl4py_option_with_8_width(input_handler):
 
     input_handler.set_width(8)
     #assert the values are the same
-    verify_values_are_the_same(or_vec_x, or_vec_y, ih_vector_x, ih_vector_y)
\ No newline at end of file
+    verify_values_are_the_same(or_vec_x, or_vec_y, ih_vector_x, ih_vector_y)
+
+
+def test_sdsl4py_option_with_cache_dir(input_handler, tmp_path):
+    or_vec_x, or_vec_y = np.loadtxt(file_name, delimiter=";", unpack=True)
+
+    #the first call saves the compressed vectors, the second one memory maps them
+    for _ in range(2):
+        ih_vector_x, ih_vector_y = input_handler.get_from_file(
+            file_path=file_name,
+            option = "sdsl4py",
+            decimal_places= 0,
+            delimiter=";",
+            column=1,
+            truncate=None,
+            cache_dir=str(tmp_path)
+        )
+        verify_values_are_the_same(or_vec_x, or_vec_y, ih_vector_x[:], ih_vector_y[:])
+    assert len(list(tmp_path.iterdir())) == 2
+    assert isinstance(ih_vector_y.integer_part, np.memmap)
@@ -0,0 +1,159 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_structures.growable_vector import GrowableCompressedVector
+from plotly import graph_objects as go
+from plotly_resampler import FigureResampler
+from plotly_resampler.aggregation import (
+    MedDiffGapHandler,
+    MinMaxAggregator,
+    MinMaxLTTB,
+    NoGapHandler,
+    aggregators,
+)
+from plotly_resampler.aggregation.block_summaries import minmax_from_summaries
+from plotly_resampler.aggregation.minmax_pyramid import MinMaxPyramid
+from plotly_resampler.aggregation.plotly_aggregator_parser import PlotlyAggregatorParser
+
+
+def test_pyramid_levels():
+    rng = np.random.default_rng(11)
+    y = rng.normal(size=10_000)
+    y[[3, 700, 701, 9_999]] = np.nan
+    y[128:192] = np.nan  # a bucket with only NaNs
+    pyramid = MinMaxPyramid(y, base_bucket_size=64)
+
+    assert len(pyramid.levels[-1]) == 1
+    for level in pyramid.levels:
+        assert len(level) == -(-len(y) // level.block_size)
+        for block in {0, len(level) // 2, len(level) - 1}:
+            values = y[block * level.block_size:(block + 1) * level.block_size]
+            assert level.nan_count[block] == np.isnan(values).sum()
+            if np.isnan(values).all():
+                assert np.isnan(level.min[block]) and np.isnan(level.max[block])
+                continue
+            assert level.min[block] == np.nanmin(values)
+            assert level.max[block] == np.nanmax(values)
+            assert level.argmin[block] == block * level.block_size + np.nanargmin(values)
+            assert level.argmax[block] == block * level.block_size + np.nanargmax(values)
+
+    with pytest.raises(ValueError):
+        MinMaxPyramid(y, base_bucket_size=48)
+
+
+@pytest.mark.parametrize("downsampler", [MinMaxAggregator, MinMaxLTTB])
+def test_pyramid_aggregation(downsampler):
+    rng = np.random.default_rng(12)
+    y = rng.normal(size=200_000).cumsum()
+    fig = FigureResampler(
+        default_n_shown_samples=40, default_downsampler=downsampler(pyramid=True)
+    )
+    fig.add_trace(go.Scattergl(name="pyramid"), hf_y=y)
+    hf_trace_data = fig.hf_data[0]
+    # The pyramid is built once, when the trace is added
+    assert hf_trace_data["minmax_pyramid"].is_valid_for(hf_trace_data["y"])
+
+    # The selected points are the real data points, including the extremes
+    agg_x, agg_y = np.asarray(fig.data[0]["x"]), np.asarray(fig.data[0]["y"])
+    assert 0 < len(agg_y) <= 40
+    assert np.array_equal(y[agg_x], agg_y)
+    if downsampler is MinMaxAggregator:
+        assert agg_y.max() == y.max() and agg_y.min() == y.min()
+
+    # A zoomed-in range with unaligned edges selects the same data points as the
+    # aggregator without a pyramid
+    start, end = 12_345, 198_765
+    relayout = {"xaxis.range[0]": start, "xaxis.range[1]": end}
+    update = fig._construct_update_data(relayout)
+    fig.hf_data[0]["downsampler"] = downsampler()
+    expected = fig._construct_update_data(relayout)
+    assert np.array_equal(update[1]["x"], expected[1]["x"])
+    assert np.array_equal(update[1]["y"], expected[1]["y"])
+
+
+def _gappy_x(n):
+    rng = np.random.default_rng(17)
+    return np.cumsum(rng.exponential(size=n) * (1 + 200 * (rng.random(n) < 1e-3)))
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        pd.RangeIndex(200_000),
+        np.arange(200_000) * 1000,
+        _gappy_x(200_000),
+        pd.date_range("2024-03-30", periods=200_000, freq="2s", tz="Europe/Brussels"),
+    ],
+)
+@pytest.mark.parametrize(
+    "downsampler",
+    [MinMaxAggregator(), MinMaxAggregator(nan_policy="keep"), MinMaxLTTB()],
+)
+def test_pyramid_equals_plain_aggregation(monkeypatch, x, downsampler):
+    rng = np.random.default_rng(18)
+    y = rng.normal(size=len(x)).cumsum()
+    y[rng.integers(0, len(y), 50)] = np.nan
+    y[50_000:52_000] = np.nan
+    # Extremes on the data points that end a bin of the edge-aligned ranges below
+    y[1_234 + 19_000 * np.arange(1, 10)] = 100 * (-1) ** np.arange(9)
+    y[1_001 + 4_900 * np.arange(1, 40)] = -100 * (-1) ** np.arange(39)
+
+    # Track that the pyramid is used
+    results = []
+
+    def _minmax_from_summaries(*args, **kwargs):
+        results.append(minmax_from_summaries(*args, **kwargs))
+        return results[-1]
+
+    monkeypatch.setattr(aggregators, "minmax_from_summaries", _minmax_from_summaries)
+    pyramid_downsampler = copy.deepcopy(downsampler)
+    pyramid_downsampler.pyramid = True
+
+    for gap_handler in (NoGapHandler(), MedDiffGapHandler()):
+        hf_trace_data = {
+            "x": x,
+            "y": y,
+            "downsampler": pyramid_downsampler,
+            "gap_handler": gap_handler,
+            "max_n_samples": 20,
+        }
+        plain_trace_data = {**hf_trace_data, "downsampler": downsampler}
+        # The bins of evenly spaced x-data end on a data point when the range has
+        # k * n_bins + 1 values, i.e., 10 bins of the MinMaxAggregator, and 40 bins
+        # of the MinMaxLTTB prefetching without the first and last data point
+        for start, end in (
+            (0, len(y)),
+            (1_234, len(y) - 4_321),
+            (1_234, 1_234 + 19_000 * 10 + 1),
+            (1_000, 1_000 + 4_900 * 40 + 3),
+        ):
+            results.clear()
+            agg_x, agg_y, indices = PlotlyAggregatorParser.aggregate(
+                hf_trace_data, start, end
+            )
+            assert any(r is not None for r in results)
+            plain_x, plain_y, plain_indices = PlotlyAggregatorParser.aggregate(
+                plain_trace_data, start, end
+            )
+            assert np.array_equal(indices, plain_indices)
+            assert np.array_equal(agg_y, plain_y, equal_nan=True)
+            assert np.array_equal(np.asarray(agg_x), np.asarray(plain_x))
+
+
+def test_pyramid_of_growing_data():
+    gv = GrowableCompressedVector(decimal_places=2, seal_size=4_096)
+    rng = np.random.default_rng(19)
+    gv.extend(rng.normal(size=100_000).round(2))
+    hf_trace_data = {"y": gv, "downsampler": MinMaxAggregator(pyramid=True)}
+    pyramid = PlotlyAggregatorParser.get_minmax_pyramid(hf_trace_data)
+    assert PlotlyAggregatorParser.get_minmax_pyramid(hf_trace_data) is pyramid
+
+    # The pyramid of the appended values is stale, and rebuilt
+    gv.extend([100.0, -100.0])
+    assert not pyramid.is_valid_for(gv)
+    pyramid = PlotlyAggregatorParser.get_minmax_pyramid(hf_trace_data)
+    assert pyramid.size == len(gv)
+    assert pyramid.levels[-1].argmax[0] == len(gv) - 2
+    assert pyramid.levels[-1].argmin[0] == len(gv) - 1
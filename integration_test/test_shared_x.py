@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotly import graph_objects as go
+from plotly_resampler import FigureResampler
+from plotly_resampler.aggregation import MinMaxAggregator, MinMaxLTTB
+from plotly_resampler.aggregation.plotly_aggregator_parser import PlotlyAggregatorParser
+from plotly_resampler.aggregation.x_lookup import XLookup
+
+n, n_channels = 200_000, 6
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        np.arange(n) * 0.5,
+        pd.date_range("2024-01-01", periods=n, freq="10ms", tz="Europe/Brussels"),
+        None,
+    ],
+)
+def test_shared_x_figure(x):
+    rng = np.random.default_rng(16)
+    ys = rng.normal(size=(n_channels, n)).cumsum(axis=1)
+
+    def _figure(aggregation_cache_bytes=None):
+        fig = FigureResampler(
+            default_n_shown_samples=500, aggregation_cache_bytes=aggregation_cache_bytes
+        )
+        for i, y in enumerate(ys):
+            # Every trace gets its own (but equal) copy of the x-data
+            hf_x = None if x is None else x.copy()
+            downsampler = MinMaxAggregator() if i % 2 else MinMaxLTTB()
+            fig.add_trace(
+                go.Scattergl(name=f"ch{i}"), hf_x=hf_x, hf_y=y, downsampler=downsampler
+            )
+        return fig
+
+    fig = _figure()
+    # The equal x-data is shared by all traces
+    assert len({id(hf_trace_data["x"]) for hf_trace_data in fig.hf_data}) == 1
+
+    x_ref = np.arange(n) if x is None else x
+    relayout = {"xaxis.range[0]": x_ref[12_345], "xaxis.range[1]": x_ref[150_000]}
+    if isinstance(x, pd.DatetimeIndex):
+        relayout = {k: str(v) for k, v in relayout.items()}
+    grouped = fig._construct_update_data(relayout)
+
+    # The grouped aggregation equals the aggregation of every trace on its own
+    for trace_update, hf_trace_data in zip(grouped[1:], fig.hf_data):
+        start_idx, end_idx = PlotlyAggregatorParser.get_start_end_indices(
+            hf_trace_data, hf_trace_data["axis_type"], *relayout.values()
+        )
+        agg_x, agg_y, _ = PlotlyAggregatorParser.aggregate(
+            hf_trace_data, start_idx, end_idx
+        )
+        assert np.array_equal(np.asarray(trace_update["y"]), agg_y)
+        assert np.array_equal(np.asarray(trace_update["x"]), np.asarray(agg_x))
+    assert fig._aggregate_shared_x(fig._data, *relayout.values()).keys() == {
+        trace["uid"] for trace in fig._data
+    }
+
+    # The grouped traces also use (and fill) the aggregation cache
+    cached_fig = _figure(aggregation_cache_bytes=1 << 24)
+    cached_fig._construct_update_data(relayout)
+    cached = cached_fig._construct_update_data(relayout)
+    assert cached_fig.aggregation_cache_info()["hits"] >= n_channels
+    for a, b in zip(grouped[1:], cached[1:]):
+        assert np.array_equal(np.asarray(a["y"]), np.asarray(b["y"]))
+
+
+def test_x_lookup_same_data():
+    x = np.arange(1_000) * 0.1
+    assert XLookup(x).same_data(XLookup(x.copy()))
+    assert not XLookup(x).same_data(XLookup(x + 1e-9))
+    other = x.copy()
+    other[500] = -1
+    assert not XLookup(x).same_data(XLookup(other))
+    assert XLookup(pd.RangeIndex(10)).same_data(XLookup(pd.RangeIndex(10)))
+    assert not XLookup(pd.RangeIndex(10)).same_data(XLookup(np.arange(10)))
+    dates = pd.date_range("2024-01-01", periods=100, freq="1s")
+    assert not XLookup(dates).same_data(XLookup(dates.tz_localize("UTC")))
@@ -0,0 +1,49 @@
+import bisect
+import numpy as np
+import pandas as pd
+import pytest
+from plotly_resampler.aggregation.plotly_aggregator_parser import PlotlyAggregatorParser
+from plotly_resampler.aggregation.x_lookup import XLookup
+
+rng = np.random.default_rng(42)
+n = 100_000
+
+
+@pytest.mark.parametrize(
+    "x, evenly_spaced",
+    [
+        (np.arange(n) * 0.1 + 3, True),
+        (np.arange(n) * 0.1 + rng.uniform(-0.01, 0.01, n), True),
+        (np.cumsum(rng.integers(0, 3, n)), False),
+        (pd.date_range("2022-03-27", periods=n, freq="250ms", tz="Europe/Brussels"), True),
+        (pd.date_range("2022-03-27", periods=n, freq="1s").values, True),
+        (pd.DatetimeIndex(np.cumsum(rng.integers(1, 10**9, n))), False),
+    ],
+)
+def test_x_lookup_matches_bisect(x, evenly_spaced):
+    lookup = XLookup(x)
+    assert (lookup.step is not None) == evenly_spaced
+    hf_trace_data = {"x": x}
+    axis_type = "date" if lookup.is_datetime else "linear"
+    for _ in range(50):
+        i, j = sorted(rng.integers(-10, n + 10, 2))
+        start, end = x[np.clip(i, 0, n - 1)], x[np.clip(j, 0, n - 1)]
+        if i < 0 or j >= n:
+            # Outside of the x-data
+            start, end = (start - (x[1] - x[0]), end) if i < 0 else (start, end + (x[1] - x[0]))
+        elif not lookup.is_datetime:
+            # In between two values
+            start, end = start + 1e-3, end - 1e-3
+        if lookup.is_datetime:
+            start, end = pd.Timestamp(start), pd.Timestamp(end)
+        expected = bisect.bisect_left(x, start), bisect.bisect_right(x, end)
+        assert lookup.search(start, end) == expected
+        assert PlotlyAggregatorParser.get_start_end_indices(
+            hf_trace_data, axis_type, start, end
+        ) == expected
+
+    # The lookup is built once, and rebuilt when the x-data is replaced
+    assert hf_trace_data["x_lookup"].x is x
+    hf_trace_data["x"] = x[: n // 2]
+    PlotlyAggregatorParser.get_start_end_indices(hf_trace_data, axis_type, start, end)
+    assert hf_trace_data["x_lookup"].x is hf_trace_data["x"]
@@ -0,0 +1,158 @@
+"""Cache of the aggregation results of the viewed windows of the traces.
+
+Users often return to the same view windows (e.g., reset-axes or navigating back
+to a previous zoom level). The ``AggregationCache`` keeps the final aggregation
+result ``(agg_x, agg_y, indices)`` of recently viewed windows, so that these are not
+aggregated again.
+
+An entry is keyed by the trace uid, the index range of the window, the number of
+output samples and a fingerprint of the downsampler, its keyword arguments and the
+gap handler. The entries of a trace are invalidated when its hf data is replaced.
+
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+def _items_fingerprint(params: dict) -> Tuple:
+    """Return the sorted ``(key, repr(value))`` pairs of ``params``."""
+    return tuple(sorted((k, repr(v)) for k, v in params.items()))
+
+
+def fingerprint(obj: Any) -> Tuple:
+    """Return a hashable fingerprint of the type and the parameters of ``obj``.
+
+    The parameters are the (repr of the) instance attributes, so that changing a
+    parameter of a downsampler or gap handler in place changes its fingerprint.
+
+    """
+    return type(obj).__qualname__, _items_fingerprint(getattr(obj, "__dict__", {}))
+
+
+def _nbytes(result: Tuple) -> int:
+    """Return the number of bytes of the arrays of an aggregation result."""
+    return sum(getattr(a, "nbytes", 0) for a in result)
+
+
+class AggregationCache:
+    """A thread safe LRU cache of aggregation results, bounded by a byte budget."""
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_bytes: int
+            The maximum number of bytes of the cached aggregation results.
+
+        """
+        if max_bytes <= 0:
+            raise ValueError("The cache size must be positive")
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        # The hf data (e.g., x and y) of every trace its cached entries stem from
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        uid: str, hf_trace_data: dict, start_idx: int, end_idx: int
+    ) -> Tuple[Hashable, ...]:
+        """Return the key of the aggregation of ``hf_trace_data[start_idx:end_idx]``."""
+        return (
+            uid,
+            start_idx,
+            end_idx,
+            hf_trace_data["max_n_samples"],
+            fingerprint(hf_trace_data["downsampler"]),
+            _items_fingerprint(hf_trace_data.get("downsampler_kwargs") or {}),
+            fingerprint(hf_trace_data["gap_handler"]),
+        )
+
+    def validate(self, uid: str, hf_trace_data: dict) -> None:
+        """Invalidate the entries of trace ``uid`` when its hf data was replaced.
+
+        The hf data is compared by identity, an in-place change of the hf data (e.g.,
+        ``hf_data["y"][:] = ...``) is not detected.
+
+        """
+        sources = (hf_trace_data["x"], hf_trace_data["y"])
+        with self._lock:
+            previous = self._sources.get(uid)
+            if previous is not None and all(a is b for a, b in zip(previous, sources)):
+                return
+            self._invalidate(uid)
+            self._sources[uid] = sources
+
+    def get(self, key: Tuple) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Return the cached ``(agg_x, agg_y, indices)``, or None when not cached."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Tuple, result: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+        """Cache an aggregation result, and evict the least recently used results to
+        stay within the byte budget. A result larger than the budget is not cached.
+
+        """
+        nbytes = _nbytes(result)
+        if nbytes > self.max_bytes:
+            return
+        for a in result:
+            if isinstance(a, np.ndarray) and a.flags.owndata:
+                # Cached results are shared, make sure they are not changed by accident
+                a.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= _nbytes(previous)
+            self._entries[key] = result
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= _nbytes(evicted)
+
+    def _invalidate(self, uid: str) -> None:
+        for key in [key for key in self._entries if key[0] == uid]:
+            self.current_bytes -= _nbytes(self._entries.pop(key))
+        self._sources.pop(uid, None)
+
+    def invalidate(self, uid: str) -> None:
+        """Remove the cached results of trace ``uid``."""
+        with self._lock:
+            self._invalidate(uid)
+
+    def clear(self) -> None:
+        """Remove all cached results, the hit and miss counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._sources.clear()
+            self.current_bytes = 0
+
+    def info(self) -> dict:
+        """Return the hits, misses and size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
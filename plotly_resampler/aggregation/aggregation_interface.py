@@ -205,3 +205,145 @@ class DataPointSelector(AbstractAggregator, ABC):
 
         # More samples that n_out -> perform data aggregation
         return self._arg_downsample(x=x, y=y, n_out=n_out)
+
+    def arg_downsample_batch(
+        self,
+        x: np.ndarray | None,
+        ys: List[np.ndarray],
+        n_out: int,
+    ) -> List[np.ndarray]:
+        """Compute the index positions for the downsampled representation of several
+        series that share their x-data.
+
+        The shared x-data is checked once, after which every y column is downsampled.
+        Aggregators with a multi-column kernel can override this method.
+
+        Parameters
+        ----------
+        x: np.ndarray | None
+            The shared x data of the to-be-aggregated series, or None.
+        ys: List[np.ndarray]
+            The y data of every series, all with the same length as ``x``.
+        n_out: int
+            The number of samples which every downsampled series should contain.
+
+        Returns
+        -------
+        List[np.ndarray]
+            The index positions of the selected data points, per series.
+
+        """
+        DataPointSelector._check_n_out(n_out)
+        if x is not None:
+            self._check_arr(x, self.x_dtype_regex_list)
+        indices = []
+        for y in ys:
+            self._check_arr(y, self.y_dtype_regex_list)
+            assert x is None or x.shape == y.shape, "x and y must have the same shape"
+            if len(y) <= n_out:
+                # Fewer samples than n_out -> return all indices
+                indices.append(np.arange(len(y)))
+            else:
+                indices.append(self._arg_downsample(x=x, y=y, n_out=n_out))
+        return indices
+
+    def for_nan_free_data(self) -> DataPointSelector:
+        """Return the aggregator to use for data that contains no NaNs.
+
+        Aggregators with a NaN-aware variant (i.e., ``nan_policy="keep"``) return
+        their faster NaN-unaware counterpart, as both select the same data points when
+        there are no NaNs. Compressed y-data can count its NaNs without a scan.
+
+        Returns
+        -------
+        DataPointSelector
+            The aggregator to use, by default the aggregator itself.
+
+        """
+        return self
+
+    def arg_downsample_summaries(
+        self,
+        x,
+        y,
+        summaries,
+        start_idx: int,
+        end_idx: int,
+        n_out: int,
+    ) -> np.ndarray | None:
+        """Compute the index positions for the downsampled representation of
+        ``y[start_idx:end_idx]`` from the block summaries of ``y``.
+
+        Block summaries hold the min, max, argmin, argmax and NaN count of every
+        fixed-size block of the (compressed) y-data. Aggregators which can use them
+        (e.g., min-max based aggregators) override this method, so that they do not
+        have to decode the whole range.
+
+        Parameters
+        ----------
+        x: np.ndarray | None
+            The numeric x-data of the range (i.e., ``x[start_idx:end_idx]``, with
+            datetimes as their int64 view), or None for a ``pd.RangeIndex``.
+        y: Any
+            The (full) high-frequency y-data.
+        summaries: Any
+            The block summaries of ``y``.
+        start_idx: int
+            The start index of the range (inclusive).
+        end_idx: int
+            The end index of the range (exclusive).
+        n_out: int
+            The number of samples which the downsampled series should contain.
+
+        Returns
+        -------
+        np.ndarray | None
+            The index positions of the selected data points, relative to
+            ``start_idx``. None when the summaries cannot be used, in which case the
+            data must be downsampled with ``arg_downsample``.
+
+        """
+        return None
+
+    def arg_downsample_grid(
+        self,
+        x,
+        y,
+        grids,
+        start_idx: int,
+        end_idx: int,
+        n_out: int,
+    ) -> np.ndarray | None:
+        """Compute the index positions for the downsampled representation of
+        ``y[start_idx:end_idx]`` with bins that are aligned to a global grid.
+
+        The bucket grids of ``y`` hold the min-max summaries of grid-aligned buckets
+        per zoom level, so that a pan only summarizes the newly exposed buckets.
+        Aggregators which can use them (e.g., min-max based aggregators) override
+        this method.
+
+        Parameters
+        ----------
+        x: np.ndarray | None
+            The numeric x-data of the range (i.e., ``x[start_idx:end_idx]``, with
+            datetimes as their int64 view), or None for a ``pd.RangeIndex``.
+        y: Any
+            The (full) high-frequency y-data.
+        grids: BucketGrids
+            The bucket grids of ``y``.
+        start_idx: int
+            The start index of the range (inclusive).
+        end_idx: int
+            The end index of the range (exclusive).
+        n_out: int
+            The number of samples which the downsampled series should contain.
+
+        Returns
+        -------
+        np.ndarray | None
+            The index positions of the selected data points, relative to
+            ``start_idx``. None when the grids cannot be used, in which case the
+            data must be downsampled with ``arg_downsample``.
+
+        """
+        return None
@@ -22,6 +22,7 @@ from tsdownsample import (
 )
 
 from ..aggregation.aggregation_interface import DataAggregator, DataPointSelector
+from .block_summaries import minmax_from_summaries
 
 
 def _to_tsdownsample_args(
@@ -173,7 +174,9 @@ class MinMaxAggregator(DataPointSelector):
 
     """
 
-    def __init__(self, nan_policy="omit", **downsample_kwargs):
+    def __init__(
+        self, nan_policy="omit", pyramid=False, grid_aligned=False, **downsample_kwargs
+    ):
         """
         Parameters
         ----------
@@ -182,12 +185,25 @@ class MinMaxAggregator(DataPointSelector):
             - The `parallel` argument is set to False by default.
         nan_policy: str, optional
             The policy to handle NaNs. Can be 'omit' or 'keep'. By default, 'omit'.
+        pyramid: bool, optional
+            If True, a min-max pyramid of the y-data is built once when the trace is
+            added, and wide ranges are downsampled from the level whose bucket size
+            suits the bins, instead of from all the data points. The same data points
+            are selected. By default, False.
+        grid_aligned: bool, optional
+            If True, the bins are aligned to a global grid of data point indices per
+            zoom level (i.e., panning mode), so that a pan only aggregates the newly
+            exposed bins. The bins then have a quantized size, so that a range holds
+            between about 84% and 100% of ``n_out // 2`` bins. By default, False.
 
         """
         # this downsampler supports all dtypes
         super().__init__(**downsample_kwargs)
         if nan_policy not in ("omit", "keep"):
             raise ValueError("nan_policy must be either 'omit' or 'keep'")
+        self.nan_policy = nan_policy
+        self.pyramid = pyramid
+        self.grid_aligned = grid_aligned
         if nan_policy == "omit":
             self.downsampler = MinMaxDownsampler()
         else:
@@ -203,6 +219,38 @@ class MinMaxAggregator(DataPointSelector):
             *_to_tsdownsample_args(x, y), n_out=n_out, **self.downsample_kwargs
         )
 
+    def for_nan_free_data(self) -> MinMaxAggregator:
+        if self.nan_policy == "omit":
+            return self
+        return MinMaxAggregator(
+            nan_policy="omit",
+            pyramid=self.pyramid,
+            grid_aligned=self.grid_aligned,
+            **self.downsample_kwargs,
+        )
+
+    def arg_downsample_summaries(
+        self, x, y, summaries, start_idx: int, end_idx: int, n_out: int
+    ) -> np.ndarray | None:
+        return minmax_from_summaries(
+            x,
+            y,
+            summaries,
+            start_idx,
+            end_idx,
+            n_bins=n_out // 2,
+            keep_nans=self.nan_policy == "keep",
+        )
+
+    def arg_downsample_grid(
+        self, x, y, grids, start_idx: int, end_idx: int, n_out: int
+    ) -> np.ndarray | None:
+        if not self.grid_aligned:
+            return None
+        return grids.minmax(
+            start_idx, end_idx, n_bins=n_out // 2, keep_nans=self.nan_policy == "keep"
+        )
+
 
 class MinMaxLTTB(DataPointSelector):
     """Efficient version off LTTB by first reducing really large datasets with
@@ -218,7 +266,12 @@ class MinMaxLTTB(DataPointSelector):
     """
 
     def __init__(
-        self, minmax_ratio: int = 4, nan_policy: str = "omit", **downsample_kwargs
+        self,
+        minmax_ratio: int = 4,
+        nan_policy: str = "omit",
+        pyramid: bool = False,
+        grid_aligned: bool = False,
+        **downsample_kwargs,
     ):
         """
         Parameters
@@ -228,6 +281,16 @@ class MinMaxLTTB(DataPointSelector):
             the number of data points that will be outputted by LTTB. By default, 4.
         nan_policy: str, optional
             The policy to handle NaNs. Can be 'omit' or 'keep'. By default, 'omit'.
+        pyramid: bool, optional
+            If True, a min-max pyramid of the y-data is built once when the trace is
+            added, and the MinMax-prefetching of wide ranges is performed on the level
+            whose bucket size suits the bins, after which LTTB refines the prefetched
+            data points. By default, False.
+        grid_aligned: bool, optional
+            If True, the bins of the MinMax-prefetching are aligned to a global grid
+            of data point indices per zoom level (i.e., panning mode), so that a pan
+            only prefetches the newly exposed bins, after which LTTB refines the
+            prefetched data points. By default, False.
         **downsample_kwargs
             Keyword arguments passed to the `MinMaxLTTBDownsampler`.
             - The `parallel` argument is set to False by default.
@@ -243,6 +306,9 @@ class MinMaxLTTB(DataPointSelector):
             self.minmaxlttb = NaNMinMaxLTTBDownsampler()
 
         self.minmax_ratio = minmax_ratio
+        self.nan_policy = nan_policy
+        self.pyramid = pyramid
+        self.grid_aligned = grid_aligned
 
         super().__init__(
             y_dtype_regex_list=[rf"{dtype}\d*" for dtype in ("float", "int", "uint")]
@@ -263,6 +329,63 @@ class MinMaxLTTB(DataPointSelector):
             **self.downsample_kwargs,
         )
 
+    def for_nan_free_data(self) -> MinMaxLTTB:
+        if self.nan_policy == "omit":
+            return self
+        return MinMaxLTTB(
+            minmax_ratio=self.minmax_ratio,
+            nan_policy="omit",
+            pyramid=self.pyramid,
+            grid_aligned=self.grid_aligned,
+            **self.downsample_kwargs,
+        )
+
+    def _refine_lttb(
+        self, x, y, indices: np.ndarray, start_idx: int, end_idx: int, n_out: int
+    ) -> np.ndarray:
+        """Refine the MinMax-prefetched ``indices`` (relative to ``start_idx``) with
+        LTTB, on the numeric x-data of the range ``x`` (or on the index positions
+        when ``x`` is None)."""
+        # Always keep the first and last data point of the range, as LTTB does
+        indices = np.unique(np.concatenate(([0], indices, [end_idx - start_idx - 1])))
+        if len(indices) <= n_out:
+            return indices
+        x_sel = indices if x is None else x[indices]
+        y_sel = np.asarray(y[start_idx + indices], dtype=np.float64)
+        return indices[LTTBDownsampler().downsample(x_sel, y_sel, n_out=n_out)]
+
+    def arg_downsample_summaries(
+        self, x, y, summaries, start_idx: int, end_idx: int, n_out: int
+    ) -> np.ndarray | None:
+        if self.nan_policy == "keep":
+            # LTTB does not handle the selected NaNs
+            return None
+        # The MinMax-prefetching is performed on the block summaries; as the
+        # MinMaxLTTBDownsampler, without the first and last data point of the range
+        indices = minmax_from_summaries(
+            None if x is None else x[1:-1],
+            y,
+            summaries,
+            start_idx + 1,
+            end_idx - 1,
+            n_bins=n_out * self.minmax_ratio // 2,
+        )
+        if indices is None:
+            return None
+        return self._refine_lttb(x, y, indices + 1, start_idx, end_idx, n_out)
+
+    def arg_downsample_grid(
+        self, x, y, grids, start_idx: int, end_idx: int, n_out: int
+    ) -> np.ndarray | None:
+        if not self.grid_aligned or self.nan_policy == "keep":
+            # LTTB does not handle the selected NaNs
+            return None
+        # The MinMax-prefetching is performed on the grid-aligned buckets
+        indices = grids.minmax(
+            start_idx, end_idx, n_bins=n_out * self.minmax_ratio // 2
+        )
+        return self._refine_lttb(x, y, indices, start_idx, end_idx, n_out)
+
 
 class EveryNthPoint(DataPointSelector):
     """Naive (but fast) aggregator method which returns every N'th point.
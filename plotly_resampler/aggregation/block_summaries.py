@@ -0,0 +1,231 @@
+"""Min-max data point selection from per-block summaries of the y-data.
+
+Compressed high-frequency containers (e.g., a ``CompressedVector`` with a
+``block_size``) can expose a ``block_summaries`` attribute, which holds the min, max,
+argmin, argmax and NaN count of every block of ``block_size`` values. A min-max
+selection over a wide range can then be computed from the summaries of the blocks
+that are fully covered by a bin, and only the values at the (partially covered) bin
+edges have to be decoded.
+
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+
+
+def _bin_edges(
+    x: np.ndarray | None, start_idx: int, end_idx: int, n_bins: int
+) -> np.ndarray:
+    """Return the (absolute) edges of the ``n_bins`` bins of ``[start_idx, end_idx)``.
+
+    The bins are the bins of the tsdownsample ``MinMaxDownsampler`` (they have the
+    same width in x, or in index positions when there is no x-data), so that the
+    selection from the summaries equals the selection of the ``MinMaxAggregator``.
+    As there, a bin includes the values on its end edge, and the last value is only
+    included when the last bin end reaches it.
+    """
+    n = end_idx - start_idx
+    steps = np.arange(n_bins + 1)
+    if x is None:
+        edges = (steps * ((n - 1) / n_bins)).astype(np.int64) + 1
+    else:
+        bin_ends = x[0] + steps * ((x[-1] - x[0]) / n_bins)
+        if x.dtype.kind in "iu":
+            # The bin ends are truncated to integers, as in tsdownsample, which also
+            # avoids a float copy of the x-data when searching
+            bin_ends = np.trunc(bin_ends).astype(x.dtype)
+        edges = np.searchsorted(x, bin_ends, "right")
+    edges[0] = 0
+    return start_idx + edges
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the concatenated ranges ``[start, start + length)`` and the index of the
+    range of every position."""
+    group = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    return starts[group] + np.arange(len(group)) - offsets[group], group
+
+
+def _first_of_groups(groups: np.ndarray) -> np.ndarray:
+    """Return the position of the first element of every group of sorted ids."""
+    is_first = np.ones(len(groups), dtype=bool)
+    is_first[1:] = groups[1:] != groups[:-1]
+    return np.flatnonzero(is_first)
+
+
+def _bin_extremes(
+    bins: np.ndarray,
+    positions: np.ndarray,
+    values: np.ndarray,
+    n_bins: int,
+    ufunc: np.ufunc,
+    fill: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the extreme value of every bin and its first position, ``fill`` and -1
+    for a bin without values. The ``bins`` and ``positions`` must be sorted."""
+    extremes = np.full(n_bins, fill)
+    args = np.full(n_bins, -1, dtype=np.int64)
+    if len(bins):
+        starts = _first_of_groups(bins)
+        extremes[bins[starts]] = ufunc.reduceat(values, starts)
+        hits = np.flatnonzero(values == extremes[bins])
+        first_hits = hits[_first_of_groups(bins[hits])]
+        args[bins[first_hits]] = positions[first_hits]
+    return extremes, args
+
+
+def _combine(
+    parts: List[Tuple[np.ndarray, np.ndarray]], better: Callable
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Combine the per-bin extremes of consecutive parts of the bins, on a tie the
+    first part (i.e., the first occurrence) is kept."""
+    extremes, args = parts[0]
+    for part_extremes, part_args in parts[1:]:
+        take = better(part_extremes, extremes)
+        extremes = np.where(take, part_extremes, extremes)
+        args = np.where(take, part_args, args)
+    return extremes, args
+
+
+def minmax_from_summaries(
+    x: np.ndarray | None,
+    y: Any,
+    summaries: Any,
+    start_idx: int,
+    end_idx: int,
+    n_bins: int,
+    keep_nans: bool = False,
+) -> np.ndarray | None:
+    """Select the min and max data point of ``n_bins`` bins of ``y[start_idx:end_idx]``.
+
+    The bins are the bins of the ``MinMaxAggregator`` (i.e., they have the same width
+    in x), so that the same data points are selected. The extremes of the blocks that
+    are fully covered by a bin are taken from the summaries, only the values of the
+    partially covered blocks at the bin edges are decoded.
+
+    Parameters
+    ----------
+    x: np.ndarray | None
+        The numeric x-data of the range (i.e., ``x[start_idx:end_idx]``, with
+        datetimes as int64), or None for x-data that equals the index positions.
+    y: Any
+        The high-frequency y-data, which supports slicing and fancy indexing.
+    summaries: Any
+        The block summaries of ``y``, with a ``size``, a ``block_size`` and per-block
+        ``min``, ``max``, ``argmin``, ``argmax`` and ``nan_count`` arrays. Or a
+        ``MinMaxPyramid`` of ``y``, of which the level that suits the bins is used.
+    start_idx: int
+        The start index of the range (inclusive).
+    end_idx: int
+        The end index of the range (exclusive).
+    n_bins: int
+        The number of bins.
+    keep_nans: bool, optional
+        If True, a bin that contains a NaN selects that NaN (as both its min and max),
+        similar to the ``NaNMinMaxDownsampler``. Otherwise the NaNs are omitted.
+        By default False.
+
+    Returns
+    -------
+    np.ndarray | None
+        The sorted index positions of the min and max of every bin, relative to
+        ``start_idx``. None when the bins are too narrow for the blocks, i.e., when
+        the summaries do not help.
+
+    """
+    n = end_idx - start_idx
+    if n_bins < 1:
+        return None
+    level_for = getattr(summaries, "level_for", None)
+    if level_for is not None:
+        summaries = level_for(n, n_bins)
+    k = summaries.block_size
+    # About a block of values is decoded at the edges of every bin, the summaries
+    # only pay off when that is a small fraction of the range
+    if 64 * n_bins * k > n:
+        return None
+
+    edges = _bin_edges(x, start_idx, end_idx, n_bins)
+    bin_starts, bin_ends = edges[:-1], edges[1:]
+    # The blocks [first_blocks, last_blocks) are fully covered by a bin, the last
+    # block of the summaries can be partial
+    first_blocks = -(-bin_starts // k)
+    last_blocks = np.where(bin_ends >= summaries.size, len(summaries), bin_ends // k)
+    n_blocks = np.maximum(last_blocks - first_blocks, 0)
+    covered_start = np.where(n_blocks > 0, first_blocks * k, bin_ends)
+    covered_end = np.where(
+        n_blocks > 0, np.minimum(last_blocks * k, summaries.size), bin_ends
+    )
+
+    # The fully covered blocks
+    blocks, block_bins = _ranges(first_blocks, n_blocks)
+    block_nan = summaries.nan_count[blocks]
+
+    # The decoded values before (head) and after (tail) the covered blocks of a bin
+    decoded = []
+    for part_starts, part_ends in (
+        (bin_starts, covered_start),
+        (covered_end, bin_ends),
+    ):
+        positions, bins = _ranges(part_starts, part_ends - part_starts)
+        values = np.asarray(y[positions], dtype=np.float64) if len(bins) else None
+        decoded.append((bins, positions, values))
+
+    def _extremes(block_values, block_args, ufunc, fill):
+        def _decoded_extremes(bins, positions, values):
+            if values is not None:
+                values = np.where(np.isnan(values), fill, values)
+            return _bin_extremes(bins, positions, values, n_bins, ufunc, fill)
+
+        block_values = np.where(np.isnan(block_values), fill, block_values)
+        head, tail = decoded
+        # The head precedes the blocks of its bin, the tail follows them
+        parts = [
+            _decoded_extremes(*head),
+            _bin_extremes(block_bins, block_args, block_values, n_bins, ufunc, fill),
+            _decoded_extremes(*tail),
+        ]
+        return _combine(parts, np.less if ufunc is np.minimum else np.greater)
+
+    bin_min, bin_argmin = _extremes(
+        summaries.min[blocks], summaries.argmin[blocks], np.minimum, np.inf
+    )
+    bin_max, bin_argmax = _extremes(
+        summaries.max[blocks], summaries.argmax[blocks], np.maximum, -np.inf
+    )
+
+    if keep_nans:
+        first_nans = []
+        for bins, positions, values in decoded:
+            first_nan = np.full(n_bins, -1, dtype=np.int64)
+            if values is not None:
+                nan_hits = np.flatnonzero(np.isnan(values))
+                first = nan_hits[_first_of_groups(bins[nan_hits])]
+                first_nan[bins[first]] = positions[first]
+            first_nans.append(first_nan)
+        bin_first_nan, tail_first_nan = first_nans
+        # Decode the first block that contains a NaN of the bins without a NaN in
+        # their head
+        nan_hits = np.flatnonzero(block_nan)
+        first = nan_hits[_first_of_groups(block_bins[nan_hits])]
+        for b, block in zip(block_bins[first], blocks[first]):
+            if bin_first_nan[b] < 0:
+                values = np.asarray(y[block * k : (block + 1) * k], dtype=np.float64)
+                bin_first_nan[b] = block * k + int(np.argmax(np.isnan(values)))
+        bin_first_nan = np.where(bin_first_nan < 0, tail_first_nan, bin_first_nan)
+
+        has_nan = bin_first_nan >= 0
+        bin_argmin = np.where(has_nan, bin_first_nan, bin_argmin)
+        bin_argmax = np.where(has_nan, bin_first_nan, bin_argmax)
+        selected = np.isfinite(bin_min) | has_nan
+    else:
+        # Bins with only NaN values (or without values) are omitted
+        selected = np.isfinite(bin_min)
+
+    # The sorted min and max of every bin, as the MinMaxDownsampler
+    pairs = np.stack((bin_argmin[selected], bin_argmax[selected]), axis=1)
+    return np.sort(pairs, axis=1).ravel() - start_idx
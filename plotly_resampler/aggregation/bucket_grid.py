@@ -0,0 +1,211 @@
+"""Min-max buckets aligned to a global grid of data point indices.
+
+A regular min-max aggregation puts its bin edges relative to the start of the
+viewed range, so that a pan (which shifts the range by a fraction) moves every bin
+and the whole range is aggregated again.
+
+The buckets of a ``BucketGrid`` are aligned to a global grid instead: bucket ``b``
+always holds the data points ``[b * bucket_size, (b + 1) * bucket_size)``. The
+bucket size only depends on the zoom level (i.e., the width of the viewed range), so
+that a pan reuses the summaries of the buckets that remain in view, and only the
+newly exposed buckets are summarized. The (partially covered) edge buckets of the
+range are summarized on the fly.
+
+"""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Any, Tuple
+
+import numpy as np
+
+# The number of bucket sizes per doubling of the bucket size
+_LEVELS_PER_OCTAVE = 4
+
+# The number of zoom levels whose grid is kept
+_MAX_GRIDS = 8
+
+# A grid spans at most this many times the buckets of the viewed range, a longer
+# grid is trimmed to the viewed range
+_MAX_SPAN_FACTOR = 4
+
+
+def _bucket_extremes(
+    values: np.ndarray, offset: int, k: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the (absolute) argmin, argmax and first NaN position of the buckets of
+    ``k`` values, only the last bucket can be partial.
+
+    The argmin and argmax are -1 for a bucket with only NaNs, the first NaN position
+    is -1 for a bucket without NaNs.
+    """
+    n_buckets = -(-len(values) // k)
+    if len(values) == n_buckets * k:
+        padded = values.reshape(n_buckets, k)
+    else:
+        padded = np.full(n_buckets * k, np.nan)
+        padded[: len(values)] = values
+        padded = padded.reshape(n_buckets, k)
+    nan_mask = np.isnan(padded)
+    starts = offset + np.arange(n_buckets) * k
+
+    if nan_mask.any():
+        argmin = starts + np.where(nan_mask, np.inf, padded).argmin(axis=1)
+        argmax = starts + np.where(nan_mask, -np.inf, padded).argmax(axis=1)
+    else:
+        argmin = starts + padded.argmin(axis=1)
+        argmax = starts + padded.argmax(axis=1)
+    all_nan = nan_mask.all(axis=1)
+    argmin[all_nan] = argmax[all_nan] = -1
+
+    first_nan = starts + nan_mask.argmax(axis=1)
+    # The padding of the last bucket is no NaN of the data
+    first_nan[~nan_mask.any(axis=1) | (first_nan >= offset + len(values))] = -1
+    return argmin, argmax, first_nan
+
+
+class BucketGrid:
+    """The min-max summaries of a contiguous range of buckets of a single size."""
+
+    def __init__(self, bucket_size: int):
+        self.bucket_size = bucket_size
+        # The summarized buckets are [first_bucket, first_bucket + len(self))
+        self.first_bucket = 0
+        self.argmin = np.empty(0, dtype=np.int64)
+        self.argmax = np.empty(0, dtype=np.int64)
+        self.first_nan = np.empty(0, dtype=np.int64)
+        # The number of buckets that were summarized (i.e., not reused)
+        self.n_summarized = 0
+
+    def __len__(self) -> int:
+        return len(self.argmin)
+
+    def _summarize(self, y: Any, first_bucket: int, last_bucket: int) -> Tuple:
+        k = self.bucket_size
+        self.n_summarized += last_bucket - first_bucket
+        values = np.asarray(y[first_bucket * k : last_bucket * k], dtype=np.float64)
+        return _bucket_extremes(values, first_bucket * k, k)
+
+    def extremes(
+        self, y: Any, first_bucket: int, last_bucket: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the argmin, argmax and first NaN position of the buckets
+        [``first_bucket``, ``last_bucket``), only the buckets that are not
+        summarized yet are computed."""
+        end_bucket = self.first_bucket + len(self)
+        arrays = (self.argmin, self.argmax, self.first_nan)
+        overlaps = first_bucket < end_bucket and last_bucket > self.first_bucket
+        if not overlaps:
+            # No overlap (e.g., a jump instead of a pan), start a new grid
+            arrays = self._summarize(y, first_bucket, last_bucket)
+            self.first_bucket = first_bucket
+        else:
+            # Extend the grid with the newly exposed buckets on either side
+            if first_bucket < self.first_bucket:
+                head = self._summarize(y, first_bucket, self.first_bucket)
+                arrays = tuple(np.concatenate(a) for a in zip(head, arrays))
+                self.first_bucket = first_bucket
+            if last_bucket > end_bucket:
+                tail = self._summarize(y, end_bucket, last_bucket)
+                arrays = tuple(np.concatenate(a) for a in zip(arrays, tail))
+        self.argmin, self.argmax, self.first_nan = arrays
+
+        offset = first_bucket - self.first_bucket
+        n_buckets = last_bucket - first_bucket
+        selected = tuple(a[offset : offset + n_buckets] for a in arrays)
+        if len(self) > _MAX_SPAN_FACTOR * max(last_bucket - first_bucket, 1):
+            self.argmin, self.argmax, self.first_nan = selected
+            self.first_bucket = first_bucket
+        return selected
+
+
+class BucketGrids:
+    """The bucket grids of the y-data of a trace, one per zoom level."""
+
+    def __init__(self, y: Any):
+        self.y = y
+        self.grids: OrderedDict = OrderedDict()
+
+    def is_valid_for(self, y: Any) -> bool:
+        """Return whether the grids were built for the y-data ``y``."""
+        return y is self.y
+
+    @staticmethod
+    def bucket_size(n: int, n_buckets: int) -> int:
+        """Return the bucket size of the zoom level of a range of ``n`` data points,
+        so that it holds at most ``n_buckets`` buckets (including its edge buckets).
+
+        The bucket sizes are quantized to ``_LEVELS_PER_OCTAVE`` sizes per doubling,
+        so that a range of (about) the same width has the same grid.
+
+        """
+        target = n / max(n_buckets - 2, 1)
+        if target <= 1:
+            return 1
+        level = math.ceil(math.log2(target) * _LEVELS_PER_OCTAVE)
+        size = math.ceil(2 ** (level / _LEVELS_PER_OCTAVE))
+        return max(size, math.ceil(target))
+
+    def get_grid(self, bucket_size: int) -> BucketGrid:
+        """Return the (most recently used) grid of ``bucket_size``."""
+        grid = self.grids.get(bucket_size)
+        if grid is None:
+            grid = BucketGrid(bucket_size)
+            self.grids[bucket_size] = grid
+            if len(self.grids) > _MAX_GRIDS:
+                self.grids.popitem(last=False)
+        self.grids.move_to_end(bucket_size)
+        return grid
+
+    def minmax(
+        self, start_idx: int, end_idx: int, n_bins: int, keep_nans: bool = False
+    ) -> np.ndarray:
+        """Select the min and max data point of the grid-aligned buckets of
+        ``y[start_idx:end_idx]``, with at most ``n_bins`` buckets.
+
+        Parameters
+        ----------
+        start_idx: int
+            The start index of the range (inclusive).
+        end_idx: int
+            The end index of the range (exclusive).
+        n_bins: int
+            The maximum number of buckets in the range, including its partially
+            covered edge buckets.
+        keep_nans: bool, optional
+            If True, a bucket that contains a NaN selects its first NaN (as both its
+            min and max), similar to the ``NaNMinMaxDownsampler``. Otherwise the NaNs
+            are omitted. By default False.
+
+        Returns
+        -------
+        np.ndarray
+            The sorted index positions of the selected data points, relative to
+            ``start_idx``.
+
+        """
+        k = self.bucket_size(end_idx - start_idx, n_bins)
+        grid = self.get_grid(k)
+        first_bucket = -(-start_idx // k)
+        last_bucket = max(first_bucket, end_idx // k)
+        parts = [grid.extremes(self.y, first_bucket, last_bucket)]
+
+        # The partially covered edge buckets
+        for edge_start, edge_end in (
+            (start_idx, min(first_bucket * k, end_idx)),
+            (max(last_bucket * k, start_idx, first_bucket * k), end_idx),
+        ):
+            if edge_start < edge_end:
+                values = np.asarray(self.y[edge_start:edge_end], dtype=np.float64)
+                parts.append(_bucket_extremes(values, edge_start, len(values)))
+
+        argmin, argmax, first_nan = (np.concatenate(a) for a in zip(*parts))
+        if keep_nans:
+            has_nan = first_nan >= 0
+            argmin = np.where(has_nan, first_nan, argmin)
+            argmax = np.where(has_nan, first_nan, argmax)
+        # Buckets with only NaN values are omitted
+        indices = np.concatenate((argmin[argmin >= 0], argmax[argmax >= 0]))
+        return np.unique(indices) - start_idx
@@ -0,0 +1,183 @@
+"""Min-max pyramid of the high-frequency y-data of a trace.
+
+A min-max pyramid is built once (at ``add_trace`` time) and holds levels of
+per-bucket summaries at power-of-two bucket sizes: the min, max, (absolute) argmin
+and argmax and the NaN count of every bucket. The first and last index of a bucket
+follow from its position and need not be stored.
+
+Every level has the interface of the ``block_summaries`` of compressed y-data (see
+``block_summaries.minmax_from_summaries``), so a min-max based aggregator answers
+a wide range from the level whose bucket size suits its bins: the buckets that are
+fully covered by a bin are taken from the level, and only the values at the bin
+edges are decoded, instead of scanning the whole range.
+
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, List, Tuple
+
+import numpy as np
+
+# The number of values per bucket of the finest level
+_BASE_BUCKET_SIZE = 64
+
+# Number of values per pass when summarizing the finest level
+_BUILD_CHUNK_SIZE = _BASE_BUCKET_SIZE << 14
+
+
+class PyramidLevel:
+    """The per-bucket summaries of a single level of a min-max pyramid."""
+
+    def __init__(
+        self,
+        size: int,
+        block_size: int,
+        min: np.ndarray,
+        max: np.ndarray,
+        argmin: np.ndarray,
+        argmax: np.ndarray,
+        nan_count: np.ndarray,
+    ):
+        self.size = size
+        self.block_size = block_size
+        self.min = min
+        self.max = max
+        self.argmin = argmin
+        self.argmax = argmax
+        self.nan_count = nan_count
+
+    def __len__(self) -> int:
+        return len(self.nan_count)
+
+    def block_range(self, start: int, end: int) -> Tuple[int, int]:
+        """Return the first (inclusive) and last (exclusive) bucket that are fully
+        covered by the positions [``start``, ``end``)."""
+        first_block = -(-start // self.block_size)
+        # The last bucket can be partial
+        last_block = len(self) if end >= self.size else end // self.block_size
+        return first_block, max(first_block, last_block)
+
+    def size_in_bytes(self) -> int:
+        arrays = (self.min, self.max, self.argmin, self.argmax, self.nan_count)
+        return sum(a.nbytes for a in arrays)
+
+
+def _summarize(values: np.ndarray, offset: int, k: int) -> Tuple[np.ndarray, ...]:
+    """Summarize the buckets of ``k`` values, only the last bucket can be partial."""
+    n_blocks = -(-len(values) // k)
+    padded = np.full(n_blocks * k, np.nan)
+    padded[: len(values)] = values
+    padded = padded.reshape(n_blocks, k)
+    nan_mask = np.isnan(padded)
+    nan_count = nan_mask.sum(axis=1)
+    # The padding of the last bucket is not counted as NaN
+    nan_count[-1] -= n_blocks * k - len(values)
+
+    argmin = np.where(nan_mask, np.inf, padded).argmin(axis=1)
+    argmax = np.where(nan_mask, -np.inf, padded).argmax(axis=1)
+    rows = np.arange(n_blocks)
+    return (
+        padded[rows, argmin],
+        padded[rows, argmax],
+        offset + rows * k + argmin,
+        offset + rows * k + argmax,
+        nan_count,
+    )
+
+
+def _merge_pairs(level: PyramidLevel) -> PyramidLevel:
+    """Merge every pair of consecutive buckets of a level into the next level."""
+    n_pairs = len(level) // 2
+
+    def _pair(arr: np.ndarray, fill: Any) -> Tuple[np.ndarray, np.ndarray]:
+        left = arr[0::2]
+        right = np.empty_like(left)
+        right[:n_pairs] = arr[1::2]
+        # A last bucket without a right neighbor is merged with an empty bucket
+        right[n_pairs:] = fill
+        return left, right
+
+    min_l, min_r = _pair(level.min, np.nan)
+    max_l, max_r = _pair(level.max, np.nan)
+    argmin_l, argmin_r = _pair(level.argmin, 0)
+    argmax_l, argmax_r = _pair(level.argmax, 0)
+    nan_l, nan_r = _pair(level.nan_count, 0)
+
+    # On a tie, the first occurrence (i.e., the left bucket) is kept
+    take_min_r = (min_r < min_l) | (np.isnan(min_l) & ~np.isnan(min_r))
+    take_max_r = (max_r > max_l) | (np.isnan(max_l) & ~np.isnan(max_r))
+    return PyramidLevel(
+        level.size,
+        level.block_size * 2,
+        np.where(take_min_r, min_r, min_l),
+        np.where(take_max_r, max_r, max_l),
+        np.where(take_min_r, argmin_r, argmin_l),
+        np.where(take_max_r, argmax_r, argmax_l),
+        nan_l + nan_r,
+    )
+
+
+class MinMaxPyramid:
+    """Levels of per-bucket min-max summaries of the y-data of a trace."""
+
+    def __init__(self, y: Any, base_bucket_size: int = _BASE_BUCKET_SIZE):
+        """Build the pyramid of the y-data ``y``.
+
+        Parameters
+        ----------
+        y: Any
+            The numeric high-frequency y-data, which supports slicing (e.g., a
+            ``np.ndarray`` or a compressed vector).
+        base_bucket_size: int, optional
+            The number of values per bucket of the finest level, a power of two. Every
+            next level doubles the bucket size. By default 64.
+
+        """
+        if base_bucket_size < 1 or base_bucket_size & (base_bucket_size - 1):
+            raise ValueError("base_bucket_size must be a power of two")
+        self.y = y
+        k = base_bucket_size
+        n = self.size = len(y)
+        # The finest level, summarized in chunks of whole buckets
+        chunk_size = max(_BUILD_CHUNK_SIZE // k, 1) * k
+        parts = [
+            _summarize(
+                np.asarray(y[start : start + chunk_size], dtype=np.float64), start, k
+            )
+            for start in range(0, n, chunk_size)
+        ]
+        arrays = [
+            np.concatenate([part[i] for part in parts]) if parts else np.empty(0)
+            for i in range(5)
+        ]
+        self.levels: List[PyramidLevel] = [PyramidLevel(n, k, *arrays)]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(_merge_pairs(self.levels[-1]))
+
+    @staticmethod
+    def supports(y: Any) -> bool:
+        """Return whether a pyramid can be built for the y-data ``y``."""
+        return getattr(getattr(y, "dtype", None), "kind", None) in ("i", "u", "f")
+
+    def is_valid_for(self, y: Any) -> bool:
+        """Return whether the pyramid was built for the y-data ``y``; a pyramid of
+        y-data that has grown since (e.g., a growable vector) is stale."""
+        return y is self.y and len(y) == self.size
+
+    def level_for(self, n: int, n_bins: int) -> PyramidLevel:
+        """Return the level that suits ``n_bins`` bins over ``n`` values.
+
+        A bin takes the buckets it fully covers from the level, and decodes about a
+        bucket of values at its edges. For a bucket size ``k`` that are about
+        ``n / k + n_bins * k`` values, which is minimal for ``k = sqrt(n / n_bins)``.
+
+        """
+        target = math.sqrt(n / max(n_bins, 1))
+        return min(
+            self.levels, key=lambda level: abs(math.log2(level.block_size / target))
+        )
+
+    def size_in_bytes(self) -> int:
+        return sum(level.size_in_bytes() for level in self.levels)
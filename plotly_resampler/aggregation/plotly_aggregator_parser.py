@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import bisect
-from typing import Tuple, Union
+from typing import List, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import pytz
 
+from .aggregation_cache import fingerprint
 from .aggregation_interface import DataAggregator, DataPointSelector
+from .bucket_grid import BucketGrids
 from .gap_handler_interface import AbstractGapHandler
 from .gap_handlers import NoGapHandler
+from .minmax_pyramid import MinMaxPyramid
+from .x_lookup import XLookup
 
 
 class PlotlyAggregatorParser:
@@ -29,6 +33,14 @@ class PlotlyAggregatorParser:
             return hf_data.values
         return hf_data
 
+    @staticmethod
+    def decode_view(hf_data):
+        """Decode a lazy view on compressed data (e.g., a slice of a compressed
+        vector with ``get_decompressed=False``), other data is returned as is."""
+        if callable(getattr(hf_data, "decompress", None)):
+            return hf_data.decompress()
+        return hf_data
+
     @staticmethod
     def to_same_tz(
         ts: Union[pd.Timestamp, None], reference_tz: Union[pytz.BaseTzInfo, None]
@@ -50,6 +62,59 @@ class PlotlyAggregatorParser:
             return ts.tz_localize(None)
         return ts
 
+    @staticmethod
+    def get_x_lookup(hf_trace_data: dict) -> XLookup:
+        """Get the index range lookup of the x-data of a trace.
+
+        The lookup is built once (normally at ``add_trace`` time) and stored in the
+        ``hf_trace_data`` dict; it is rebuilt when the x-data is replaced.
+        """
+        x_lookup = hf_trace_data.get("x_lookup")
+        if x_lookup is None or not x_lookup.is_valid_for(hf_trace_data["x"]):
+            x_lookup = XLookup(hf_trace_data["x"])
+            hf_trace_data["x_lookup"] = x_lookup
+        return x_lookup
+
+    @staticmethod
+    def get_minmax_pyramid(hf_trace_data: dict) -> MinMaxPyramid | None:
+        """Return the min-max pyramid of the y-data of a trace.
+
+        The pyramid is only built when the downsampler of the trace opts in (with its
+        ``pyramid`` argument) and the y-data is numeric. It is cached in
+        ``hf_trace_data`` and rebuilt when the y-data is replaced.
+
+        """
+        if not getattr(hf_trace_data["downsampler"], "pyramid", False):
+            return None
+        y = hf_trace_data["y"]
+        pyramid = hf_trace_data.get("minmax_pyramid")
+        if pyramid is None or not pyramid.is_valid_for(y):
+            if not MinMaxPyramid.supports(y):
+                return None
+            pyramid = MinMaxPyramid(y)
+            hf_trace_data["minmax_pyramid"] = pyramid
+        return pyramid
+
+    @staticmethod
+    def get_bucket_grids(hf_trace_data: dict) -> BucketGrids | None:
+        """Return the bucket grids of the y-data of a trace.
+
+        The grids are only used when the downsampler of the trace opts in (with its
+        ``grid_aligned`` argument) and the y-data is numeric. They are cached in
+        ``hf_trace_data`` and reset when the y-data is replaced.
+
+        """
+        if not getattr(hf_trace_data["downsampler"], "grid_aligned", False):
+            return None
+        y = hf_trace_data["y"]
+        grids = hf_trace_data.get("bucket_grids")
+        if grids is None or not grids.is_valid_for(y):
+            if getattr(getattr(y, "dtype", None), "kind", None) not in ("i", "u", "f"):
+                return None
+            grids = BucketGrids(y)
+            hf_trace_data["bucket_grids"] = grids
+        return grids
+
     @staticmethod
     def get_start_end_indices(hf_trace_data, axis_type, start, end) -> Tuple[int, int]:
         """Get the start & end indices of the high-frequency data."""
@@ -75,13 +140,17 @@ class PlotlyAggregatorParser:
             start_idx = int(max((start - x_start) // x_step, 0))
             end_idx = int((end - x_start) // x_step)
             return start_idx, end_idx
-        # TODO: this can be performed as-well for a fixed frequency range-index w/ freq
 
+        x_lookup = PlotlyAggregatorParser.get_x_lookup(hf_trace_data)
         if axis_type == "date":
-            start, end = pd.to_datetime(start), pd.to_datetime(end)
-            # convert start & end to the same timezone
-            if isinstance(hf_trace_data["x"], pd.DatetimeIndex):
-                tz = hf_trace_data["x"].tz
+            # NOTE: pd.Timestamp parses a scalar without the format inference of
+            # pd.to_datetime
+            start, end = pd.Timestamp(start), pd.Timestamp(end)
+            # convert start & end to the same timezone, for a pd.DatetimeIndex or
+            # compressed datetime x-data (which both have a tz attribute)
+            if hasattr(hf_trace_data["x"], "tz"):
+                # NOTE: the timezone of the x-data is resolved in the lookup
+                tz = x_lookup.tz
                 try:
                     assert start.tz.__str__() == end.tz.__str__()
                 except (TypeError, AssertionError):
@@ -94,9 +163,19 @@ class PlotlyAggregatorParser:
                 start = PlotlyAggregatorParser.to_same_tz(start, tz)
                 end = PlotlyAggregatorParser.to_same_tz(end, tz)
 
-        # Search the index-positions
-        start_idx = bisect.bisect_left(hf_trace_data["x"], start)
-        end_idx = bisect.bisect_right(hf_trace_data["x"], end)
+        # Search the index-positions in the numeric view of the x-data; in O(1) for
+        # evenly spaced x-data
+        indices = x_lookup.search(start, end)
+        if indices is not None:
+            return indices
+
+        x = hf_trace_data["x"]
+        if hasattr(x, "searchsorted") and not isinstance(x, (np.ndarray, pd.Index)):
+            # Compressed x-data searches its blocks, instead of decoding a value
+            # for every bisect step
+            return x.searchsorted(start, "left"), x.searchsorted(end, "right")
+        start_idx = bisect.bisect_left(x, start)
+        end_idx = bisect.bisect_right(x, end)
         return start_idx, end_idx
 
     @staticmethod
@@ -168,11 +247,13 @@ class PlotlyAggregatorParser:
             non `x` and `y` data (e.g. `text`, `marker_size`, `marker_color`).
 
         """
-        hf_x = hf_trace_data["x"][start_idx:end_idx]
-        hf_y = hf_trace_data["y"][start_idx:end_idx]
+        # NOTE: slicing a lazy view is O(1), its window is decoded once here
+        decode_view = PlotlyAggregatorParser.decode_view
+        hf_x = decode_view(hf_trace_data["x"][start_idx:end_idx])
 
         # No downsampling needed ; we show the raw data as is, but with gap-detection
         if (end_idx - start_idx) <= hf_trace_data["max_n_samples"]:
+            hf_y = decode_view(hf_trace_data["y"][start_idx:end_idx])
             indices = np.arange(len(hf_y))  # no downsampling - all values are selected
             if len(indices):
                 return PlotlyAggregatorParser._handle_gaps(
@@ -183,6 +264,48 @@ class PlotlyAggregatorParser:
 
         downsampler = hf_trace_data["downsampler"]
 
+        # The fast paths below need numeric x-data (or no x-data, i.e., a RangeIndex)
+        x = PlotlyAggregatorParser.parse_hf_data(hf_x)
+        if x is not None and x.dtype.kind in "mM":
+            # Datetimes are binned on their int64 view, as tsdownsample does
+            x = x.view(np.int64)
+        if isinstance(downsampler, DataPointSelector) and (
+            x is None or x.dtype.kind in "iuf"
+        ):
+            y = hf_trace_data["y"]
+            n_out = hf_trace_data["max_n_samples"]
+
+            # In panning mode, the bins are aligned to a global grid, so that only
+            # the newly exposed bins of a pan are aggregated
+            indices = None
+            grids = PlotlyAggregatorParser.get_bucket_grids(hf_trace_data)
+            if grids is not None:
+                indices = downsampler.arg_downsample_grid(
+                    x, y, grids, start_idx, end_idx, n_out=n_out
+                )
+
+            # Wide ranges are downsampled from per-block summaries of the y-data, so
+            # that only the values at the bin edges are decoded; i.e., from a min-max
+            # pyramid or the block summaries of the y-data
+            candidates = [
+                PlotlyAggregatorParser.get_minmax_pyramid(hf_trace_data),
+                getattr(y, "block_summaries", None),
+            ]
+            for summaries in candidates:
+                if indices is not None or summaries is None:
+                    continue
+                indices = downsampler.arg_downsample_summaries(
+                    x, y, summaries, start_idx, end_idx, n_out=n_out
+                )
+
+            if indices is not None:
+                agg_x = hf_x[indices]
+                agg_y = np.asarray(decode_view(y[start_idx + indices]))
+                return PlotlyAggregatorParser._handle_gaps(
+                    hf_trace_data, hf_x=hf_x, agg_x=agg_x, agg_y=agg_y, indices=indices
+                )
+
+        hf_y = decode_view(hf_trace_data["y"][start_idx:end_idx])
         hf_x_parsed = PlotlyAggregatorParser.parse_hf_data(hf_x)
         hf_y_parsed = PlotlyAggregatorParser.parse_hf_data(hf_y)
 
@@ -199,7 +322,93 @@ class PlotlyAggregatorParser:
         return PlotlyAggregatorParser._handle_gaps(
             hf_trace_data, hf_x=hf_x, agg_x=agg_x, agg_y=agg_y, indices=indices
         )
-    
+
+    @staticmethod
+    def _is_batchable(hf_trace_data: dict) -> bool:
+        """Return whether a trace can be downsampled in a batch of traces that share
+        their x-data, i.e., with ``arg_downsample_batch``."""
+        downsampler = hf_trace_data["downsampler"]
+        return (
+            isinstance(downsampler, DataPointSelector)
+            # In-memory y-data, without the compressed data specific paths
+            and isinstance(hf_trace_data["y"], np.ndarray)
+            and not getattr(downsampler, "grid_aligned", False)
+            and not getattr(downsampler, "pyramid", False)
+            and not hf_trace_data.get("downsampler_kwargs")
+        )
+
+    @staticmethod
+    def aggregate_batch(
+        hf_traces_data: List[dict], start_idx: int, end_idx: int
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Aggregate the data of traces which share their x-data between `start_idx`
+        and `end_idx`.
+
+        The x-data is sliced and parsed once. The traces with the same downsampler (and
+        parameters) and number of output samples are downsampled as a batch with
+        `arg_downsample_batch`, other traces are aggregated one by one.
+
+        Returns:
+            The (x, y, indices) of every trace, as returned by `aggregate`.
+
+        """
+        decode_view = PlotlyAggregatorParser.decode_view
+        results = [None] * len(hf_traces_data)
+        batches = {}
+        for i, hf_trace_data in enumerate(hf_traces_data):
+            if (
+                end_idx - start_idx > hf_trace_data["max_n_samples"]
+                and PlotlyAggregatorParser._is_batchable(hf_trace_data)
+            ):
+                key = (
+                    fingerprint(hf_trace_data["downsampler"]),
+                    hf_trace_data["max_n_samples"],
+                )
+                batches.setdefault(key, []).append(i)
+            else:
+                results[i] = PlotlyAggregatorParser.aggregate(
+                    hf_trace_data, start_idx, end_idx
+                )
+        if not batches:
+            return results
+
+        hf_x = decode_view(hf_traces_data[0]["x"][start_idx:end_idx])
+        hf_x_parsed = PlotlyAggregatorParser.parse_hf_data(hf_x)
+        for members in batches.values():
+            hf_ys = [hf_traces_data[i]["y"][start_idx:end_idx] for i in members]
+            first = hf_traces_data[members[0]]
+            indices = first["downsampler"].arg_downsample_batch(
+                hf_x_parsed, hf_ys, n_out=first["max_n_samples"]
+            )
+            for i, hf_y, idxs in zip(members, hf_ys, indices):
+                agg_x, agg_y = PlotlyAggregatorParser._select(
+                    hf_traces_data[i], hf_x, hf_y, idxs, start_idx
+                )
+                results[i] = PlotlyAggregatorParser._handle_gaps(
+                    hf_traces_data[i], hf_x=hf_x, agg_x=agg_x, agg_y=agg_y, indices=idxs
+                )
+        return results
+
+    @staticmethod
+    def _select(
+        hf_trace_data: dict,
+        hf_x: np.ndarray,
+        hf_y: np.ndarray,
+        indices: np.ndarray,
+        start_idx: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Select the x and y values at the (relative) `indices` of the slices."""
+        if isinstance(hf_trace_data["x"], pd.RangeIndex):
+            # Avoid slicing the default pd.RangeIndex (not an in-memory array)
+            agg_x = (
+                start_idx
+                + hf_trace_data["x"].start
+                + indices.astype(hf_trace_data["x"].dtype) * hf_trace_data["x"].step
+            )
+        else:
+            agg_x = hf_x[indices]
+        return agg_x, hf_y[indices]
+
     @staticmethod
     def process_downsampling(
         hf_trace_data: dict,
@@ -213,6 +422,13 @@ class PlotlyAggregatorParser:
         downsampler = hf_trace_data["downsampler"]
 
         if isinstance(downsampler, DataPointSelector):
+            # Compressed y-data counts its NaNs without a scan, when there are none
+            # the NaN-aware downsampling is not needed
+            count_nans = getattr(hf_trace_data["y"], "count_nans", None)
+            if count_nans is not None and not count_nans(
+                start_idx, start_idx + len(hf_y)
+            ):
+                downsampler = downsampler.for_nan_free_data()
             s_v = hf_y_parsed
             if isinstance(s_v, pd.Categorical):  # pd.Categorical (has no .values)
                 s_v = s_v.codes
@@ -222,16 +438,9 @@ class PlotlyAggregatorParser:
                 n_out=hf_trace_data["max_n_samples"],
                 **hf_trace_data.get("downsampler_kwargs", {}),
             )
-            if isinstance(hf_trace_data["x"], pd.RangeIndex):
-                # Avoid slicing the default pd.RangeIndex (not an in-memory array)
-                agg_x = (
-                    start_idx
-                    + hf_trace_data["x"].start
-                    + indices.astype(hf_trace_data["x"].dtype) * hf_trace_data["x"].step
-                )
-            else:
-                agg_x = hf_x[indices]
-            agg_y = hf_y[indices]
+            agg_x, agg_y = PlotlyAggregatorParser._select(
+                hf_trace_data, hf_x, hf_y, indices, start_idx
+            )
         elif isinstance(downsampler, DataAggregator):
             agg_x, agg_y = downsampler.aggregate(
                 hf_x_parsed,
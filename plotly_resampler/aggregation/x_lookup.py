@@ -0,0 +1,204 @@
+"""Index range lookup of the high-frequency x-data.
+
+Every relayout searches the index range of the visible x-range in the x-data of
+each trace. The ``XLookup`` of a trace is built once (at ``add_trace`` time), and
+resolves all that does not depend on the searched range:
+
+* the timezone of datetime x-data,
+* a contiguous int64 (nanoseconds for datetime data) or float view of the x-data,
+  which is searched with ``np.searchsorted`` instead of bisecting the container,
+* the start and step of evenly spaced x-data (e.g., a ``pd.DatetimeIndex`` with a
+  fixed ``freq`` or a constant-step float array), whose index range is computed in
+  O(1).
+
+The lookup also tells whether two traces have the same x-data (see ``same_data``),
+so that traces on a shared timestamp array can be aggregated as a group.
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+# The largest deviation (relative to the step) of the x-data from an evenly
+# spaced grid; the O(1) index estimate is then at most one position off, which is
+# corrected by comparing with the neighboring values
+_STEP_TOLERANCE = 0.25
+
+# Number of values per pass when detecting an evenly spaced grid
+_CHECK_CHUNK_SIZE = 1 << 20
+
+
+class XLookup:
+    """The index range lookup of the x-data of a trace."""
+
+    def __init__(self, x: Any):
+        """Build the lookup of the x-data ``x``.
+
+        Parameters
+        ----------
+        x: Any
+            The (monotonically increasing) high-frequency x-data.
+
+        """
+        self.x = x
+        self.tz = getattr(x, "tz", None)
+        self.is_datetime = isinstance(x, pd.DatetimeIndex) or (
+            isinstance(x, np.ndarray) and np.issubdtype(x.dtype, np.datetime64)
+        )
+        # The start and step of evenly spaced x-data
+        self.start = self.step = None
+        # The digest of the view, computed when first compared with other x-data
+        self._digest = None
+        self._values = self._view()
+        self.has_view = self._values is not None
+        if isinstance(x, pd.DatetimeIndex) and isinstance(x.freq, pd.offsets.Tick):
+            # A fixed frequency is evenly spaced by construction
+            if len(x):
+                self.start, self.step = int(self._values[0]), x.freq.nanos
+        elif self.has_view:
+            self._detect_step(self._values)
+
+    def _view(self) -> np.ndarray | None:
+        """Return a contiguous int64 or float view of the x-data, or None if the
+        x-data has no numeric view (e.g., a compressed vector or string data)."""
+        x = self.x
+        if isinstance(x, pd.RangeIndex):
+            # Its index range is computed directly, without materializing it
+            return None
+        if isinstance(x, pd.Index) and (self.is_datetime or x.dtype.kind in "iuf"):
+            # NOTE: the values of a timezone aware DatetimeIndex are in UTC
+            x = x.values
+        if not isinstance(x, np.ndarray):
+            return None
+        if np.issubdtype(x.dtype, np.datetime64):
+            # The nanoseconds since the epoch
+            x = x.astype("datetime64[ns]", copy=False).view(np.int64)
+            return np.ascontiguousarray(x)
+        if x.dtype.kind in "iuf":
+            return np.ascontiguousarray(x)
+        return None
+
+    def _detect_step(self, values: np.ndarray) -> None:
+        """Set the start and step when the values are evenly spaced."""
+        n = len(values)
+        if n < 2:
+            return
+        start = values[0].item()
+        step = (values[-1].item() - start) / (n - 1)
+        if not step > 0:
+            return
+        for chunk_start in range(0, n, _CHECK_CHUNK_SIZE):
+            chunk = values[chunk_start : chunk_start + _CHECK_CHUNK_SIZE]
+            grid = start + step * np.arange(chunk_start, chunk_start + len(chunk))
+            if np.abs(chunk - grid).max() > _STEP_TOLERANCE * step:
+                return
+        self.start, self.step = start, step
+
+    @property
+    def values(self) -> np.ndarray | None:
+        """The contiguous int64 or float view of the x-data."""
+        if self._values is None and self.has_view:
+            # The view is not pickled, it is rebuilt on first use
+            self._values = self._view()
+        return self._values
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_values": None}
+
+    def is_valid_for(self, x: Any) -> bool:
+        """Return whether the lookup was built for the x-data ``x``."""
+        return x is self.x
+
+    def _digest_view(self) -> bytes:
+        """Return the (cached) digest of the contiguous view of the x-data."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.values.view(np.uint8)).digest()
+        return self._digest
+
+    def same_data(self, other: XLookup) -> bool:
+        """Return whether the x-data of ``other`` equals the x-data of this lookup.
+
+        The x-data is equal when it is the same object, an equal ``pd.RangeIndex``,
+        or when its views have the same type, timezone and digest. Only x-data of the
+        same length and with the same first and last value is digested.
+
+        """
+        x, other_x = self.x, other.x
+        if x is other_x:
+            return True
+        if isinstance(x, pd.RangeIndex) or isinstance(other_x, pd.RangeIndex):
+            return (
+                isinstance(x, pd.RangeIndex)
+                and isinstance(other_x, pd.RangeIndex)
+                and x.equals(other_x)
+            )
+        if not (self.has_view and other.has_view) or (
+            type(x) is not type(other_x)
+            or self.is_datetime != other.is_datetime
+            or str(self.tz) != str(other.tz)
+        ):
+            return False
+        values, other_values = self.values, other.values
+        if values.dtype != other_values.dtype or len(values) != len(other_values):
+            return False
+        if len(values) and (
+            values[0] != other_values[0] or values[-1] != other_values[-1]
+        ):
+            return False
+        return self._digest_view() == other._digest_view()
+
+    def _to_key(self, value: Any) -> Any:
+        """Convert a (start or end) value to the scale of the view."""
+        if self.is_datetime:
+            # The nanoseconds since the epoch (in UTC for a timezone aware value)
+            return pd.Timestamp(value).value
+        return value
+
+    def _evenly_spaced_position(self, value: Any, side: str) -> int:
+        """Return the insertion position of ``value`` in evenly spaced x-data."""
+        values = self.values
+        n = len(values)
+        offset = (value - self.start) / self.step
+        if side == "left":
+            position = int(min(max(np.ceil(offset), 0), n))
+            # Correct the estimate with the neighboring values
+            while position > 0 and values[position - 1] >= value:
+                position -= 1
+            while position < n and values[position] < value:
+                position += 1
+        else:
+            position = int(min(max(np.floor(offset) + 1, 0), n))
+            while position > 0 and values[position - 1] > value:
+                position -= 1
+            while position < n and values[position] <= value:
+                position += 1
+        return position
+
+    def search(self, start: Any, end: Any) -> Tuple[int, int] | None:
+        """Return the index range of the x-data in [``start``, ``end``].
+
+        Returns
+        -------
+        Tuple[int, int] | None
+            The start (inclusive) and end (exclusive) index, or None when the
+            x-data has no numeric view; the caller then searches the x-data itself.
+
+        """
+        values = self.values
+        if values is None:
+            return None
+        start, end = self._to_key(start), self._to_key(end)
+        if self.step is not None:
+            return (
+                self._evenly_spaced_position(start, "left"),
+                self._evenly_spaced_position(end, "right"),
+            )
+        return (
+            int(np.searchsorted(values, start, "left")),
+            int(np.searchsorted(values, end, "right")),
+        )
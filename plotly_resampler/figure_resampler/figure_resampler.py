@@ -59,6 +59,7 @@ class FigureResampler(AbstractFigureAggregator, go.Figure):
         overview_kwargs: dict = {},
         verbose: bool = False,
         show_dash_kwargs: dict | None = None,
+        aggregation_cache_bytes: int | None = 0,
     ):
         """Initialize a dynamic aggregation data mirror using a dash web app.
 
@@ -140,6 +141,10 @@ class FigureResampler(AbstractFigureAggregator, go.Figure):
             A dict that will be used as default kwargs for the [`show_dash`][figure_resampler.figure_resampler.FigureResampler.show_dash] method.
             !!! note
                 The passed kwargs to the [`show_dash`][figure_resampler.figure_resampler.FigureResampler.show_dash] method will take precedence over these defaults.
+        aggregation_cache_bytes: int, optional
+            The byte budget of the LRU cache of the aggregation results of recently
+            viewed windows, e.g., ``64 * 1024**2`` for 64 MiB. By default 0, i.e., the
+            cache is disabled (as when ``None``).
 
         """
         # Parse the figure input before calling `super`
@@ -199,6 +204,7 @@ class FigureResampler(AbstractFigureAggregator, go.Figure):
             show_mean_aggregation_size,
             convert_traces_kwargs,
             verbose,
+            aggregation_cache_bytes,
         )
 
         if isinstance(figure, AbstractFigureAggregator):
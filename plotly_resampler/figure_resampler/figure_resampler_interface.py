@@ -24,10 +24,12 @@ from pandas.io.json._normalize import nested_to_record
 from plotly.basedatatypes import BaseFigure, BaseTraceType
 
 from ..aggregation import AbstractAggregator, MedDiffGapHandler, MinMaxLTTB
+from ..aggregation.aggregation_cache import AggregationCache
 from ..aggregation.aggregation_interface import DataPointSelector
 from ..aggregation.gap_handler_interface import AbstractGapHandler
 from ..aggregation.plotly_aggregator_parser import PlotlyAggregatorParser
-from .utils import round_number_str, round_td_str
+from ..aggregation.x_lookup import XLookup
+from .utils import is_compressed_vector, round_number_str, round_td_str
 
 # A high-frequency data container
 # NOTE: the attributes must all be valid trace attributes, with attribute levels
@@ -59,6 +61,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
         show_mean_aggregation_size: bool = True,
         convert_traces_kwargs: dict | None = None,
         verbose: bool = False,
+        aggregation_cache_bytes: int | None = 0,
     ):
         """Instantiate a resampling data mirror.
 
@@ -105,6 +108,11 @@ class AbstractFigureAggregator(BaseFigure, ABC):
                 ``convert_existing_traces`` is set to True.
         verbose: bool, optional
             Whether some verbose messages will be printed or not, by default False.
+        aggregation_cache_bytes: int, optional
+            The byte budget of the LRU cache of the aggregation results of recently
+            viewed windows (e.g., when resetting the axes or navigating back to a
+            previous zoom level), e.g., ``64 * 1024**2`` for 64 MiB. By default 0,
+            i.e., the cache is disabled (as when ``None``).
 
         """
         self._hf_data: Dict[str, dict] = {}
@@ -117,6 +125,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
 
         self._global_downsampler = default_downsampler
         self._global_gap_handler = default_gap_handler
+        self._aggregation_cache_bytes = aggregation_cache_bytes
 
         # Given figure should always be a BaseFigure that is not wrapped by
         # a plotly-resampler class
@@ -134,6 +143,13 @@ class AbstractFigureAggregator(BaseFigure, ABC):
                     setattr(self, k, v)
             delattr(figure, "_pr_props")  # should not be stored anymore
 
+        # NOTE: the cache itself is not serialized, only its byte budget
+        self._aggregation_cache = (
+            AggregationCache(self._aggregation_cache_bytes)
+            if self._aggregation_cache_bytes
+            else None
+        )
+
         if convert_existing_traces:
             # call __init__ with the correct layout and set the `_grid_ref` of the
             # to-be-converted figure
@@ -276,6 +292,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
         trace: dict,
         start: Optional[Union[str, float]] = None,
         end: Optional[Union[str, float]] = None,
+        aggregated: Optional[Dict[str, tuple]] = None,
     ) -> Optional[Union[dict, BaseTraceType]]:
         """Check and update the passed ``trace`` its data properties based on the
         slice range.
@@ -304,6 +321,10 @@ class AbstractFigureAggregator(BaseFigure, ABC):
         end : Union[float, str], optional
             The end index for which we want the resampled data to be updated to,
             by default None
+        aggregated : Dict[str, tuple], optional
+            The ``(start_idx, end_idx, (agg_x, agg_y, indices))`` of the traces that
+            were aggregated as a group (see ``_aggregate_shared_x``), by trace uid.
+            By default None.
 
         Returns
         -------
@@ -325,19 +346,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             return None
 
         # Parse trace data (necessary when updating the trace data)
-        for k in _hf_data_container._fields:
-            if isinstance(
-                hf_trace_data[k], (np.ndarray, pd.RangeIndex, pd.DatetimeIndex)
-            ):
-                # is faster to escape the loop here than check inside the hasattr if
-                continue
-            elif pd.DatetimeTZDtype.is_dtype(hf_trace_data[k]):
-                # When we use the .values method, timezone information is lost
-                # so convert it to pd.DatetimeIndex, which preserves the tz-info
-                hf_trace_data[k] = pd.Index(hf_trace_data[k])
-            elif hasattr(hf_trace_data[k], "values"):
-                # when not a range index or datetime index
-                hf_trace_data[k] = hf_trace_data[k].values
+        self._parse_hf_trace_data(hf_trace_data)
 
         # Also check if the y-data is empty, if so, return an empty trace
         if len(hf_trace_data["y"]) == 0:
@@ -346,29 +355,37 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             trace["name"] = hf_trace_data["name"]
             return trace
 
-        # Leverage the axis type to get the start and end indices
-        # Note: the axis type specified in the figure layout takes precedence over the
-        # the axis type which is inferred from the data (and stored in hf_trace_data)
-        # TODO: verify if we need to use `axis`of anchor as key to determing axis type
-        axis = trace.get("xaxis", "x")
-        axis_type = self.layout._props.get(axis[:1] + "axis" + axis[1:], {}).get(
-            "type", hf_trace_data["axis_type"]
-        )
-        start_idx, end_idx = PlotlyAggregatorParser.get_start_end_indices(
-            hf_trace_data, axis_type, start, end
-        )
-
-        # Return an invisible, single-point, trace when the sliced hf_series doesn't
-        # contain any data in the current view
-        if end_idx == start_idx:
-            trace["x"] = [hf_trace_data["x"][0]]
-            trace["y"] = [None]
-            trace["name"] = hf_trace_data["name"]
-            return trace
+        if aggregated is not None and trace["uid"] in aggregated:
+            # Aggregated together with the traces that share its x-data
+            start_idx, end_idx, (agg_x, agg_y, indices) = aggregated[trace["uid"]]
+        else:
+            # Leverage the axis type to get the start and end indices
+            axis_type = self._get_axis_type(trace, hf_trace_data)
+            start_idx, end_idx = PlotlyAggregatorParser.get_start_end_indices(
+                hf_trace_data, axis_type, start, end
+            )
 
-        agg_x, agg_y, indices = PlotlyAggregatorParser.aggregate(
-            hf_trace_data, start_idx, end_idx
-        )
+            # Return an invisible, single-point, trace when the sliced hf_series
+            # doesn't contain any data in the current view
+            if end_idx == start_idx:
+                trace["x"] = [hf_trace_data["x"][0]]
+                trace["y"] = [None]
+                trace["name"] = hf_trace_data["name"]
+                return trace
+
+            # The aggregation of a recently viewed window is served from the cache
+            aggregation = self._get_cached_aggregation(
+                trace["uid"], hf_trace_data, start_idx, end_idx
+            )
+            if aggregation is None:
+                aggregation = self._cache_aggregation(
+                    trace["uid"],
+                    hf_trace_data,
+                    start_idx,
+                    end_idx,
+                    PlotlyAggregatorParser.aggregate(hf_trace_data, start_idx, end_idx),
+                )
+            agg_x, agg_y, indices = aggregation
 
         # -------------------- Set the hf_trace_data_props -------------------
         trace["x"] = agg_x
@@ -386,18 +403,141 @@ class AbstractFigureAggregator(BaseFigure, ABC):
                 out[k] = v
 
         # Check if (hover)text also needs to be downsampled
+        # NOTE: a compressed vector (e.g., a dictionary encoded text column) only
+        # decodes the selected indices
         for k in ["text", "hovertext", "marker_size", "marker_color", "customdata"]:
             k_val = hf_trace_data.get(k)
-            if isinstance(k_val, (np.ndarray, pd.Series)):
+            if isinstance(k_val, (np.ndarray, pd.Series)) or is_compressed_vector(k_val):
                 assert isinstance(
                     hf_trace_data["downsampler"], DataPointSelector
                 ), "Only DataPointSelector can downsample non-data trace array props."
-                _nest_dict_rec(k, k_val[start_idx + indices], trace)
+                _nest_dict_rec(
+                    k,
+                    PlotlyAggregatorParser.decode_view(k_val[start_idx + indices]),
+                    trace,
+                )
             elif k_val is not None:
                 trace[k] = k_val
 
         return trace
 
+    @staticmethod
+    def _parse_hf_trace_data(hf_trace_data: dict) -> None:
+        """Parse the hf data of a trace to arrays (in place)."""
+        for k in _hf_data_container._fields:
+            if isinstance(
+                hf_trace_data[k], (np.ndarray, pd.RangeIndex, pd.DatetimeIndex)
+            ) or is_compressed_vector(hf_trace_data[k]):
+                # is faster to escape the loop here than check inside the hasattr if
+                continue
+            elif pd.DatetimeTZDtype.is_dtype(hf_trace_data[k]):
+                # When we use the .values method, timezone information is lost
+                # so convert it to pd.DatetimeIndex, which preserves the tz-info
+                hf_trace_data[k] = pd.Index(hf_trace_data[k])
+            elif hasattr(hf_trace_data[k], "values"):
+                # when not a range index or datetime index
+                hf_trace_data[k] = hf_trace_data[k].values
+
+    def _get_axis_type(self, trace: dict, hf_trace_data: dict) -> str:
+        """Return the x-axis type of a trace.
+
+        Note: the axis type specified in the figure layout takes precedence over the
+        the axis type which is inferred from the data (and stored in hf_trace_data)
+
+        """
+        # TODO: verify if we need to use `axis`of anchor as key to determing axis type
+        axis = trace.get("xaxis", "x")
+        return self.layout._props.get(axis[:1] + "axis" + axis[1:], {}).get(
+            "type", hf_trace_data["axis_type"]
+        )
+
+    def _get_cached_aggregation(
+        self, uid: str, hf_trace_data: dict, start_idx: int, end_idx: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Return the cached aggregation of a trace its view window, if any."""
+        cache = self._aggregation_cache
+        if cache is None:
+            return None
+        cache.validate(uid, hf_trace_data)
+        return cache.get(cache.make_key(uid, hf_trace_data, start_idx, end_idx))
+
+    def _cache_aggregation(
+        self,
+        uid: str,
+        hf_trace_data: dict,
+        start_idx: int,
+        end_idx: int,
+        aggregation: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cache (and return) the aggregation of a trace its view window."""
+        cache = self._aggregation_cache
+        if cache is not None:
+            key = cache.make_key(uid, hf_trace_data, start_idx, end_idx)
+            cache.put(key, aggregation)
+        return aggregation
+
+    def _aggregate_shared_x(
+        self,
+        traces: List[dict],
+        start: Optional[Union[float, str]] = None,
+        end: Optional[Union[float, str]] = None,
+    ) -> Dict[str, tuple]:
+        """Aggregate the traces that share their x-data (and x-axis) as a group.
+
+        The index range search and the x-slicing are performed once per group, and
+        the downsampling of the group is batched (see
+        ``PlotlyAggregatorParser.aggregate_batch``). Traces that do not share their
+        x-data are left to ``_check_update_trace_data``.
+
+        Returns
+        -------
+        Dict[str, tuple]
+            The ``(start_idx, end_idx, (agg_x, agg_y, indices))`` of the grouped
+            traces, by trace uid.
+
+        """
+        groups: Dict[tuple, List[Tuple[str, dict]]] = {}
+        for trace in traces:
+            hf_trace_data = self._hf_data.get(trace["uid"])
+            if hf_trace_data is None:
+                continue
+            self._parse_hf_trace_data(hf_trace_data)
+            if len(hf_trace_data["y"]) == 0:
+                continue
+            # NOTE: traces with the same x-data share the x-data object (see
+            # `_construct_hf_data_dict`)
+            key = (id(hf_trace_data["x"]), self._get_axis_type(trace, hf_trace_data))
+            groups.setdefault(key, []).append((trace["uid"], hf_trace_data))
+
+        aggregated = {}
+        for (_, axis_type), members in groups.items():
+            if len(members) < 2:
+                continue
+            start_idx, end_idx = PlotlyAggregatorParser.get_start_end_indices(
+                members[0][1], axis_type, start, end
+            )
+            if end_idx == start_idx:
+                continue
+            # Only the traces whose view window is not cached are aggregated
+            pending = []
+            for uid, hf_trace_data in members:
+                cached = self._get_cached_aggregation(
+                    uid, hf_trace_data, start_idx, end_idx
+                )
+                if cached is not None:
+                    aggregated[uid] = (start_idx, end_idx, cached)
+                else:
+                    pending.append((uid, hf_trace_data))
+            if not pending:
+                continue
+            results = PlotlyAggregatorParser.aggregate_batch(
+                [hf_trace_data for _, hf_trace_data in pending], start_idx, end_idx
+            )
+            for (uid, hf_trace_data), result in zip(pending, results):
+                self._cache_aggregation(uid, hf_trace_data, start_idx, end_idx, result)
+                aggregated[uid] = (start_idx, end_idx, result)
+        return aggregated
+
     def _layout_xaxis_to_trace_xaxis_mapping(self) -> Dict[str, List[str]]:
         """Construct a dict which maps the layout xaxis keys to the trace xaxis keys.
 
@@ -472,18 +612,29 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             # Retrieve the trace xaxis values that are affected by the relayout event
             trace_xaxis_filter: List[str] = layout_trace_mapping[layout_xaxis_filter]
 
-        for idx, trace in enumerate(figure["data"]):
-            # We skip when (i) the trace-idx already has been updated or (ii) when
-            # there is a layout_xaxis_filter and the trace xaxis is not in the filter
-            if idx in updated_trace_indices or (
-                layout_xaxis_filter is not None
-                and trace.get("xaxis", "x") not in trace_xaxis_filter
-            ):
-                continue
+        # We skip when (i) the trace-idx already has been updated or (ii) when
+        # there is a layout_xaxis_filter and the trace xaxis is not in the filter
+        traces = {
+            idx: trace
+            for idx, trace in enumerate(figure["data"])
+            if not (
+                idx in updated_trace_indices
+                or (
+                    layout_xaxis_filter is not None
+                    and trace.get("xaxis", "x") not in trace_xaxis_filter
+                )
+            )
+        }
 
+        # Traces which share their x-data are aggregated as a group
+        aggregated = self._aggregate_shared_x(list(traces.values()), start, stop)
+
+        for idx, trace in traces.items():
             # If we managed to find and update the trace, it will return the trace
             # and thus not None.
-            updated_trace = self._check_update_trace_data(trace, start=start, end=stop)
+            updated_trace = self._check_update_trace_data(
+                trace, start=start, end=stop, aggregated=aggregated
+            )
             if updated_trace is not None:
                 updated_trace_indices.append(idx)
         return updated_trace_indices
@@ -544,6 +695,15 @@ class AbstractFigureAggregator(BaseFigure, ABC):
         """
         return list(self._hf_data.values())
 
+    def aggregation_cache_info(self) -> Optional[dict]:
+        """Return the hits, misses and size of the aggregation cache, or None when
+        the cache is disabled.
+
+        """
+        if self._aggregation_cache is None:
+            return None
+        return self._aggregation_cache.info()
+
     def _parse_get_trace_props(
         self,
         trace: BaseTraceType,
@@ -580,6 +740,9 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             # fmt: off
             (np.asarray(trace["x"]) if trace["x"] is not None else None)
             if hasattr(trace, "x") and hf_x is None
+            # Compressed vectors are kept as is, they decode only the viewed slice
+            # (also a compressed datetime vector, which has a datetime64 dtype)
+            else hf_x if is_compressed_vector(hf_x)
             # If we cast a tz-aware datetime64 array to `.values` we lose the tz-info 
             # and the UTC time will be displayed instead of the tz-localized time, 
             # hence we cast to a pd.DatetimeIndex, which preserves the tz-info
@@ -591,7 +754,9 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             else np.asarray(hf_x)
             # fmt: on
         )
-        if pd.core.dtypes.common.is_datetime64_any_dtype(hf_x):
+        if pd.core.dtypes.common.is_datetime64_any_dtype(
+            hf_x
+        ) and not is_compressed_vector(hf_x):
             hf_x = pd.Index(hf_x)
 
         hf_y = (
@@ -775,7 +940,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             "sorted in time; i.e., the x-data must be (non-strictly) "
             "monotonically increasing."
         )
-        if isinstance(dc.x, pd.Index):
+        if isinstance(dc.x, pd.Index) or hasattr(dc.x, "is_monotonic_increasing"):
             assert dc.x.is_monotonic_increasing, assert_text
         else:
             assert pd.Series(dc.x).is_monotonic_increasing, assert_text
@@ -815,7 +980,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
         # TODO -> can't we just store the DC here (might be less duplication of
         #  code knowledge, because now, you need to know all the eligible hf_keys in
         #  dc
-        return {
+        hf_trace_data = {
             "max_n_samples": max_n_samples,
             "default_n_samples": default_n_samples,
             "name": trace.name,
@@ -824,8 +989,25 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             "default_downsampler": default_downsampler,
             "gap_handler": gap_handler,
             "default_gap_handler": default_gap_handler,
+            # The index range lookup of the x-data (e.g., its timezone and whether
+            # it is evenly spaced) is resolved once, here
+            "x_lookup": XLookup(dc.x),
             **dc._asdict(),
         }
+        # Traces with the same x-data (e.g., channels on one timestamp array) share
+        # the x-data object and its lookup, so that they are aggregated as a group
+        for other in self._hf_data.values():
+            if other.get("x_lookup") is not None and other["x_lookup"].same_data(
+                hf_trace_data["x_lookup"]
+            ):
+                hf_trace_data["x"] = other["x"]
+                hf_trace_data["x_lookup"] = other["x_lookup"]
+                break
+
+        # The min-max pyramid of the y-data (if the downsampler opts in) is also
+        # built once, here
+        PlotlyAggregatorParser.get_minmax_pyramid(hf_trace_data)
+        return hf_trace_data
 
     @staticmethod
     def _add_trace_to_add_traces_kwargs(kwargs: dict) -> dict:
@@ -1178,6 +1360,8 @@ class AbstractFigureAggregator(BaseFigure, ABC):
     def _clear_figure(self):
         """Clear the current figure object its data and layout."""
         self._hf_data = {}
+        if self._aggregation_cache is not None:
+            self._aggregation_cache.clear()
         self.data = []
         self._data = []
         self._layout = {}
@@ -1240,6 +1424,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             resampled_trace_prefix_suffix=(self._prefix, self._suffix),
             show_mean_aggregation_size=self._show_mean_aggregation_size,
             verbose=self._print_verbose,
+            aggregation_cache_bytes=self._aggregation_cache_bytes,
         )
 
     def _parse_relayout(self, relayout_dict: dict) -> dict:
@@ -1415,6 +1600,7 @@ class AbstractFigureAggregator(BaseFigure, ABC):
             "_suffix",
             "_global_downsampler",
             "_global_gap_handler",
+            "_aggregation_cache_bytes",
         ]
 
     def __reduce__(self):
@@ -57,6 +57,7 @@ class FigureWidgetResampler(
         show_mean_aggregation_size: bool = True,
         convert_traces_kwargs: dict | None = None,
         verbose: bool = False,
+        aggregation_cache_bytes: int | None = 0,
     ):
         # Parse the figure input before calling `super`
         f = self._get_figure_class(go.FigureWidget)()
@@ -103,6 +104,7 @@ class FigureWidgetResampler(
             show_mean_aggregation_size,
             convert_traces_kwargs,
             verbose,
+            aggregation_cache_bytes,
         )
 
         if isinstance(figure, AbstractFigureAggregator):
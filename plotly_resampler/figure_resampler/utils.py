@@ -2,6 +2,7 @@
 
 import math
 
+import numpy as np
 import pandas as pd
 from plotly.basedatatypes import BaseFigure
 
@@ -12,6 +13,37 @@ except (ImportError, ModuleNotFoundError):
 
 from typing import Any
 
+### Checks for the data type
+
+
+def is_compressed_vector(data: Any) -> bool:
+    """Check if the data is a compressed vector (e.g., a ``CompressedVector`` or a
+    ``DeltaVector`` from the ``data_structures`` package).
+
+    A compressed vector is a 1-dimensional container which decodes its values
+    lazily on indexing, and thus should not be converted into a ``np.ndarray``
+    when it is stored as high-frequency trace data.
+
+    Parameters
+    ----------
+    data : Any
+        The data to check.
+
+    Returns
+    -------
+    bool
+        True if the data exposes the compressed vector interface; i.e., ``dtype``,
+        ``__len__``, ``__getitem__`` and ``size_in_bytes``.
+    """
+    return (
+        not isinstance(data, np.ndarray)
+        and hasattr(data, "dtype")
+        and hasattr(data, "__len__")
+        and hasattr(data, "__getitem__")
+        and callable(getattr(data, "size_in_bytes", None))
+    )
+
+
 ### Checks for the figure type
 
 